@@ -4,6 +4,14 @@ set -o errexit
 
 pip install -r requirements.txt
 
+# Fonts and Bootstrap come from static/vendor/ once `manage.py vendor_assets`
+# has been run and its output committed (README); otherwise from the CDNs.
+python manage.py build_static_bundles
+
 python manage.py collectstatic --noinput
 
 python manage.py migrate
+
+python manage.py build_critical_css
+
+python manage.py page_cache --clear
@@ -14,6 +14,7 @@ import os
 import urllib.parse
 from pathlib import Path
 import dj_database_url
+from boto3.s3.transfer import TransferConfig
 from dotenv import load_dotenv
 from botocore.config import Config
 
@@ -116,6 +117,43 @@ DATABASES = {
 }
 
 
+# Cache
+# File-based by default so every server process and management command shares
+# the same page cache; set REDIS_URL to use Redis instead.
+
+REDIS_URL = os.getenv("REDIS_URL", "").strip()
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".django_cache")),
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        },
+        # Kept apart so culling rendered pages never drops sessions
+        "sessions": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("SESSION_CACHE_DIR", str(BASE_DIR / ".django_sessions")),
+            "OPTIONS": {"MAX_ENTRIES": 50000},
+        },
+    }
+
+# Rendered public pages (see core/page_cache.py); evicted by model signals
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True") == "True"
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", "3600"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -154,9 +192,29 @@ STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Minified CSS/JS bundles written by `manage.py build_static_bundles`
+# (core/bundles.py) and published by collectstatic under static/bundles/.
+# Templates render their {% bundle %} blocks unbundled until a build exists.
+STATIC_BUNDLE_DIR = BASE_DIR / "static_bundles"
+if (STATIC_BUNDLE_DIR / "files").is_dir():
+    STATICFILES_DIRS.append(("bundles", STATIC_BUNDLE_DIR / "files"))
+
 # Media files
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Internal nginx location aliased to MEDIA_ROOT (e.g. "/protected-media/").
+# When set, /media/ responses are X-Accel-Redirects and nginx sends the file;
+# leave empty when Django is not behind nginx. Required with the bundled
+# nginx.conf, whose media location is internal; deploy.ps1 adds it to .env.
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT", "").strip()
+
+# Resized variants written for uploaded images (core/images.py); formats the
+# installed Pillow cannot encode are skipped.
+IMAGE_DERIVATIVE_FORMATS = ["avif", "webp"]
+
+# WebP siblings of static images written by `manage.py optimize_images`
+# (committed with static/); read by the {% static_picture %} tag.
+STATIC_IMAGE_MANIFEST = BASE_DIR / "static_images.json"
 
 # ---------------------------------------------------------------------------
 # Supabase Storage (S3-compatible)
@@ -174,6 +232,25 @@ AWS_S3_SIGNATURE_VERSION = "s3v4"
 AWS_S3_ADDRESSING_STYLE = "path"
 AWS_S3_CHECKSUM_MODE = "DISABLED"
 
+# Files above the threshold are sent as parallel multipart uploads. Supabase
+# (like S3) needs parts of at least 5 MB.
+AWS_S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=int(os.getenv("AWS_S3_MULTIPART_THRESHOLD_MB", "8")) * 1024 * 1024,
+    multipart_chunksize=int(os.getenv("AWS_S3_MULTIPART_CHUNK_MB", "8")) * 1024 * 1024,
+    max_concurrency=int(os.getenv("AWS_S3_MAX_CONCURRENCY", "8")),
+    use_threads=True,
+)
+
+# Uploads matching these storage-name patterns and at least
+# MEDIA_DEFERRED_UPLOAD_MIN_MB in size are spooled to UPLOAD_SPOOL_DIR and sent
+# to Supabase by `python manage.py run_upload_jobs` instead of inside the
+# request (core/uploads.py); the web and worker processes must share the
+# directory. MEDIA_DEFERRED_UPLOAD_MIN_MB=0 turns deferral off.
+_deferred_upload_min_mb = int(os.getenv("MEDIA_DEFERRED_UPLOAD_MIN_MB", "5"))
+MEDIA_DEFERRED_UPLOAD_PATTERNS = ["publications/*.pdf"] if _deferred_upload_min_mb > 0 else []
+MEDIA_DEFERRED_UPLOAD_MIN_BYTES = _deferred_upload_min_mb * 1024 * 1024
+UPLOAD_SPOOL_DIR = Path(os.getenv("UPLOAD_SPOOL_DIR", BASE_DIR / ".upload_spool"))
+
 # NOTE: AWS_EC2_METADATA_DISABLED removed — not needed on real EC2 instances
 
 
@@ -192,10 +269,21 @@ use_supabase = bool(
     and AWS_S3_SECRET_ACCESS_KEY
 )
 
+# Local disk copies of Supabase objects read by the server (core/media_cache.py).
+# MEDIA_DISK_CACHE_MAX_MB=0 disables the cache.
+MEDIA_DISK_CACHE_DIR = Path(os.getenv("MEDIA_DISK_CACHE_DIR", BASE_DIR / ".media_cache"))
+MEDIA_DISK_CACHE_MAX_BYTES = int(os.getenv("MEDIA_DISK_CACHE_MAX_MB", "1024")) * 1024 * 1024
+# Seconds a cached copy is trusted before its ETag is checked again.
+MEDIA_DISK_CACHE_REVALIDATE = int(os.getenv("MEDIA_DISK_CACHE_REVALIDATE", "300"))
+
 if use_supabase:
     STORAGES = {
         "default": {
-            "BACKEND": "core.storage.SupabaseMediaStorage",
+            "BACKEND": (
+                "core.storage.TieredMediaStorage"
+                if MEDIA_DISK_CACHE_MAX_BYTES > 0
+                else "core.storage.SupabaseMediaStorage"
+            ),
         },
         "staticfiles": {
             "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
@@ -241,6 +329,14 @@ DEFAULT_FROM_EMAIL = os.getenv(
 )
 ADMIN_EMAIL = os.getenv("ADMIN_EMAIL", "climatologylab@ar.iitr.ac.in")
 
+# Contact emails are queued in contact.OutboundEmail and delivered by
+# `python manage.py send_outbox`; give up on a message after this many tries.
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+
+# Dashboard uploads are spooled here and imported by `python manage.py
+# run_import_jobs`; the web and worker processes must share this directory.
+IMPORT_SPOOL_DIR = Path(os.getenv("IMPORT_SPOOL_DIR", BASE_DIR / ".import_spool"))
+
 # ============================================
 # AUTHENTICATION CONFIGURATION
 # ============================================
@@ -252,3 +348,12 @@ LOGOUT_REDIRECT_URL = "core:home"
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True  # Logout when browser window closes
 SESSION_COOKIE_AGE = 86400  # 24-hour global session
 SESSION_SAVE_EVERY_REQUEST = True  # Reset the timers on every page load/click
+
+# Sessions live in the "sessions" cache; only logged-in (dashboard) sessions
+# are also written to the database (see core/sessions.py). Unchanged sessions
+# are re-saved at most once per SESSION_REFRESH_THRESHOLD seconds.
+# Purge expired rows with `python manage.py purge_sessions`.
+SESSION_ENGINE = "core.sessions"
+SESSION_CACHE_ALIAS = "sessions"
+SESSION_REFRESH_THRESHOLD = int(os.getenv("SESSION_REFRESH_THRESHOLD", "300"))
+SESSION_PERSIST_AUTHENTICATED = os.getenv("SESSION_PERSIST_AUTHENTICATED", "True") == "True"
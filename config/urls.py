@@ -18,12 +18,12 @@ from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path, include, re_path
-from django.views.static import serve
 from django.contrib.auth import views as auth_views
 from dashboard import views as dashboard_views
 from django.http import HttpResponse
 from django.contrib.sitemaps.views import sitemap
 from core.sitemaps import StaticViewSitemap, ProjectSitemap
+from core.media import serve_media, serve_pending_upload
 
 sitemaps = {
     'static': StaticViewSitemap,
@@ -44,14 +44,15 @@ urlpatterns = [
     path('publications/', include('publications.urls')),
     path('googlee5ed8ef3b84d5965.html', google_verification),
     path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    # Deferred uploads still on their way to Supabase (core/uploads.py)
+    path('pending-media/<path:path>', serve_pending_upload, name='pending_media'),
 ]
 
 # Serve media files in all environments
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 else:
+    # Handed to nginx via X-Accel-Redirect when MEDIA_ACCEL_REDIRECT is set
     urlpatterns += [
-        re_path(r'^media/(?P<path>.*)$', serve, {
-            'document_root': settings.MEDIA_ROOT,
-        }),
+        re_path(r'^media/(?P<path>.*)$', serve_media, name='media'),
     ]
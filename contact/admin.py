@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import ContactSubmission
+from django.utils import timezone
+
+from .models import ContactSubmission, OutboundEmail
 from core.admin_base import BaseAdmin
 
 @admin.register(ContactSubmission)
@@ -31,3 +33,21 @@ class ContactSubmissionAdmin(BaseAdmin):
     def has_delete_permission(self, request, obj=None):
         # Allow deletion of old submissions
         return True
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(BaseAdmin):
+    list_display = ['subject', 'to', 'kind', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['subject', 'to', 'last_error']
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at']
+    readonly_fields = ['submission', 'created_at', 'sent_at', 'claimed_at', 'attempts', 'last_error']
+    actions = ['retry_now']
+
+    @admin.action(description="Retry selected emails now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.STATUS_SENT).update(
+            status=OutboundEmail.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now(), claimed_at=None,
+        )
+        self.message_user(request, f"{updated} emails re-queued.")
@@ -0,0 +1,45 @@
+"""
+Deliver queued emails from the outbox:
+  python manage.py send_outbox            # run forever, polling for new mail
+  python manage.py send_outbox --once     # drain what is due now and exit (cron)
+"""
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from contact import outbox
+
+
+class Command(BaseCommand):
+    help = 'Sends queued emails in batches over a single mail connection, retrying failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no message is due')
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE)
+        parser.add_argument('--concurrency', type=int, default=outbox.CONCURRENCY, help='Maximum sends in flight')
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        mail_connection = get_connection()
+        mail_connection.open()
+        try:
+            while True:
+                released = outbox.release_stale_claims()
+                if released:
+                    self.stdout.write(self.style.WARNING(f"Re-queued {released} stale messages."))
+
+                batch = outbox.claim_batch(options['batch_size'])
+                if batch:
+                    sent, failed = outbox.deliver_batch(batch, mail_connection, options['concurrency'])
+                    retrying = len(batch) - sent - failed
+                    self.stdout.write(f"Sent {sent}, retrying {retrying}, failed {failed}.")
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            mail_connection.close()
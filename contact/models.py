@@ -18,3 +18,51 @@ class ContactSubmission(models.Model):
     
     def __str__(self):
         return f"{self.name} - {self.submitted_date.strftime('%Y-%m-%d %H:%M')}"
+
+
+class OutboundEmail(models.Model):
+    """Email queued for delivery by the ``send_outbox`` worker"""
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    submission = models.ForeignKey(
+        ContactSubmission,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='emails'
+    )
+    kind = models.CharField(max_length=50, blank=True, help_text="e.g. admin_notification, auto_reply")
+    subject = models.CharField(max_length=300)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField(help_text="Comma-separated recipient addresses")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Outbound Email"
+        verbose_name_plural = "Email Outbox"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
+    def recipients(self):
+        return [address.strip() for address in self.to.split(',') if address.strip()]
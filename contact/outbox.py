@@ -0,0 +1,148 @@
+"""
+Durable email outbox.
+
+Request handlers only ``enqueue`` messages (one INSERT each); the
+``send_outbox`` management command claims due messages in batches and
+delivers them over a single reused mail connection with a bounded number of
+concurrent sends. Failed sends are retried with exponential backoff until
+``EMAIL_OUTBOX_MAX_ATTEMPTS`` is reached; every row records its status,
+attempt count and last error.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+BATCH_SIZE = 20
+CONCURRENCY = 4
+
+# Retry delays grow 30s, 60s, 120s, ... capped at one hour.
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 60 * 60
+
+# A message left in 'sending' this long is assumed to belong to a dead worker.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def max_attempts():
+    return getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def enqueue(subject, body, to, from_email=None, submission=None, kind=''):
+    """Queue a plain-text email for the worker and return the outbox row."""
+    if isinstance(to, str):
+        to = [to]
+    return OutboundEmail.objects.create(
+        submission=submission,
+        kind=kind,
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=', '.join(to),
+    )
+
+
+def enqueue_contact_emails(submission):
+    """Queue the admin notification and the user auto-reply for a contact submission."""
+    phone = submission.phone
+    enqueue(
+        subject=f'New Contact Form Submission from {submission.name}',
+        body=f"New contact form submission received:\n\nName: {submission.name}\nEmail: {submission.email}\nPhone: {phone if phone else 'Not provided'}\n\nMessage/Query:\n{submission.query}\n\n---\nSubmission ID: {submission.id}",
+        to=settings.ADMIN_EMAIL,
+        submission=submission,
+        kind='admin_notification',
+    )
+    # May fail in the SES sandbox if the user's address is unverified; the
+    # worker records that on the row instead of losing it.
+    enqueue(
+        subject='Thank You for Contacting Climatology Lab',
+        body=f"Dear {submission.name},\n\nThank you for connecting with us. We have received your query and will get back to you soon.\n\nYour Query:\n{submission.query}\n\nWe appreciate your interest in the Climatology Lab and will respond as quickly as possible.\n\nBest regards,\n\nClimatology Lab\nDepartment of Architecture and Planning,\nIIT Roorkee, Roorkee (247667), Uttarakhand, India\nPhone: +91 - 1332-286141\nEmail: climatologylab@ar.iitr.ac.in",
+        to=submission.email,
+        submission=submission,
+        kind='auto_reply',
+    )
+
+
+def release_stale_claims():
+    """Return messages stuck in 'sending' (e.g. after a worker crash) to the queue."""
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENDING,
+        claimed_at__lt=timezone.now() - CLAIM_TIMEOUT,
+    ).update(status=OutboundEmail.STATUS_PENDING, claimed_at=None)
+
+
+def claim_batch(size=BATCH_SIZE):
+    """Mark up to ``size`` due messages as 'sending' and return them."""
+    now = timezone.now()
+    with transaction.atomic():
+        due = OutboundEmail.objects.filter(
+            status=OutboundEmail.STATUS_PENDING,
+            next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Lets several workers drain the queue without claiming the same rows.
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:size])
+        OutboundEmail.objects.filter(pk__in=[message.pk for message in batch]).update(
+            status=OutboundEmail.STATUS_SENDING, claimed_at=now,
+        )
+    return batch
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def _send(mail_connection, message):
+    """Send one outbox row; runs in a worker thread and does not touch the database."""
+    email = EmailMessage(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email,
+        to=message.recipients(),
+        connection=mail_connection,
+    )
+    try:
+        email.send()
+    except Exception as exc:
+        return exc
+    return None
+
+
+def deliver_batch(batch, mail_connection, concurrency=CONCURRENCY):
+    """
+    Send a claimed batch over ``mail_connection`` with at most ``concurrency``
+    sends in flight, then record each outcome. Returns ``(sent, failed)``.
+    """
+    if not batch:
+        return 0, 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        errors = list(executor.map(lambda message: _send(mail_connection, message), batch))
+
+    sent = failed = 0
+    now = timezone.now()
+    for message, error in zip(batch, errors):
+        message.attempts += 1
+        message.claimed_at = None
+        if error is None:
+            message.status = OutboundEmail.STATUS_SENT
+            message.sent_at = now
+            message.last_error = ''
+            sent += 1
+        else:
+            message.last_error = f'{type(error).__name__}: {error}'
+            if message.attempts >= max_attempts():
+                message.status = OutboundEmail.STATUS_FAILED
+                failed += 1
+            else:
+                message.status = OutboundEmail.STATUS_PENDING
+                message.next_attempt_at = now + retry_delay(message.attempts)
+    OutboundEmail.objects.bulk_update(
+        batch, ['status', 'attempts', 'claimed_at', 'sent_at', 'last_error', 'next_attempt_at'],
+    )
+    return sent, failed
@@ -2,7 +2,7 @@ from django.contrib import admin
 from .models import (
     SiteSettings, HomePageStats, HomePageContent, RTNotice, 
     Tutorial, CarouselImage, ImpactStory, 
-    ResearchHighlight, PolicyImpact
+    ResearchHighlight, PolicyImpact, PendingUpload, DerivativeJob
 )
 from .admin_base import BaseAdmin
 
@@ -160,3 +160,16 @@ class TutorialAdmin(BaseAdmin):
         return "No thumbnail"
     thumbnail_preview.short_description = "Thumbnail Preview"
 
+
+@admin.register(PendingUpload)
+class PendingUploadAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'size', 'attempts', 'created_at']
+    list_filter = ['status']
+    readonly_fields = [field.name for field in PendingUpload._meta.fields]
+
+
+@admin.register(DerivativeJob)
+class DerivativeJobAdmin(admin.ModelAdmin):
+    list_display = ['source', 'action', 'status', 'attempts', 'queued_at']
+    list_filter = ['action', 'status']
+    readonly_fields = [field.name for field in DerivativeJob._meta.fields]
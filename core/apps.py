@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core import images, page_cache, search_index
+        page_cache.connect_signals()
+        search_index.connect_signals()
+        images.connect_signals()
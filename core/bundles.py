@@ -0,0 +1,283 @@
+"""
+Build-time bundling of template CSS and JS.
+
+Templates mark groups of stylesheets or scripts with the ``bundle`` tag
+(core/templatetags/bundles.py)::
+
+    {% bundle "css" "site" %}
+    <link rel="stylesheet" href="{% static 'css/main.css' %}">
+    <style>...</style>
+    {% endbundle %}
+
+``python manage.py build_static_bundles`` (run by build.sh/deploy.ps1 before
+collectstatic) parses the project templates, reads each bundle's static
+files and inline blocks in order, drops repeated pieces, minifies the result
+and writes it to ``STATIC_BUNDLE_DIR`` as ``<name>.css|js`` with a manifest.
+collectstatic publishes the files under ``bundles/``, where the manifest
+storage gives them hashed names and WhiteNoise writes their gzip and Brotli
+variants.
+
+The CSS bundles one page renders (``base.html``'s, the page's own and those
+of its includes) are also merged into a single ``page-<template>.css``, so a
+page waits on one stylesheet however many blocks it is assembled from.
+
+At render time a bundle whose template source still matches the manifest is
+replaced by one ``<link>``/``<script src>``; in a page with a merged file the
+first CSS bundle links that file and the rest render nothing. Anything else
+(DEBUG, a template edited since the build, no build at all) renders its
+contents inline as written, so the templates stay the source of truth.
+"""
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.template import Context
+from django.template.base import TextNode
+from django.templatetags.static import StaticNode
+
+# kind -> (file extension, tag emitted for the built file)
+KINDS = {
+    'css': ('.css', '<link rel="stylesheet" href="{}">'),
+    'js': ('.js', '<script src="{}"></script>'),
+}
+
+# A built stylesheet on a page whose critical CSS is inlined (core/critical.py).
+ASYNC_STYLESHEET = (
+    '<link rel="preload" href="{0}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+    '<noscript><link rel="stylesheet" href="{0}"></noscript>'
+)
+
+STATIC_PREFIX = 'bundles'
+
+PLACEHOLDER = '\x00{}\x00'
+
+# One piece of a bundle, matched against the block's HTML with each
+# {% static %} replaced by PLACEHOLDER.
+PIECE_RE = re.compile(
+    r'<link\b[^>]*?\bhref=(["\'])\x00(?P<link>\d+)\x00\1[^>]*>'
+    r'|<script\b[^>]*?\bsrc=(["\'])\x00(?P<script_src>\d+)\x00\3[^>]*>\s*</script\s*>'
+    r'|<style\b[^>]*>(?P<style>.*?)</style\s*>'
+    r'|<script(?P<script_attrs>\b[^>]*)>(?P<script>.*?)</script\s*>'
+    r'|<!--.*?-->'
+    r'|\s+',
+    re.S | re.I,
+)
+
+URL_RE = re.compile(r'url\(\s*(["\']?)([^"\')]+)\1\s*\)')
+
+_manifest = None
+
+
+def bundle_dir():
+    return Path(getattr(settings, 'STATIC_BUNDLE_DIR', settings.BASE_DIR / 'static_bundles'))
+
+
+def files_dir():
+    return bundle_dir() / 'files'
+
+
+def manifest_path():
+    return bundle_dir() / 'manifest.json'
+
+
+def enabled():
+    return getattr(settings, 'STATIC_BUNDLES_ENABLED', not settings.DEBUG)
+
+
+def load_manifest():
+    """The manifest written by the last build (read once per process), or {}."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(manifest_path(), encoding='utf-8') as handle:
+                _manifest = json.load(handle)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def key(kind, name):
+    return f'{kind}:{name}'
+
+
+def built_path(kind, name, source_hash):
+    """Static path of a bundle if bundling is on and its build matches ``source_hash``."""
+    if not enabled():
+        return None
+    entry = load_manifest().get('bundles', {}).get(key(kind, name))
+    if entry is None or entry['source'] != source_hash:
+        return None
+    return entry['path']
+
+
+def page_path(template_name, name, source_hash):
+    """Static path of the merged CSS of pages rendered from ``template_name``, if it includes this bundle."""
+    if not enabled():
+        return None
+    entry = load_manifest().get('pages', {}).get(template_name)
+    if entry is None or [name, source_hash] not in entry['bundles']:
+        return None
+    return entry['path']
+
+
+def source_hash(nodelist):
+    """Hash of a bundle's template source, identical at build and render time."""
+    parts = []
+    for node in nodelist:
+        if isinstance(node, TextNode):
+            parts.append(node.s)
+        else:
+            parts.append('{%% %s %%}' % node.token.contents)
+    return hashlib.md5(''.join(parts).encode('utf-8')).hexdigest()
+
+
+def pieces(kind, nodelist):
+    """
+    Split a bundle into ``[('file', static_path) | ('inline', text), ...]``
+    in document order. Raises ValueError for anything that cannot be moved
+    into a static file.
+    """
+    html, paths = [], []
+    for node in nodelist:
+        if isinstance(node, TextNode):
+            html.append(node.s)
+        elif isinstance(node, StaticNode) and node.varname is None:
+            html.append(PLACEHOLDER.format(len(paths)))
+            paths.append(node.path.resolve(Context()))
+        else:
+            raise ValueError(f"unsupported template code in bundle: {{% {node.token.contents} %}}")
+    html = ''.join(html)
+
+    found, position = [], 0
+    for match in PIECE_RE.finditer(html):
+        if match.start() != position:
+            break
+        position = match.end()
+        groups = match.groupdict()
+        if groups['link'] is not None and kind == 'css':
+            found.append(('file', paths[int(groups['link'])]))
+        elif groups['script_src'] is not None and kind == 'js':
+            found.append(('file', paths[int(groups['script_src'])]))
+        elif groups['style'] is not None and kind == 'css':
+            found.append(('inline', groups['style']))
+        elif groups['script'] is not None and kind == 'js':
+            if 'src=' in groups['script_attrs'] or 'type=' in groups['script_attrs']:
+                raise ValueError(f"cannot bundle <script{groups['script_attrs']}>")
+            found.append(('inline', groups['script']))
+        elif match.group().strip() and not match.group().startswith('<!--'):
+            raise ValueError(f"unexpected {match.group()[:40]!r} in a {kind} bundle")
+    if position != len(html):
+        raise ValueError(f"unexpected {html[position:position + 40]!r} in a {kind} bundle")
+    return found
+
+
+def _rewrite_urls(css, static_path):
+    """Re-point relative url()s of a static CSS file at the bundle's location."""
+    source_dir = posixpath.dirname(static_path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group()
+        target = posixpath.normpath(posixpath.join(source_dir, url))
+        return f'url({quote}{posixpath.relpath(target, STATIC_PREFIX)}{quote})'
+
+    return URL_RE.sub(replace, css)
+
+
+def read_piece(kind, piece):
+    source, value = piece
+    if source == 'inline':
+        return value
+    found = finders.find(value)
+    if not found:
+        raise ValueError(f"static file '{value}' not found")
+    with open(found, encoding='utf-8') as handle:
+        text = handle.read()
+    return _rewrite_urls(text, value) if kind == 'css' else text
+
+
+def minify(kind, text):
+    if kind == 'css':
+        import rcssmin
+        return rcssmin.cssmin(text)
+    import rjsmin
+    return rjsmin.jsmin(text)
+
+
+def compressed_sizes(data):
+    """``(gzip, brotli)`` sizes of ``data``; brotli is None without the Brotli package."""
+    try:
+        import brotli
+    except ImportError:
+        brotli_size = None
+    else:
+        brotli_size = len(brotli.compress(data))
+    return len(gzip.compress(data, 9)), brotli_size
+
+
+def _content(kind, bundle_pieces):
+    """Minified text of ``bundle_pieces`` with repeated pieces dropped. Returns ``(content, count, source_bytes)``."""
+    texts, seen = [], set()
+    for piece in bundle_pieces:
+        text = read_piece(kind, piece)
+        digest = hashlib.md5(text.encode('utf-8')).hexdigest()
+        if digest in seen:
+            continue
+        seen.add(digest)
+        texts.append(text)
+    # ';' keeps one script's last statement from running into the next.
+    separator = '\n' if kind == 'css' else ';\n'
+    content = separator.join(minify(kind, text).strip() for text in texts) + '\n'
+    return content, len(texts), sum(len(text) for text in texts)
+
+
+def page_filename(names):
+    """Merged file of the CSS bundles ``names``, shared by every page that renders the same ones."""
+    return 'page-' + '--'.join(names) + '.css'
+
+
+def build(bundles, pages=None):
+    """
+    Write ``bundles`` (``{(kind, name): (source_hash, pieces)}``), the merged
+    CSS of ``pages`` (``{template_name: [(name, source_hash), ...]}``) and
+    their manifest. Returns ``[(kind, name, path, piece_count, source_bytes, content)]``.
+    """
+    directory = files_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    entries, page_entries, report = {}, {}, []
+    for (kind, name), (source, bundle_pieces) in sorted(bundles.items()):
+        content, count, source_bytes = _content(kind, bundle_pieces)
+        # collectstatic's manifest storage adds the content hash to the name.
+        filename = f'{name}{KINDS[kind][0]}'
+        (directory / filename).write_text(content, encoding='utf-8')
+        path = f'{STATIC_PREFIX}/{filename}'
+        entries[key(kind, name)] = {'source': source, 'path': path}
+        report.append((kind, name, path, count, source_bytes, content))
+
+    for template_name, page_bundles in sorted((pages or {}).items()):
+        names = [name for name, _ in page_bundles]
+        filename = page_filename(names)
+        path = f'{STATIC_PREFIX}/{filename}'
+        if path not in {entry['path'] for entry in page_entries.values()}:
+            page_pieces = [piece for name in names for piece in bundles[('css', name)][1]]
+            content, count, source_bytes = _content('css', page_pieces)
+            (directory / filename).write_text(content, encoding='utf-8')
+            report.append(('css', ' + '.join(names), path, count, source_bytes, content))
+        page_entries[template_name] = {'bundles': [list(bundle) for bundle in page_bundles], 'path': path}
+
+    current = {Path(entry['path']).name for entry in [*entries.values(), *page_entries.values()]}
+    for existing in directory.iterdir():
+        if existing.name not in current:
+            existing.unlink()
+
+    temporary = manifest_path().with_suffix('.tmp')
+    temporary.write_text(json.dumps({'bundles': entries, 'pages': page_entries}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, manifest_path())
+    return report
@@ -0,0 +1,311 @@
+"""
+Critical (above-the-fold) CSS for the public pages.
+
+``python manage.py build_critical_css`` (run after migrate) renders the page
+behind each template in PAGES with bundling switched off, so all of its CSS
+is in the HTML as static ``<link>``s and ``<style>`` blocks. It marks what a
+first screen shows, the site header and the first FOLD_ELEMENTS elements of
+``<main>`` with their ancestors, and keeps the rules whose selectors match
+one of them, plus ``@font-face`` rules and the ``@keyframes`` they use. The
+result is stored per template in ``STATIC_BUNDLE_DIR/critical.json``.
+
+When a page has critical CSS and its CSS bundles are built, the
+``{% critical_css %}`` tag inlines it in ``<head>`` and the bundles load
+without blocking the first paint. The full stylesheets repeat the critical
+rules in their original order, so the final cascade does not change.
+"""
+import json
+import os
+import posixpath
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+from core import bundles
+
+# Template -> URL name of a page rendered with it.
+PAGES = {
+    'home.html': 'core:home',
+    'projects.html': 'core:research_projects',
+    'team.html': 'core:team',
+    'learn.html': 'core:learn',
+    'impact.html': 'core:impact',
+    'workshops.html': 'core:workshops',
+    'tutorials.html': 'core:tutorials',
+    'research_technology.html': 'core:research_technology',
+    'search.html': 'core:search',
+    'publication_list.html': 'publications:journals',
+}
+
+# Elements of <main>, in document order, treated as visible on first paint.
+FOLD_ELEMENTS = 150
+
+# At-rules whose contents are filtered rule by rule.
+GROUPING_RULES = ('@media', '@supports', '@container', '@layer')
+
+# Pseudo-elements style parts of the element they follow; match that element.
+PSEUDO_ELEMENT_RE = re.compile(r'::?(?:before|after|first-line|first-letter|placeholder|selection|marker|backdrop|-webkit-[\w-]+|-moz-[\w-]+)', re.I)
+
+_critical = None
+
+
+def manifest_path():
+    return bundles.bundle_dir() / 'critical.json'
+
+
+def enabled():
+    return bundles.enabled() and getattr(settings, 'CRITICAL_CSS_ENABLED', True)
+
+
+def load_manifest():
+    """The critical CSS written by the last build (read once per process), or {}."""
+    global _critical
+    if _critical is None:
+        try:
+            with open(manifest_path(), encoding='utf-8') as handle:
+                _critical = json.load(handle)
+        except (OSError, ValueError):
+            _critical = {}
+    return _critical
+
+
+def for_template(template_name):
+    """Critical CSS to inline for pages rendered from ``template_name``, or None."""
+    if not enabled():
+        return None
+    entry = load_manifest().get('templates', {}).get(template_name)
+    return entry['css'] if entry else None
+
+
+# =========================
+# EXTRACTION
+# =========================
+
+def css_blocks(css):
+    """Split CSS into top-level ``(prelude, body)`` pairs (body is None for ``@import``-like statements)."""
+    depth, start, body_start, quote = 0, 0, 0, None
+    for index, char in enumerate(css):
+        if quote:
+            if char == quote and css[index - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            if depth == 0:
+                body_start = index + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield css[start:body_start - 1].strip(), css[body_start:index]
+                start = index + 1
+        elif char == ';' and depth == 0:
+            yield css[start:index].strip(), None
+            start = index + 1
+
+
+def split_selectors(prelude):
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(prelude[start:index])
+            start = index + 1
+    parts.append(prelude[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+class Fold:
+    """The elements of a rendered page visible on first paint."""
+
+    def __init__(self, html):
+        # A template saved with a BOM emits it first; :root would then match nothing.
+        self.soup = BeautifulSoup(html.lstrip('\ufeff'), 'html.parser')
+        elements = []
+        header = self.soup.find('header')
+        if header is not None:
+            elements += [header, *header.find_all(True)]
+        main = self.soup.find('main')
+        if main is not None:
+            elements += [main, *main.find_all(True, limit=FOLD_ELEMENTS)]
+        for element in list(elements):
+            elements += [parent for parent in element.parents if parent.name != '[document]']
+        unique = {id(element): element for element in elements}
+        self.elements = list(unique.values())
+        self.classes = {name for element in self.elements for name in element.get('class', [])}
+        self.ids = {element.get('id') for element in self.elements}
+        self.tags = {element.name for element in self.elements}
+
+    def _may_match(self, selector):
+        # Cheap pre-check on the subject (last compound) before running soupsieve.
+        if '\\' in selector:
+            return True
+        subject = re.sub(r'\[[^\]]*\]', '', selector)
+        while '(' in subject:
+            reduced = re.sub(r'\([^()]*\)', '', subject)
+            if reduced == subject:
+                break
+            subject = reduced
+        subject = re.split(r'[\s>+~]+', subject.strip())[-1]
+        tag = re.match(r'[a-zA-Z][\w-]*', subject)
+        return (
+            (tag is None or tag.group().lower() in self.tags)
+            and all(name in self.classes for name in re.findall(r'\.([\w-]+)', subject))
+            and all(name in self.ids for name in re.findall(r'#([\w-]+)', subject))
+        )
+
+    def matches(self, prelude):
+        """Whether any selector of a rule's prelude applies to a visible element."""
+        for selector in split_selectors(PSEUDO_ELEMENT_RE.sub('', prelude)):
+            if not self._may_match(selector):
+                continue
+            try:
+                compiled = soupsieve.compile(selector)
+            except (soupsieve.SelectorSyntaxError, NotImplementedError):
+                return True  # Keep what cannot be checked.
+            if any(compiled.match(element) for element in self.elements):
+                return True
+        return False
+
+
+def _select(css, fold, keyframes):
+    kept = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            continue
+        at_rule = prelude.split(None, 1)[0].lower() if prelude.startswith('@') else None
+        if at_rule is None:
+            if fold.matches(prelude):
+                kept.append(f'{prelude}{{{body}}}')
+        elif at_rule.startswith(GROUPING_RULES):
+            inner = _select(body, fold, keyframes)
+            if inner:
+                kept.append(f'{prelude}{{{inner}}}')
+        elif at_rule == '@font-face':
+            kept.append(f'{prelude}{{{body}}}')
+        elif at_rule.endswith('keyframes'):
+            keyframes.append((prelude.split(None, 1)[-1].strip(), f'{prelude}{{{body}}}'))
+    return ''.join(kept)
+
+
+def _absolute_urls(css, static_path):
+    """Point relative url()s of a static CSS file at STATIC_URL, since the copy is inlined in the page."""
+    source_dir = posixpath.dirname(static_path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group()
+        return f'url({quote}{settings.STATIC_URL}{posixpath.normpath(posixpath.join(source_dir, url))}{quote})'
+
+    return bundles.URL_RE.sub(replace, css)
+
+
+def _static_name(href):
+    """Static file name behind a local ``href``, or None for other URLs."""
+    static_url = settings.STATIC_URL if settings.STATIC_URL.startswith('/') else '/' + settings.STATIC_URL
+    if not href.startswith(static_url):
+        return None
+    return href[len(static_url):].split('?')[0]
+
+
+def _read_static(name):
+    found = finders.find(name)
+    if not found:
+        raise ValueError(f"static file '{name}' not found")
+    with open(found, encoding='utf-8') as handle:
+        return handle.read()
+
+
+def page_css(soup):
+    """The page's local CSS in document order (external stylesheets are skipped)."""
+    texts = []
+    for element in soup.find_all(['link', 'style']):
+        if element.name == 'style':
+            texts.append(element.string or '')
+        elif element.find_parent('noscript') is None and (
+            'stylesheet' in element.get('rel', [])
+            # Asynchronously loaded stylesheets (vendored @font-face rules).
+            or ('preload' in element.get('rel', []) and element.get('as') == 'style')
+        ):
+            name = _static_name(element.get('href', ''))
+            if name is not None:
+                texts.append(_absolute_urls(_read_static(name), name))
+    return texts
+
+
+def extract(html):
+    """Return ``(critical_css, full_css_bytes)`` for a page rendered without bundles."""
+    fold = Fold(html)
+    full = [bundles.minify('css', text) for text in page_css(fold.soup)]
+    keyframes = []
+    critical = ''.join(_select(text, fold, keyframes) for text in full)
+    used = ''.join(text for name, text in keyframes if re.search(rf'(?<![\w-]){re.escape(name)}(?![\w-])', critical))
+    return critical + used, sum(len(text) for text in full)
+
+
+def blocking_resources(html):
+    """
+    What a browser downloads before it can paint ``html``: the document up to
+    ``</head>``, ``<style>`` blocks in the body, and every ``<link
+    rel="stylesheet">``. Returns ``(contents, local_urls, external_urls)``;
+    stylesheets on other hosts are only counted.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    end = html.lower().find('</head>')
+    contents = [html[:end + len('</head>')] if end >= 0 else html]
+    local, external = [], []
+    if soup.body is not None:
+        contents += [style.string or '' for style in soup.body.find_all('style')]
+    for link in soup.find_all('link'):
+        if (
+            'stylesheet' not in link.get('rel', [])
+            or link.find_parent('noscript') is not None
+            or link.get('media', 'all') not in ('all', 'screen')
+        ):
+            continue
+        name = _static_name(link.get('href', ''))
+        if name is None:
+            external.append(link.get('href', ''))
+        else:
+            local.append(link['href'])
+            contents.append(_read_static(name))
+    return [content.encode('utf-8') for content in contents], local, external
+
+
+def fetch(url, **overrides):
+    """
+    Render ``url`` in-process for an anonymous visitor, bypassing the page
+    cache and 304s. Static URLs are left unhashed so they can be read back
+    through the staticfiles finders.
+    """
+    from django.test import Client, override_settings
+
+    storages = {**settings.STORAGES, 'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    }}
+    with override_settings(
+        ALLOWED_HOSTS=['testserver'], PAGE_CACHE_ENABLED=False, CONDITIONAL_PAGES_ENABLED=False,
+        STORAGES=storages, **overrides,
+    ):
+        response = Client().get(url, secure=True)
+    if response.status_code != 200:
+        raise ValueError(f"{url} answered {response.status_code}")
+    return response.content.decode(response.charset or 'utf-8')
+
+
+def save(entries):
+    """Write ``{template: {'css': ..., ...}}`` as the critical CSS manifest."""
+    global _critical
+    path = manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps({'templates': entries}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, path)
+    _critical = None
@@ -0,0 +1,249 @@
+"""
+Offline recompression of the JPEG/PNG files under STATICFILES_DIRS and in the
+default (media) storage, run with ``python manage.py optimize_images``.
+
+``optimize`` works on bytes only, so the command can spread it over a process
+pool:
+
+* JPEG is re-encoded as progressive with optimized Huffman tables. It keeps the
+  file's own quantization tables and subsampling, so pixels only change by
+  rounding. ``--jpeg-quality`` picks a fixed quality instead. A JPEG comment
+  marks the output so later runs do not re-encode it again.
+* PNG is re-encoded losslessly, as an exact palette when it has no alpha and
+  at most 256 colours.
+
+A result replaces the original only if it is smaller. Static images that the
+templates show with the ``static_picture`` tag are also scaled down to
+``DISPLAY_DENSITY`` times the ``width``/``height`` the tag is given, written
+next to the original as ``<stem>.<W>x<H><ext>`` (the original is kept at
+full size), and get a ``.webp`` sibling of the served file (lossless for PNG)
+when it is smaller. ``STATIC_IMAGE_MANIFEST`` records the siblings, and the
+tag serves them through ``<picture>``. Uploaded images get their WebP/AVIF variants from
+core/images.py, as they do on upload.
+"""
+import json
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from PIL import Image, ImageOps, JpegImagePlugin, UnidentifiedImageError
+
+EXTENSIONS = {'.jpg': 'JPEG', '.jpeg': 'JPEG', '.png': 'PNG'}
+
+MARKER = b'optimize_images'
+
+# Already compressed as well as we would; browsers sniff them despite the extension.
+MODERN_FORMATS = {'WEBP', 'AVIF'}
+
+WEBP_QUALITY = 85
+
+# Static pictures keep this many pixels per CSS pixel of their displayed size (high-DPI screens).
+DISPLAY_DENSITY = 2
+
+STATIC_PICTURE_RE = re.compile(r'{%\s*static_picture\s+(["\'])(?P<name>[^"\']+)\1(?P<args>.*?)%}', re.S)
+SIZE_ARG_RE = re.compile(r'\b(width|height)=["\']?(\d+)')
+
+# Scaled-down copies written next to their original, e.g. images/logo.220x100.png.
+RESIZED_RE = re.compile(r'\.\d+x\d+\.(?:jpe?g|png)$', re.I)
+
+_manifest = None
+
+
+def manifest_path():
+    return Path(getattr(settings, 'STATIC_IMAGE_MANIFEST', settings.BASE_DIR / 'static_images.json'))
+
+
+def load_manifest():
+    """``{static name: {'webp': name, ...}}`` from the last run (read once per process)."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(manifest_path(), encoding='utf-8') as handle:
+                _manifest = json.load(handle)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def siblings_for(name):
+    """``(resized, webp)`` static names recorded for ``name``; either may be None."""
+    entry = load_manifest().get('images', {}).get(name, {})
+    return entry.get('resized'), entry.get('webp')
+
+
+def save_manifest(images):
+    global _manifest
+    path = manifest_path()
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps({'images': images}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, path)
+    _manifest = None
+
+
+def is_image(name):
+    return PurePosixPath(name).suffix.lower() in EXTENSIONS
+
+
+def is_resized(name):
+    return bool(RESIZED_RE.search(name))
+
+
+def webp_name(name):
+    return f'{name}.webp'
+
+
+def resized_name(name, size):
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}.{size[0]}x{size[1]}{path.suffix}'))
+
+
+def static_pictures(texts):
+    """
+    ``{static name: (max width, max height)}`` of the images ``texts`` show
+    with {% static_picture %}. A bound is None unless every use declares it.
+    """
+    sizes = {}
+    for text in texts:
+        for match in STATIC_PICTURE_RE.finditer(text):
+            declared = dict(SIZE_ARG_RE.findall(match.group('args')))
+            bounds = tuple(int(declared[side]) * DISPLAY_DENSITY if side in declared else None for side in ('width', 'height'))
+            previous = sizes.setdefault(match.group('name'), bounds)
+            sizes[match.group('name')] = tuple(
+                max(old, new) if old is not None and new is not None else None for old, new in zip(previous, bounds)
+            )
+    return sizes
+
+
+# =========================
+# WORKER
+# =========================
+
+def _fit(image, max_size):
+    """``image`` upright and scaled down to ``max_size`` (either side may be None), or None if it fits."""
+    pixels = ImageOps.exif_transpose(image)
+    max_width, max_height = max_size
+    scale = min(
+        max_width / pixels.width if max_width else 1,
+        max_height / pixels.height if max_height else 1,
+    )
+    if scale >= 1:
+        return None
+    size = (max(1, round(pixels.width * scale)), max(1, round(pixels.height * scale)))
+    return pixels.resize(size, Image.LANCZOS)
+
+
+def _jpeg(image, quality, pixels=None):
+    options = {'optimize': True, 'progressive': True, 'comment': MARKER}
+    icc = image.info.get('icc_profile')
+    if icc:
+        options['icc_profile'] = icc
+    if quality is None:
+        options.update(qtables=image.quantization, subsampling=JpegImagePlugin.get_sampling(image))
+    else:
+        options['quality'] = quality
+    # EXIF is dropped, so bake the orientation into the pixels.
+    if pixels is None:
+        pixels = ImageOps.exif_transpose(image)
+    output = BytesIO()
+    pixels.save(output, 'JPEG', **options)
+    return output.getvalue()
+
+
+def _png(image, pixels=None):
+    if pixels is None:
+        pixels = image
+    candidates = [pixels]
+    if pixels.mode == 'RGB':
+        colors = pixels.getcolors(256)
+        if colors:
+            palette = Image.new('P', (1, 1))
+            palette.putpalette([channel for _, color in colors for channel in color])
+            indexed = pixels.quantize(palette=palette, dither=Image.Dither.NONE)
+            if indexed.convert('RGB').tobytes() == pixels.tobytes():
+                candidates.append(indexed)
+    outputs = []
+    for candidate in candidates:
+        output = BytesIO()
+        candidate.save(output, 'PNG', optimize=True, icc_profile=image.info.get('icc_profile'))
+        outputs.append(output.getvalue())
+    return min(outputs, key=len)
+
+
+def _webp(image, lossless):
+    output = BytesIO()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if image.has_transparency_data else 'RGB')
+    if lossless:
+        image.save(output, 'WEBP', lossless=True, quality=100, method=6)
+    else:
+        image.save(output, 'WEBP', quality=WEBP_QUALITY, method=6)
+    return output.getvalue()
+
+
+def optimize(name, data, jpeg_quality=None, make_webp=False, max_size=None):
+    """
+    Recompress one image and, if it is larger than ``max_size``
+    (``(width, height)``, either may be None), a scaled-down copy of it.
+    Returns ``{'name', 'size', 'optimized', 'resized', 'resized_size',
+    'webp', 'note', 'error'}`` where ``optimized``/``resized``/``webp`` are
+    bytes, or None when they are not smaller. The WebP is of the resized copy
+    when there is one.
+    """
+    result = {
+        'name': name, 'size': len(data), 'optimized': None, 'resized': None, 'resized_size': None,
+        'webp': None, 'note': None, 'error': None,
+    }
+    try:
+        image = Image.open(BytesIO(data))
+        image.load()
+        if image.format in MODERN_FORMATS:
+            result['note'] = f"already {image.format}, left as is"
+            return result
+        if image.format == 'JPEG':
+            if image.info.get('comment') != MARKER or jpeg_quality is not None:
+                result['optimized'] = _jpeg(image, jpeg_quality)
+        elif image.format == 'PNG':
+            result['optimized'] = _png(image)
+        else:
+            raise ValueError(f"{image.format} data in a {PurePosixPath(name).suffix} file")
+        if result['optimized'] is not None and len(result['optimized']) >= len(data):
+            result['optimized'] = None
+        served = len(result['optimized'] or data)
+        pixels = _fit(image, max_size) if max_size else None
+        if pixels is not None:
+            resized = _jpeg(image, jpeg_quality, pixels) if image.format == 'JPEG' else _png(image, pixels)
+            if len(resized) < served:
+                result.update(resized=resized, resized_size=pixels.size)
+                result['note'] = f"resized to {pixels.width}x{pixels.height}"
+                served = len(resized)
+            else:
+                pixels = None
+        if make_webp:
+            webp = _webp(pixels if pixels is not None else ImageOps.exif_transpose(image), lossless=image.format == 'PNG')
+            result['webp'] = webp if len(webp) < served else None
+    except UnidentifiedImageError:
+        result['error'] = 'not a readable image'
+    except (OSError, ValueError, Image.DecompressionBombError) as exc:
+        result['error'] = str(exc)
+    return result
+
+
+def run(jobs, workers):
+    """
+    Apply ``optimize`` to ``jobs`` (an iterable of its argument tuples) on
+    ``workers`` processes, yielding results as they finish. Only a few jobs
+    are in flight at once, so large media libraries are not held in memory.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for job in jobs:
+            pending.add(pool.submit(optimize, *job))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
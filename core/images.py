@@ -0,0 +1,320 @@
+"""
+Responsive image derivatives for uploaded images.
+
+When one of the ``IMAGE_FIELDS`` receives a new upload, the save queues a
+``DerivativeJob`` and ``python manage.py run_upload_jobs`` resizes the image
+outside the request: Pillow scales it into the ``WIDTHS`` buckets (never
+upscaling) in every format of ``formats()`` (AVIF when Pillow supports it,
+then WebP), and the results are saved next to the originals under
+``derivatives/`` in the default storage (Supabase S3 or the filesystem). A
+``ResponsiveImage`` row records which variants exist; ``variants_for`` serves
+that lookup from the cache, and the ``responsive_image`` template tag turns it
+into ``<picture>`` sources with ``srcset``/``sizes``. Until the job has run,
+the tag falls back to the original.
+
+Replacing, clearing or deleting an image queues the removal of the old
+name's variants, unless another image field still points at it.
+
+Existing uploads are processed with ``python manage.py build_image_derivatives``.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+
+DERIVATIVE_DIR = 'derivatives'
+
+# Preferred first: browsers take the first <source> type they support.
+FORMAT_OPTIONS = {
+    'avif': {'mime': 'image/avif', 'save': {'quality': 60}},
+    'webp': {'mime': 'image/webp', 'save': {'quality': 80, 'method': 4}},
+}
+
+IMAGE_FIELDS = {
+    'core.CarouselImage': ['image'],
+    'core.RTNotice': ['image'],
+    'core.ImpactStory': ['image'],
+    'team.TeamMember': ['photo'],
+    'projects.ResearchProject': ['image'],
+    'publications.Publication': ['cover_image'],
+}
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def formats():
+    """Configured derivative formats that this Pillow build can encode."""
+    wanted = getattr(settings, 'IMAGE_DERIVATIVE_FORMATS', list(FORMAT_OPTIONS))
+    return [fmt for fmt in wanted if fmt in FORMAT_OPTIONS and features.check(fmt)]
+
+
+def _cache_key(source):
+    return 'responsive_image:' + hashlib.md5(source.encode()).hexdigest()
+
+
+def derivative_name(source, width, fmt):
+    path = PurePosixPath(source)
+    return str(PurePosixPath(DERIVATIVE_DIR, path.parent, f'{path.stem}-{width}w.{fmt}'))
+
+
+def target_widths(original_width):
+    """Width buckets below the original, plus the original (capped at the largest bucket)."""
+    widths = [width for width in WIDTHS if width < original_width]
+    widths.append(min(original_width, WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _prepare(image):
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info)
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+
+def generate(source, storage=None, force=False):
+    """
+    Create the variants of one stored image and record them. Returns the
+    ``ResponsiveImage``, or None if the file is missing or not an image.
+    """
+    from core.models import ResponsiveImage
+
+    storage = storage or default_storage
+    existing = ResponsiveImage.objects.filter(source=source).first()
+    if existing and not force:
+        return existing
+
+    try:
+        with storage.open(source, 'rb') as handle:
+            image = _prepare(Image.open(handle))
+    except (OSError, Image.DecompressionBombError, ValueError) as exc:
+        logger.warning("Could not read image %s: %s", source, exc)
+        return None
+
+    variants = []
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in formats():
+            buffer = BytesIO()
+            resized.save(buffer, format=fmt.upper(), **FORMAT_OPTIONS[fmt]['save'])
+            name = derivative_name(source, width, fmt)
+            # Replace rather than let the storage pick a new suffixed name.
+            storage.delete(name)
+            name = storage.save(name, ContentFile(buffer.getvalue()))
+            variants.append({'format': fmt, 'width': width, 'name': name})
+
+    record, _ = ResponsiveImage.objects.update_or_create(
+        source=source,
+        defaults={'width': image.width, 'height': image.height, 'variants': variants},
+    )
+    if existing:
+        stale = {variant['name'] for variant in existing.variants} - {variant['name'] for variant in variants}
+        for name in stale:
+            storage.delete(name)
+    cache.set(_cache_key(source), variants, CACHE_TIMEOUT)
+    return record
+
+
+def variants_for(source):
+    """Recorded variants of ``source`` as ``{format: [(width, name), ...]}`` (empty if none)."""
+    key = _cache_key(source)
+    variants = cache.get(key)
+    if variants is None:
+        from core.models import ResponsiveImage
+
+        record = ResponsiveImage.objects.filter(source=source).only('variants').first()
+        variants = record.variants if record else []
+        cache.set(key, variants, CACHE_TIMEOUT)
+
+    by_format = {}
+    for variant in variants:
+        by_format.setdefault(variant['format'], []).append((variant['width'], variant['name']))
+    return {fmt: sorted(by_format[fmt]) for fmt in FORMAT_OPTIONS if fmt in by_format}
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+
+MAX_ATTEMPTS = 5
+
+# Wait this long before retrying a failed job.
+RETRY_DELAY = timedelta(minutes=1)
+
+# A running job this old belongs to a dead worker.
+STALE_AFTER = timedelta(minutes=30)
+
+
+def enqueue(source, model=None, action=None):
+    """Queue the variants of ``source`` to be built (or, with ``ACTION_DELETE``, removed)."""
+    from core.models import DerivativeJob
+
+    DerivativeJob.objects.update_or_create(source=source, defaults={
+        'model': model._meta.label if model else '',
+        'action': action or DerivativeJob.ACTION_BUILD,
+        'status': DerivativeJob.STATUS_PENDING,
+        'attempts': 0,
+        'last_error': '',
+        'queued_at': timezone.now(),
+        'started_at': None,
+    })
+
+
+def is_referenced(source):
+    """Whether any image field still points at ``source``."""
+    return any(
+        apps.get_model(label)._base_manager.filter(**{field_name: source}).exists()
+        for label, field_names in IMAGE_FIELDS.items()
+        for field_name in field_names
+    )
+
+
+def discard(source, storage=None):
+    """Delete the variants of ``source`` and their record unless an image field still uses it."""
+    from core.models import ResponsiveImage
+
+    if is_referenced(source):
+        return False
+    storage = storage or default_storage
+    records = ResponsiveImage.objects.filter(source=source)
+    variants = records.values_list('variants', flat=True).first() or []
+    records.delete()
+    cache.delete(_cache_key(source))
+    for variant in variants:
+        storage.delete(variant['name'])
+    return True
+
+
+def release_stale_jobs():
+    """Re-queue jobs whose worker died mid-way (both actions are safe to repeat)."""
+    from core.models import DerivativeJob
+
+    return DerivativeJob.objects.filter(
+        status=DerivativeJob.STATUS_RUNNING,
+        started_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status=DerivativeJob.STATUS_PENDING)
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it (or None)."""
+    from core.models import DerivativeJob
+
+    now = timezone.now()
+    with transaction.atomic():
+        queued = DerivativeJob.objects.filter(
+            Q(started_at__isnull=True) | Q(started_at__lt=now - RETRY_DELAY),
+            status=DerivativeJob.STATUS_PENDING,
+        ).order_by('queued_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        job = queued.first()
+        if job is None:
+            return None
+        job.status = DerivativeJob.STATUS_RUNNING
+        job.started_at = now
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'attempts'])
+    return job
+
+
+def run_job(job, storage=None):
+    """Build or remove the variants of one queued image. Returns True once done."""
+    from core.models import DerivativeJob
+
+    # Re-queued while running: leave the newer request in place.
+    current = DerivativeJob.objects.filter(pk=job.pk, queued_at=job.queued_at)
+    try:
+        if job.action == DerivativeJob.ACTION_DELETE:
+            discard(job.source, storage)
+            error = None
+        else:
+            error = None if generate(job.source, storage, force=True) else 'Missing or not an image'
+    except Exception as exc:
+        logger.exception("Derivative job for %s failed (attempt %s)", job.source, job.attempts)
+        current.update(
+            status=DerivativeJob.STATUS_FAILED if job.attempts >= MAX_ATTEMPTS else DerivativeJob.STATUS_PENDING,
+            last_error=str(exc)[:1000],
+        )
+        return False
+    if error:
+        current.update(status=DerivativeJob.STATUS_FAILED, last_error=error)
+        return False
+
+    current.delete()
+    if job.model:
+        # Pages rendered since the save lack the new srcset (or point at deleted files).
+        from core import page_cache
+        page_cache.invalidate_pages_for_model(apps.get_model(job.model))
+    return True
+
+
+# =========================
+# UPLOAD HOOKS
+# =========================
+
+def _track_uploads(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    field_names = IMAGE_FIELDS.get(sender._meta.concrete_model._meta.label, [])
+    # Uncommitted means a new file is about to be written by this save.
+    pending = [name for name in field_names if getattr(instance, name) and not getattr(instance, name)._committed]
+    replaced = []
+    if not instance._state.adding and any(name in pending or not getattr(instance, name) for name in field_names):
+        previous = sender._base_manager.filter(pk=instance.pk).values(*field_names).first() or {}
+        replaced = [
+            previous[name] for name in field_names
+            if previous.get(name) and (name in pending or not getattr(instance, name))
+        ]
+    instance._pending_image_derivatives = pending
+    instance._replaced_images = replaced
+
+
+def _build_uploaded(sender, instance, raw=False, **kwargs):
+    from core.models import DerivativeJob
+
+    model = sender._meta.concrete_model
+    for field_name in getattr(instance, '_pending_image_derivatives', []):
+        enqueue(getattr(instance, field_name).name, model)
+    for source in getattr(instance, '_replaced_images', []):
+        enqueue(source, model, DerivativeJob.ACTION_DELETE)
+    instance._pending_image_derivatives = []
+    instance._replaced_images = []
+
+
+def _discard_deleted(sender, instance, **kwargs):
+    from core.models import DerivativeJob
+
+    model = sender._meta.concrete_model
+    for field_name in IMAGE_FIELDS.get(model._meta.label, []):
+        field_file = getattr(instance, field_name)
+        if field_file:
+            enqueue(field_file.name, model, DerivativeJob.ACTION_DELETE)
+
+
+def connect_signals():
+    from django.db.models.signals import post_delete, post_save, pre_save
+
+    for label in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        senders = [model] + [
+            proxy for proxy in apps.get_models()
+            if proxy._meta.proxy and proxy._meta.concrete_model is model
+        ]
+        for sender in senders:
+            pre_save.connect(_track_uploads, sender=sender, dispatch_uid=f'image_uploads_{sender._meta.label}')
+            post_save.connect(_build_uploaded, sender=sender, dispatch_uid=f'image_derivatives_{sender._meta.label}')
+            post_delete.connect(_discard_deleted, sender=sender, dispatch_uid=f'image_discard_{sender._meta.label}')
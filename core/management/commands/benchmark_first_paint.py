@@ -0,0 +1,62 @@
+"""
+Measure what each public page makes the browser download before its first paint:
+  python manage.py benchmark_first_paint
+  python manage.py benchmark_first_paint --fail-above 30   # exit 1 if a page needs more than 30 KB gzipped
+
+Each page is rendered three ways: with every stylesheet as written in the
+templates ("unbundled"), with the built bundles ("bundled") and with bundles
+plus inlined critical CSS ("critical"). Blocking bytes are the document up to
+</head> plus every render-blocking stylesheet (see core.critical.blocking_resources).
+Run build_static_bundles and build_critical_css first.
+"""
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core import bundles, critical
+
+MODES = (
+    ('unbundled', {'STATIC_BUNDLES_ENABLED': False}),
+    ('bundled', {'STATIC_BUNDLES_ENABLED': True, 'CRITICAL_CSS_ENABLED': False}),
+    ('critical', {'STATIC_BUNDLES_ENABLED': True, 'CRITICAL_CSS_ENABLED': True}),
+)
+
+
+class Command(BaseCommand):
+    help = 'Reports the render-blocking bytes of each public page unbundled, bundled and with critical CSS'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--template', action='append', choices=sorted(critical.PAGES), help='Only measure this template (repeatable)')
+        parser.add_argument(
+            '--fail-above', type=float, metavar='KB',
+            help='Fail if any page needs more than this many gzipped KB before first paint in critical mode',
+        )
+
+    def handle(self, *args, **options):
+        if not bundles.load_manifest().get('bundles'):
+            self.stderr.write(self.style.WARNING("No bundles built; run build_static_bundles first."))
+        if not critical.load_manifest().get('templates'):
+            self.stderr.write(self.style.WARNING("No critical CSS built; run build_critical_css first."))
+
+        over = []
+        self.stdout.write(f"{'TEMPLATE':<28}{'MODE':<11}{'REQUESTS':>9}{'EXTERNAL':>9}{'BYTES':>10}{'GZIP':>9}")
+        for template_name in options['template'] or sorted(critical.PAGES):
+            url = reverse(critical.PAGES[template_name])
+            for mode, overrides in MODES:
+                try:
+                    contents, local, external = critical.blocking_resources(critical.fetch(url, **overrides))
+                except Exception as exc:
+                    self.stderr.write(self.style.WARNING(f"{template_name} ({mode}): skipped ({exc})"))
+                    continue
+                raw = sum(len(content) for content in contents)
+                compressed = sum(len(gzip.compress(content)) for content in contents)
+                self.stdout.write(
+                    f"{template_name:<28}{mode:<11}{len(local) + len(external):>9}{len(external):>9}"
+                    f"{raw / 1024:>9.1f}K{compressed / 1024:>8.1f}K"
+                )
+                if mode == 'critical' and options['fail_above'] is not None and compressed > options['fail_above'] * 1024:
+                    over.append(f"{template_name} ({compressed / 1024:.1f}K)")
+
+        if over:
+            raise CommandError(f"Over {options['fail_above']}K before first paint: {', '.join(over)}")
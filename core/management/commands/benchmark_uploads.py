@@ -0,0 +1,109 @@
+"""
+Compare upload strategies for large media files against a local S3 stand-in:
+  python manage.py benchmark_uploads                    # 50 MB file, 3 runs each
+  python manage.py benchmark_uploads --size-mb 200 --runs 1
+
+Starts moto's S3 server on localhost (pip install "moto[server]"; not needed
+in production) and times a single PUT, multipart uploads at several
+concurrency levels, and the part of a deferred upload that stays in the
+request (spooling to local disk). Loopback has no network latency, so the
+gap between single PUT and parallel parts is smaller than against Supabase.
+"""
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from boto3.s3.transfer import TransferConfig
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from core import uploads
+from core.storage import SupabaseMediaStorage
+
+MB = 1024 * 1024
+BUCKET = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks single-PUT, multipart and deferred uploads against a local moto S3 server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=50, help='Size of the test file')
+        parser.add_argument('--runs', type=int, default=3, help='Uploads per strategy (the median is reported)')
+        parser.add_argument('--chunk-mb', type=int, default=8, help='Multipart part size')
+        parser.add_argument('--port', type=int, default=5055, help='Port for the moto server')
+
+    def handle(self, *args, **options):
+        try:
+            from moto.server import ThreadedMotoServer
+        except ImportError:
+            raise CommandError('The benchmark needs moto: pip install "moto[server]"')
+
+        size = options['size_mb'] * MB
+        chunk = options['chunk_mb'] * MB
+        single = size + 1
+        strategies = [
+            ('single PUT', TransferConfig(multipart_threshold=single, use_threads=False)),
+            ('multipart x1', TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk, max_concurrency=1)),
+            ('multipart x4', TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk, max_concurrency=4)),
+            ('multipart x8', TransferConfig(multipart_threshold=chunk, multipart_chunksize=chunk, max_concurrency=8)),
+            ('settings', settings.AWS_S3_TRANSFER_CONFIG),
+        ]
+
+        # The moto server logs every request.
+        logging.getLogger('werkzeug').setLevel(logging.ERROR)
+        server = ThreadedMotoServer(ip_address='127.0.0.1', port=options['port'], verbose=False)
+        server.start()
+        source = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False)
+        try:
+            with source:
+                for _ in range(options['size_mb']):
+                    source.write(os.urandom(MB))
+
+            endpoint = f"http://127.0.0.1:{options['port']}"
+            self._storage(endpoint, strategies[0][1]).connection.create_bucket(Bucket=BUCKET)
+
+            self.stdout.write(f"{options['size_mb']} MB file, {options['runs']} runs, {options['chunk_mb']} MB parts")
+            self.stdout.write(f"{'STRATEGY':<16}{'SECONDS':>10}{'MB/S':>10}")
+            for label, config in strategies:
+                storage = self._storage(endpoint, config)
+                seconds = self._median(options['runs'], lambda: self._upload(storage, source.name))
+                self._report(label, seconds, size)
+
+            def spool_only():
+                with open(source.name, 'rb') as handle:
+                    path, _ = uploads.spool('benchmark.pdf', File(handle))
+                os.unlink(path)
+
+            self._report('deferred (req.)', self._median(options['runs'], spool_only), size)
+        finally:
+            os.unlink(source.name)
+            server.stop()
+
+    @staticmethod
+    def _storage(endpoint, config):
+        return SupabaseMediaStorage(
+            bucket_name=BUCKET, endpoint_url=endpoint, region_name='us-east-1',
+            access_key='benchmark', secret_key='benchmark', custom_domain=None,
+            transfer_config=config,
+        )
+
+    @staticmethod
+    def _upload(storage, path):
+        with open(path, 'rb') as handle:
+            storage.upload('benchmark.pdf', File(handle, name='benchmark.pdf'))
+
+    @staticmethod
+    def _median(runs, func):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings)
+
+    def _report(self, label, seconds, size):
+        self.stdout.write(f"{label:<16}{seconds:>10.2f}{size / MB / seconds:>10.1f}")
@@ -0,0 +1,49 @@
+"""
+Extract the above-the-fold CSS inlined on the public pages (see core/critical.py):
+  python manage.py build_critical_css                        # run after migrate
+  python manage.py build_critical_css --template home.html   # one page only
+  python manage.py build_critical_css --clear                # back to blocking stylesheets
+"""
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from core import critical
+
+
+class Command(BaseCommand):
+    help = 'Computes the critical CSS inlined in each public page (run after migrate)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template', action='append', choices=sorted(critical.PAGES),
+            help='Only rebuild this template (repeatable); others keep their current CSS',
+        )
+        parser.add_argument('--clear', action='store_true', help='Remove all critical CSS')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            critical.manifest_path().unlink(missing_ok=True)
+            self.stdout.write(self.style.SUCCESS("Critical CSS removed."))
+            return
+
+        templates = options['template'] or sorted(critical.PAGES)
+        entries = dict(critical.load_manifest().get('templates', {})) if options['template'] else {}
+        self.stdout.write(f"{'TEMPLATE':<28}{'CRITICAL':>10}{'FULL':>10}{'SHARE':>8}")
+        for template_name in templates:
+            url = reverse(critical.PAGES[template_name])
+            try:
+                html = critical.fetch(url, STATIC_BUNDLES_ENABLED=False)
+                css, full_bytes = critical.extract(html)
+            except Exception as exc:
+                # The page keeps its blocking stylesheets.
+                entries.pop(template_name, None)
+                self.stderr.write(self.style.WARNING(f"{template_name}: skipped ({exc})"))
+                continue
+            entries[template_name] = {'css': css, 'url': url}
+            share = f"{len(css) / full_bytes:.0%}" if full_bytes else '-'
+            self.stdout.write(
+                f"{template_name:<28}{len(css) / 1024:>9.1f}K{full_bytes / 1024:>9.1f}K{share:>8}"
+            )
+
+        critical.save(entries)
+        self.stdout.write(self.style.SUCCESS(f"Wrote critical CSS for {len(entries)} templates to {critical.manifest_path()}."))
@@ -0,0 +1,51 @@
+"""
+Generate responsive WebP/AVIF variants for images uploaded before the pipeline existed:
+  python manage.py build_image_derivatives                       # every image field
+  python manage.py build_image_derivatives team.TeamMember       # one model
+  python manage.py build_image_derivatives --force               # regenerate existing variants
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core import images, page_cache
+from core.models import ResponsiveImage
+
+
+class Command(BaseCommand):
+    help = 'Creates resized WebP/AVIF derivatives for existing uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', nargs='*', help=f"Model labels (default: {', '.join(images.IMAGE_FIELDS)})")
+        parser.add_argument('--force', action='store_true', help='Regenerate images that already have variants')
+
+    def handle(self, *args, **options):
+        labels = options['model'] or list(images.IMAGE_FIELDS)
+        unknown = [label for label in labels if label not in images.IMAGE_FIELDS]
+        if unknown:
+            raise CommandError(f"No image fields registered for: {', '.join(unknown)}")
+
+        self.stdout.write(f"Formats: {', '.join(images.formats()) or 'none'}")
+        done = set(ResponsiveImage.objects.values_list('source', flat=True))
+        for label in labels:
+            model = apps.get_model(label)
+            created = failed = skipped = 0
+            for field_name in images.IMAGE_FIELDS[label]:
+                sources = (
+                    model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                    .values_list(field_name, flat=True).distinct()
+                )
+                for source in sources:
+                    if source in done and not options['force']:
+                        skipped += 1
+                        continue
+                    if images.generate(source, force=options['force']):
+                        created += 1
+                        done.add(source)
+                    else:
+                        failed += 1
+                        self.stdout.write(self.style.WARNING(f"  Could not process {source}"))
+            if created:
+                page_cache.invalidate_pages_for_model(model)
+            self.stdout.write(self.style.SUCCESS(
+                f"{label}: {created} processed, {skipped} already done, {failed} failed."
+            ))
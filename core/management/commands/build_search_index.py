@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import search_index
+
+
+class Command(BaseCommand):
+    help = 'Builds the site-wide search index and publishes it to the shared cache'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        index = search_index.rebuild()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {len(index)} documents ({len(index.vocabulary)} terms) in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,143 @@
+"""
+Bundle and minify the CSS/JS marked with {% bundle %} in the templates, and
+merge the CSS bundles each page renders into one stylesheet:
+  python manage.py build_static_bundles          # run before collectstatic
+  python manage.py build_static_bundles --list   # show the bundles without writing them
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.loader_tags import BlockNode, ExtendsNode, IncludeNode
+
+from core import bundles
+from core.templatetags.bundles import BundleNode
+
+
+class Command(BaseCommand):
+    help = 'Concatenates and minifies the {% bundle %} blocks of the templates into static files (run before collectstatic)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--list', action='store_true', help='List the bundles found without building them')
+
+    def handle(self, *args, **options):
+        found, declared_in, template_names = {}, {}, []
+        backend = engines['django']
+        for name, path in self._template_files(backend):
+            template_names.append(name)
+            source = path.read_text(encoding='utf-8')
+            if '{% bundle ' not in source:
+                continue
+            try:
+                template = backend.engine.from_string(source)
+            except TemplateSyntaxError as exc:
+                raise CommandError(f"{path}: {exc}")
+            for node in template.nodelist.get_nodes_by_type(BundleNode):
+                key = (node.kind, node.name)
+                if key in found:
+                    # The same block in several templates is built once.
+                    if found[key][0] != node.source_hash:
+                        raise CommandError(
+                            f"{node.kind} bundle '{node.name}' differs between {declared_in[key]} and {path}"
+                        )
+                    continue
+                try:
+                    found[key] = (node.source_hash, bundles.pieces(node.kind, node.nodelist))
+                except ValueError as exc:
+                    raise CommandError(f"{path}: {node.kind} bundle '{node.name}': {exc}")
+                declared_in[key] = path
+
+        pages = {}
+        for name in template_names:
+            page_bundles = self._page_css_bundles(backend.engine, name)
+            # Same order and sources as the blocks the build just read.
+            if len(page_bundles) > 1 and all(found.get(('css', bundle))[0] == source for bundle, source in page_bundles):
+                pages[name] = page_bundles
+
+        if options['list']:
+            for (kind, name), (_, pieces) in sorted(found.items()):
+                self.stdout.write(f"{kind:<4}{name:<22}{len(pieces)} pieces  ({declared_in[kind, name]})")
+            for name, page_bundles in sorted(pages.items()):
+                self.stdout.write(f"page {name:<22}{' + '.join(bundle for bundle, _ in page_bundles)}")
+            return
+
+        try:
+            report = bundles.build(found, pages)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        width = max([26] + [len(kind) + len(name) + 3 for kind, name, *_ in report])
+        self.stdout.write(f"{'BUNDLE':<{width}}{'PIECES':>7}{'SOURCE':>10}{'MINIFIED':>10}{'GZIP':>9}{'BROTLI':>9}")
+        for kind, name, path, count, source_bytes, content in report:
+            data = content.encode('utf-8')
+            gzip_size, brotli_size = bundles.compressed_sizes(data)
+            self.stdout.write(
+                f"{kind + ':' + name:<{width}}{count:>7}{self._kb(source_bytes):>10}{self._kb(len(data)):>10}"
+                f"{self._kb(gzip_size):>9}{self._kb(brotli_size):>9}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(report)} bundles to {bundles.files_dir()}."))
+
+    @staticmethod
+    def _template_files(backend):
+        """``(template_name, path)`` of the project's templates."""
+        base = Path(settings.BASE_DIR).resolve()
+        for directory in backend.template_dirs:
+            directory = Path(directory).resolve()
+            if directory.is_dir() and directory.is_relative_to(base) and 'site-packages' not in directory.parts:
+                for path in sorted(directory.rglob('*.html')):
+                    yield path.relative_to(directory).as_posix(), path
+
+    def _page_css_bundles(self, engine, template_name):
+        """
+        ``[(name, source_hash), ...]`` of the CSS bundles a render of
+        ``template_name`` can reach through {% extends %}, {% block %} and
+        {% include %} with literal names, in document order. Blocks behind
+        conditions count as rendered; the merged file then just carries
+        some unused rules.
+        """
+        try:
+            template = engine.get_template(template_name)
+            overrides = {}
+            while True:
+                extends = next((node for node in template.nodelist if isinstance(node, ExtendsNode)), None)
+                if extends is None:
+                    break
+                parent = self._literal(extends.parent_name)
+                if parent is None:
+                    return []
+                for name, block in extends.blocks.items():
+                    overrides.setdefault(name, block)
+                template = engine.get_template(parent)
+            found = []
+            self._collect(engine, template.nodelist, overrides, found, {template_name})
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            return []
+        return found
+
+    def _collect(self, engine, nodelist, overrides, found, including):
+        for node in nodelist:
+            if isinstance(node, BundleNode):
+                if node.kind == 'css' and (node.name, node.source_hash) not in found:
+                    found.append((node.name, node.source_hash))
+            elif isinstance(node, BlockNode):
+                self._collect(engine, overrides.get(node.name, node).nodelist, overrides, found, including)
+            elif isinstance(node, IncludeNode):
+                name = self._literal(node.template)
+                if name is not None and name not in including:
+                    included = engine.get_template(name)
+                    self._collect(engine, included.nodelist, overrides, found, including | {name})
+            else:
+                for attr in node.child_nodelists:
+                    self._collect(engine, getattr(node, attr, None) or [], overrides, found, including)
+
+    @staticmethod
+    def _literal(expression):
+        """The value of a quoted template argument, or None for anything computed."""
+        if isinstance(expression.var, str) and not expression.filters:
+            return expression.var
+        return None
+
+    @staticmethod
+    def _kb(size):
+        return '-' if size is None else f"{size / 1024:.1f}K"
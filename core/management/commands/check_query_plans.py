@@ -0,0 +1,50 @@
+"""
+EXPLAIN every hot public query and fail on full table scans:
+  python manage.py check_query_plans                  # default threshold
+  python manage.py check_query_plans --threshold 0    # flag every scan
+  python manage.py check_query_plans --show-plans
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core import query_plans
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN on the hot public queries and fails if any does a sequential scan of a large table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threshold', type=int, default=1000,
+            help='Tables with at most this many rows may be scanned (default: 1000)',
+        )
+        parser.add_argument('--show-plans', action='store_true', help='Print each query plan')
+        parser.add_argument('query', nargs='*', help='Only check these registered queries')
+
+    def handle(self, *args, **options):
+        if not query_plans.supported():
+            self.stdout.write(self.style.WARNING(
+                f"Query plan checks are not implemented for the '{connection.vendor}' backend; skipping."
+            ))
+            return
+
+        names = options['query'] or list(query_plans.HOT_QUERIES)
+        unknown = [name for name in names if name not in query_plans.HOT_QUERIES]
+        if unknown:
+            raise CommandError(f"Unknown queries: {', '.join(unknown)}")
+
+        failures = []
+        for name in names:
+            plan, offending = query_plans.check(name, options['threshold'])
+            if offending:
+                failures.append(name)
+                scans = ', '.join(f'{table} ({rows} rows)' for table, rows in offending)
+                self.stdout.write(self.style.ERROR(f"FAIL  {name}: sequential scan of {scans}"))
+            else:
+                self.stdout.write(f"ok    {name}")
+            if options['show_plans']:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} of {len(names)} queries fall back to a sequential scan.")
+        self.stdout.write(self.style.SUCCESS(f"No sequential scans of tables above {options['threshold']} rows."))
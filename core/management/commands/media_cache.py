@@ -0,0 +1,36 @@
+"""
+Inspect or clear the local disk cache of Supabase media:
+  python manage.py media_cache                # size and hit/miss counters
+  python manage.py media_cache --clear        # delete every cached file
+"""
+from django.core.management.base import BaseCommand
+
+from core import media_cache
+
+
+class Command(BaseCommand):
+    help = 'Shows size and hit/miss counters for the local media disk cache and optionally clears it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Delete all cached files')
+        parser.add_argument('--reset-stats', action='store_true', help='Reset the hit/miss counters')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            media_cache.clear()
+            self.stdout.write(self.style.SUCCESS('All cached media files deleted.'))
+
+        files, size = media_cache.usage()
+        stats = media_cache.get_stats()
+        hits, misses = stats['hits'], stats['misses']
+        total = hits + misses
+        self.stdout.write(f"Directory:  {media_cache.cache_dir()}")
+        self.stdout.write(f"Files:      {files}")
+        self.stdout.write(f"Size:       {size / 1024 / 1024:.1f} MB of {media_cache.max_bytes() / 1024 / 1024:.0f} MB")
+        self.stdout.write(f"Hits:       {hits}")
+        self.stdout.write(f"Misses:     {misses}")
+        self.stdout.write(f"Hit ratio:  {hits / total:.1%}" if total else "Hit ratio:  -")
+
+        if options['reset_stats']:
+            media_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,191 @@
+"""
+Recompress the JPEG/PNG images of the static files and media storage (see core/image_optimizer.py):
+  python manage.py optimize_images                    # static images and uploads
+  python manage.py optimize_images --static-only      # then commit static/ and static_images.json
+  python manage.py optimize_images --media-only --workers 2
+  python manage.py optimize_images --dry-run          # report the savings without writing
+"""
+import os
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core import image_optimizer, images, vendor
+
+
+class Command(BaseCommand):
+    help = 'Losslessly recompresses static and uploaded JPEG/PNG images, and resizes and adds WebP versions of static pictures'
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument('--static-only', action='store_true', help='Only images under STATICFILES_DIRS')
+        scope.add_argument('--media-only', action='store_true', help='Only images in the default storage')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes (default: one per core)')
+        parser.add_argument(
+            '--jpeg-quality', type=int, metavar='Q',
+            help='Re-encode JPEGs at this quality instead of keeping their own tables (lossy)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be saved without writing')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError("--workers must be at least 1.")
+        if options['jpeg_quality'] is not None and not 1 <= options['jpeg_quality'] <= 95:
+            raise CommandError("--jpeg-quality must be between 1 and 95.")
+        self.options = options
+        totals = []
+        if not options['media_only']:
+            totals.append(('static', *self._static()))
+        if not options['static_only']:
+            totals.append(('media', *self._media()))
+
+        verb = 'Would save' if options['dry_run'] else 'Saved'
+        for scope, count, before, after in totals:
+            saved = before - after
+            share = f" ({saved / before:.0%})" if before else ''
+            self.stdout.write(self.style.SUCCESS(
+                f"{scope}: {count} images, {self._kb(before)} -> {self._kb(after)}. {verb} {self._kb(saved)}{share}."
+            ))
+
+    # -------------------------------------------------------------------
+    # Static files
+    # -------------------------------------------------------------------
+
+    def _static_files(self):
+        """``{static name: path}`` of the images under STATICFILES_DIRS (first directory wins, like the finders)."""
+        found = {}
+        for entry in settings.STATICFILES_DIRS:
+            prefix, root = entry if isinstance(entry, (tuple, list)) else ('', entry)
+            root = Path(root)
+            if not root.is_dir():
+                continue
+            for path in sorted(root.rglob('*')):
+                name = str(PurePosixPath(prefix, path.relative_to(root).as_posix()))
+                # Resized copies are rewritten from their original on every run.
+                if path.is_file() and image_optimizer.is_image(name) and not image_optimizer.is_resized(name):
+                    found.setdefault(name, path)
+        return found
+
+    def _static(self):
+        files = self._static_files()
+        # Only {% static_picture %} serves the siblings, and only it declares a display size.
+        pictures = image_optimizer.static_pictures(vendor.site_sources())
+        manifest = dict(image_optimizer.load_manifest().get('images', {}))
+        jobs = (
+            (name, path.read_bytes(), self.options['jpeg_quality'], name in pictures, pictures.get(name))
+            for name, path in files.items()
+        )
+        count = before = after = 0
+        for result in image_optimizer.run(jobs, self.options['workers']):
+            name, path = result['name'], files[result['name']]
+            if not self._ok(result):
+                continue
+            count += 1
+            # Compare what the browser downloads: the sibling <picture> offers, if any.
+            previous = manifest.get(name, {}) if name in pictures else {}
+            served = previous.get('webp') or previous.get('resized')
+            served_path = path.with_name(PurePosixPath(served).name) if served else None
+            before += served_path.stat().st_size if served_path and served_path.is_file() else result['size']
+            smallest = result['webp'] or result['resized'] or result['optimized']
+            after += len(smallest) if smallest is not None else result['size']
+            self._report(name, result)
+            if self.options['dry_run']:
+                continue
+            if result['optimized'] is not None:
+                path.write_bytes(result['optimized'])
+            entry = {}
+            if result['resized'] is not None:
+                entry['resized'] = image_optimizer.resized_name(name, result['resized_size'])
+                path.with_name(PurePosixPath(entry['resized']).name).write_bytes(result['resized'])
+            if result['webp'] is not None:
+                entry['webp'] = image_optimizer.webp_name(entry.get('resized', name))
+                path.with_name(PurePosixPath(entry['webp']).name).write_bytes(result['webp'])
+            for stale in set(manifest.get(name, {}).values()) - set(entry.values()):
+                path.with_name(PurePosixPath(stale).name).unlink(missing_ok=True)
+            if entry:
+                manifest[name] = entry
+            else:
+                manifest.pop(name, None)
+        if not self.options['dry_run']:
+            image_optimizer.save_manifest({name: entry for name, entry in manifest.items() if name in files})
+        return count, before, after
+
+    # -------------------------------------------------------------------
+    # Media storage
+    # -------------------------------------------------------------------
+
+    def _media_names(self, path=''):
+        directories, files = default_storage.listdir(path)
+        for filename in files:
+            name = str(PurePosixPath(path, filename)) if path else filename
+            if image_optimizer.is_image(name):
+                yield name
+        for directory in directories:
+            # Resized variants are rewritten whenever their source changes.
+            if not path and directory == images.DERIVATIVE_DIR:
+                continue
+            yield from self._media_names(str(PurePosixPath(path, directory)) if path else directory)
+
+    def _media(self):
+        def jobs():
+            for name in self._media_names():
+                with default_storage.open(name, 'rb') as handle:
+                    yield name, handle.read(), self.options['jpeg_quality'], False
+
+        count = before = after = 0
+        for result in image_optimizer.run(jobs(), self.options['workers']):
+            if not self._ok(result):
+                continue
+            count += 1
+            before += result['size']
+            after += len(result['optimized']) if result['optimized'] else result['size']
+            self._report(result['name'], result)
+            if result['optimized'] is not None and not self.options['dry_run']:
+                self._replace(result['name'], result['optimized'])
+        return count, before, after
+
+    def _replace(self, name, data):
+        try:
+            path = default_storage.path(name)
+        except NotImplementedError:
+            path = None
+        if path:
+            temporary = f'{path}.optimizing'
+            with open(temporary, 'wb') as handle:
+                handle.write(data)
+            os.replace(temporary, path)
+            return
+        # Remote storages here overwrite in place (file_overwrite).
+        saved = default_storage.save(name, ContentFile(data))
+        if saved != name:
+            default_storage.delete(saved)
+            self.stdout.write(self.style.WARNING(f"  {name}: storage does not overwrite; left unchanged"))
+
+    # -------------------------------------------------------------------
+
+    def _ok(self, result):
+        if result['error']:
+            self.stdout.write(self.style.WARNING(f"  Could not process {result['name']}: {result['error']}"))
+            return False
+        return True
+
+    def _report(self, name, result):
+        if self.options['verbosity'] < 2:
+            return
+        parts = [f"{self._kb(result['size'])}"]
+        if result['note']:
+            parts.append(result['note'])
+        if result['optimized'] is not None:
+            parts.append(f"-> {self._kb(len(result['optimized']))}")
+        if result['resized'] is not None:
+            parts.append(f"resized {self._kb(len(result['resized']))}")
+        if result['webp'] is not None:
+            parts.append(f"webp {self._kb(len(result['webp']))}")
+        self.stdout.write(f"  {name}: {' '.join(parts)}")
+
+    @staticmethod
+    def _kb(size):
+        return f"{size / 1024:.1f}K"
@@ -0,0 +1,42 @@
+"""
+Inspect or clear the public page cache:
+  python manage.py page_cache            # hit/miss counters per page
+  python manage.py page_cache --clear    # evict every cached page
+"""
+from django.core.management.base import BaseCommand
+
+from core import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Shows hit/miss counters for the public page cache and optionally clears it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help='Evict all cached pages')
+        parser.add_argument('--reset-stats', action='store_true', help='Reset the hit/miss counters')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            page_cache.invalidate_all()
+            self.stdout.write(self.style.SUCCESS('All cached pages evicted.'))
+
+        stats = page_cache.get_stats()
+        self.stdout.write(f"{'PAGE':<22}{'HITS':>10}{'MISSES':>10}{'HIT RATIO':>12}")
+        total_hits = total_misses = 0
+        for page, counters in stats.items():
+            hits, misses = counters['hits'], counters['misses']
+            total_hits += hits
+            total_misses += misses
+            self.stdout.write(f"{page:<22}{hits:>10}{misses:>10}{self._ratio(hits, misses):>12}")
+        self.stdout.write(
+            f"{'TOTAL':<22}{total_hits:>10}{total_misses:>10}{self._ratio(total_hits, total_misses):>12}"
+        )
+
+        if options['reset_stats']:
+            page_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
+
+    @staticmethod
+    def _ratio(hits, misses):
+        total = hits + misses
+        return f"{hits / total:.1%}" if total else '-'
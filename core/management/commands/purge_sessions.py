@@ -0,0 +1,32 @@
+"""
+Delete expired rows from django_session (schedule it, e.g. daily via cron or Task Scheduler):
+  python manage.py purge_sessions
+  python manage.py purge_sessions --batch-size 1000 --dry-run
+"""
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired sessions from the database in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per statement')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired sessions')
+
+    def handle(self, *args, **options):
+        expired = Session.objects.filter(expire_date__lt=timezone.now())
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} expired sessions would be deleted.")
+            return
+
+        # Short batches keep each DELETE from locking the table for long.
+        deleted = 0
+        while True:
+            keys = list(expired.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions."))
@@ -0,0 +1,58 @@
+"""
+Send deferred media uploads (large publication PDFs) to storage and build or
+remove the responsive variants of uploaded images:
+  python manage.py run_upload_jobs            # run forever, polling for new jobs
+  python manage.py run_upload_jobs --once     # process what is queued now and exit
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import images, uploads
+
+
+class Command(BaseCommand):
+    help = 'Uploads spooled media files to storage and builds image variants outside the request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                released = uploads.release_stale_uploads()
+                if released:
+                    self.stdout.write(self.style.WARNING(f"Re-queued {released} stale uploads."))
+                released = images.release_stale_jobs()
+                if released:
+                    self.stdout.write(self.style.WARNING(f"Re-queued {released} stale derivative jobs."))
+
+                upload = uploads.claim_next_upload()
+                if upload is not None:
+                    started = time.monotonic()
+                    if uploads.run_upload(upload):
+                        elapsed = time.monotonic() - started
+                        rate = upload.size / 1024 / 1024 / elapsed if elapsed > 0 else 0
+                        self.stdout.write(self.style.SUCCESS(
+                            f"Uploaded {upload.name} ({upload.size / 1024 / 1024:.1f} MB, {rate:.1f} MB/s)"
+                        ))
+                    else:
+                        self.stdout.write(self.style.ERROR(f"Upload of {upload.name} failed (attempt {upload.attempts})."))
+                    continue
+
+                job = images.claim_next_job()
+                if job is not None:
+                    if images.run_job(job):
+                        self.stdout.write(self.style.SUCCESS(f"{job.get_action_display()}: {job.source}"))
+                    else:
+                        self.stdout.write(self.style.ERROR(
+                            f"{job.get_action_display()} failed for {job.source} (attempt {job.attempts})."
+                        ))
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,58 @@
+"""
+Self-host the fonts, CSS and JS the templates load from CDNs (see core/vendor.py):
+  python manage.py vendor_assets                    # writes static/vendor/; commit the result
+  python manage.py vendor_assets --only bootstrap   # Bootstrap, its JS and Bootstrap Icons
+  python manage.py vendor_assets --only fonts       # Inter
+  python manage.py vendor_assets --list             # what is vendored and how big
+Run it again after adding Bootstrap classes, icons, font weights or new characters to the templates.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import vendor
+
+STEPS = {
+    # Bootstrap first: the weights its slimmed CSS still uses decide the fonts.
+    'bootstrap': vendor.vendor_bootstrap,
+    'fonts': vendor.vendor_inter,
+}
+
+
+class Command(BaseCommand):
+    help = 'Downloads and slims down the CDN fonts, CSS and JS into static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(STEPS), action='append', help='Vendor only these assets (repeatable)')
+        parser.add_argument('--list', action='store_true', help='Show the vendored files without downloading')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            assets = vendor.load_manifest().get('assets', {})
+            if not assets:
+                self.stdout.write("Nothing vendored yet.")
+            for name, entry in sorted(assets.items()):
+                for kind, paths in sorted(entry.items()):
+                    for path in paths:
+                        self.stdout.write(f"{name:<18}{kind:<9}{path:<52}{self._kb(self._size(path)):>9}")
+            return
+
+        self.stdout.write(f"{'FILE':<52}{'ORIGINAL':>10}{'VENDORED':>10}")
+        for name in [step for step in STEPS if not options['only'] or step in options['only']]:
+            try:
+                assets, report = STEPS[name]()
+            except ImportError as exc:
+                raise CommandError(f"{exc}. Install fonttools, Brotli, rcssmin and requests (requirements.txt).")
+            except Exception as exc:
+                raise CommandError(f"Vendoring {name} failed: {exc}")
+            for path, downloaded in report:
+                self.stdout.write(f"{path:<52}{self._kb(downloaded):>10}{self._kb(self._size(path)):>10}")
+            vendor.save_manifest(assets)
+        self.stdout.write(self.style.SUCCESS(f"Vendored assets written to {vendor.vendor_dir()}; commit them with the code."))
+
+    @staticmethod
+    def _size(path):
+        file = vendor.vendor_dir().parent / path
+        return file.stat().st_size if file.exists() else None
+
+    @staticmethod
+    def _kb(size):
+        return '-' if size is None else f"{size / 1024:.1f}K"
@@ -0,0 +1,169 @@
+"""
+Media delivery for deployments that keep uploads on local disk.
+
+``serve_media`` resolves the requested path inside ``MEDIA_ROOT`` and
+refuses anything outside it, hidden files and directories. When
+``MEDIA_ACCEL_REDIRECT`` is set (nginx in front, see nginx.conf), the
+response is an empty ``X-Accel-Redirect`` to that internal location and
+nginx streams the file, so no server thread is held for the transfer.
+Without a proxy the file is streamed by Django, with ETag/Last-Modified
+validators and single byte-range support.
+
+``serve_pending_upload`` does the same for deferred Supabase uploads that
+are still spooled on local disk (core/uploads.py).
+"""
+import re
+from pathlib import Path
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, parse_etags, parse_http_date_safe
+
+from core import uploads
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Matches the "expires 30d" nginx applies to media.
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+
+def resolve_media_path(path):
+    """Return the file for a /media/ URL path, or raise Http404."""
+    root = Path(settings.MEDIA_ROOT).resolve()
+    parts = [part for part in path.replace('\\', '/').split('/') if part]
+    if not parts or any(part.startswith('.') for part in parts):
+        raise Http404("Media file not found")
+    full_path = root.joinpath(*parts).resolve()
+    if root not in full_path.parents or not full_path.is_file():
+        raise Http404("Media file not found")
+    return full_path
+
+
+def _etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _max_age():
+    return getattr(settings, 'MEDIA_CACHE_MAX_AGE', DEFAULT_MAX_AGE)
+
+
+def accel_redirect_response(relative_path):
+    location = settings.MEDIA_ACCEL_REDIRECT.rstrip('/') + '/' + quote(relative_path)
+    response = HttpResponse()
+    # Let nginx pick the type from its mime.types for the internal location.
+    del response['Content-Type']
+    response['X-Accel-Redirect'] = location
+    return response
+
+
+class _FileRange:
+    """File-like view of ``length`` bytes of ``handle`` starting at ``start``."""
+
+    def __init__(self, handle, start, length):
+        handle.seek(start)
+        self.handle = handle
+        # FileResponse derives Content-Type from the name.
+        self.name = handle.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.handle.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.handle.close()
+
+
+def _requested_range(request, size, etag, last_modified):
+    """
+    Return ``(start, end)`` of a satisfiable single byte range, None to send
+    the whole file, or False if the range cannot be satisfied.
+    """
+    header = request.META.get('HTTP_RANGE', '').strip()
+    match = RANGE_RE.match(header)
+    if not match or match.group(1) == match.group(2) == '':
+        # Absent, malformed or multi-range requests get the whole file.
+        return None
+
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range:
+        if if_range.startswith(('"', 'W/')):
+            if etag not in parse_etags(if_range):
+                return None
+        elif parse_http_date_safe(if_range) != last_modified:
+            return None
+
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the final N bytes.
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def file_response(request, full_path):
+    stat = full_path.stat()
+    etag = _etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = _requested_range(request, stat.st_size, etag, last_modified)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+        elif byte_range is None:
+            response = FileResponse(open(full_path, 'rb'))
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(_FileRange(open(full_path, 'rb'), start, length), status=206)
+            response['Content-Length'] = str(length)
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, public=True, max_age=_max_age())
+    return response
+
+
+def serve_media(request, path):
+    """Serve an uploaded file from MEDIA_ROOT, handing the transfer to nginx when configured."""
+    full_path = resolve_media_path(path)
+    if getattr(settings, 'MEDIA_ACCEL_REDIRECT', ''):
+        return accel_redirect_response(full_path.relative_to(Path(settings.MEDIA_ROOT).resolve()).as_posix())
+    return file_response(request, full_path)
+
+
+def serve_pending_upload(request, path):
+    """Serve a deferred upload from the spool until it is in storage, then redirect there."""
+    spooled = uploads.spooled_path(path)
+    if spooled:
+        try:
+            response = file_response(request, Path(spooled))
+        except FileNotFoundError:
+            pass  # Uploaded in the meantime.
+        else:
+            # The URL redirects once the upload is done, so caches must revalidate.
+            response['Cache-Control'] = 'no-cache'
+            response['Content-Disposition'] = content_disposition_header(False, Path(path).name)
+            return response
+    if not uploads.matches(path):
+        raise Http404("Media file not found")
+    return redirect(default_storage.url(path))
@@ -0,0 +1,213 @@
+"""
+Size-bounded local disk cache for remote media objects.
+
+Each object is stored as ``<MEDIA_DISK_CACHE_DIR>/<xx>/<sha1(name)>-<etag>``,
+so a changed object (new ETag) never matches a stale copy. The ETag last
+seen for a name is kept in the shared Django cache for
+``MEDIA_DISK_CACHE_REVALIDATE`` seconds; after that the next read asks the
+origin again (a HEAD request). Hits refresh the file's mtime. A running
+total of the cached bytes is kept in the shared cache too, so a miss only
+scans the directory when it takes the total past ``MEDIA_DISK_CACHE_MAX_BYTES``;
+the least recently used files are then removed and the total re-measured.
+Files still being written carry ``TEMP_SUFFIX`` and are never counted or
+evicted.
+
+Used by ``core.storage.TieredMediaStorage``; ``python manage.py media_cache``
+reports size and hit ratio.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Eviction trims down to this fraction of the budget, so it does not run on every insert.
+EVICT_TO = 0.9
+
+STATS_KEYS = {'hits': 'media_cache:hits', 'misses': 'media_cache:misses'}
+
+TOTAL_KEY = 'media_cache:bytes'
+
+# The total drifts (the file cache's incr is a get-then-set), so it is re-measured this often.
+TOTAL_TIMEOUT = 60 * 60
+
+TEMP_SUFFIX = '.part'
+
+
+def cache_dir():
+    return Path(getattr(settings, 'MEDIA_DISK_CACHE_DIR', settings.BASE_DIR / '.media_cache'))
+
+
+def max_bytes():
+    return getattr(settings, 'MEDIA_DISK_CACHE_MAX_BYTES', 1024 * 1024 * 1024)
+
+
+def revalidate_after():
+    return getattr(settings, 'MEDIA_DISK_CACHE_REVALIDATE', 300)
+
+
+def _digest(name):
+    return hashlib.sha1(name.encode()).hexdigest()
+
+
+def _etag_key(name):
+    return 'media_cache:etag:' + _digest(name)
+
+
+def path_for(name, etag):
+    digest = _digest(name)
+    clean_etag = re.sub(r'[^A-Za-z0-9-]', '', etag)
+    return cache_dir() / digest[:2] / f'{digest}-{clean_etag}'
+
+
+def known_etag(name):
+    """The ETag recently seen at the origin for ``name``, or None if it must be re-checked."""
+    return cache.get(_etag_key(name))
+
+
+def remember_etag(name, etag):
+    cache.set(_etag_key(name), etag, revalidate_after())
+
+
+def lookup(name, etag):
+    """Return the cached file for ``name`` at ``etag`` (marking it recently used), or None."""
+    path = path_for(name, etag)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store(name, etag, write):
+    """
+    Create the cache file for ``name`` at ``etag`` by calling ``write(file)``
+    on a temporary file, then move it into place. Returns the path.
+    """
+    path = path_for(name, etag)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    discard(name, keep=path)
+    with tempfile.NamedTemporaryFile(dir=path.parent, suffix=TEMP_SUFFIX, delete=False) as tmp:
+        try:
+            write(tmp)
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    size = os.path.getsize(tmp.name)
+    try:
+        # Another process may have stored the same version meanwhile.
+        size -= path.stat().st_size
+    except FileNotFoundError:
+        pass
+    os.replace(tmp.name, path)
+    remember_etag(name, etag)
+    _adjust_total(size)
+    if _total() > max_bytes():
+        evict()
+    return path
+
+
+def discard(name, keep=None):
+    """Remove every cached version of ``name`` (except ``keep``)."""
+    digest = _digest(name)
+    freed = 0
+    for path in (cache_dir() / digest[:2]).glob(f'{digest}-*'):
+        if path != keep and path.suffix != TEMP_SUFFIX:
+            try:
+                freed += path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    _adjust_total(-freed)
+    if keep is None:
+        cache.delete(_etag_key(name))
+
+
+def _entries():
+    """``(mtime, size, path)`` of the cached files, leaving out files still being written."""
+    root = cache_dir()
+    if not root.exists():
+        return []
+    entries = []
+    for directory in root.iterdir():
+        if not directory.is_dir():
+            continue
+        for path in directory.iterdir():
+            if path.suffix == TEMP_SUFFIX:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _total():
+    """Bytes cached, from the running total (measured again when it has expired)."""
+    total = cache.get(TOTAL_KEY)
+    if total is None:
+        total = sum(size for _, size, _ in _entries())
+        cache.set(TOTAL_KEY, total, TOTAL_TIMEOUT)
+    return total
+
+
+def _adjust_total(delta):
+    if not delta:
+        return
+    try:
+        cache.incr(TOTAL_KEY, delta)
+    except ValueError:
+        pass  # Not tracked at the moment; the next _total() measures it.
+
+
+def evict():
+    """Delete least recently used files until the cache fits its budget."""
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    budget = max_bytes()
+    removed = 0
+    if total > budget:
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= budget * EVICT_TO:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+    cache.set(TOTAL_KEY, total, TOTAL_TIMEOUT)
+    return removed
+
+
+def clear():
+    for _, _, path in _entries():
+        path.unlink(missing_ok=True)
+    cache.delete(TOTAL_KEY)
+
+
+def usage():
+    """Return ``(files, bytes)`` currently cached."""
+    entries = _entries()
+    return len(entries), sum(size for _, size, _ in entries)
+
+
+def record(kind):
+    # Best effort, like the page cache counters.
+    key = STATS_KEYS[kind]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    values = cache.get_many(list(STATS_KEYS.values()))
+    return {kind: values.get(key, 0) for kind, key in STATS_KEYS.items()}
+
+
+def reset_stats():
+    cache.delete_many(list(STATS_KEYS.values()))
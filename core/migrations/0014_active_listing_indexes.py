@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_alter_impactstory_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='carouselimage',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', '-created_at'], name='carousel_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rtnotice',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-event_date'], name='rtnotice_active_event_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['playlist_id', 'lecture_number'], name='tutorial_active_playlist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_playlist', True)), fields=['-created_date'], name='tutorial_playlist_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tutorial',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_playlist', False)), fields=['-created_date'], name='tutorial_video_date_idx'),
+        ),
+    ]
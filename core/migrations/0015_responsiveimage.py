@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_active_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponsiveImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Storage name of the original upload', max_length=500, unique=True)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('variants', models.JSONField(default=list, help_text="[{'format', 'width', 'name'}, ...]")),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Responsive Image',
+                'verbose_name_plural': 'Responsive Images',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_responsiveimage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage name the file is saved under', max_length=500, unique=True)),
+                ('file_path', models.CharField(help_text='Spooled copy on local disk', max_length=500)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Queued'), ('running', 'Uploading'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Pending Upload',
+                'verbose_name_plural': 'Pending Uploads',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='pendingupload_status_idx')],
+            },
+        ),
+    ]
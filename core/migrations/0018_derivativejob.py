@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-18 21:07
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_carouselimage_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivativeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Storage name of the original upload', max_length=500, unique=True)),
+                ('model', models.CharField(blank=True, help_text='Label of the model whose pages show the image', max_length=100)),
+                ('action', models.CharField(choices=[('build', 'Build variants'), ('delete', 'Delete variants')], default='build', max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Queued'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Derivative Job',
+                'verbose_name_plural': 'Derivative Jobs',
+                'ordering': ['queued_at'],
+                'indexes': [models.Index(fields=['status', 'queued_at'], name='derivativejob_status_idx')],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class SiteSettings(models.Model):
     """Global site settings"""
@@ -70,6 +71,9 @@ class RTNotice(models.Model):
         verbose_name = "Research & Tech Notice"
         verbose_name_plural = "Research & Tech Notices"
         ordering = ['-event_date']
+        indexes = [
+            models.Index(fields=['-event_date'], condition=models.Q(is_active=True), name='rtnotice_active_event_idx'),
+        ]
     
     def __str__(self):
         return f"[{self.notice_type}] {self.title} - {self.event_date}"
@@ -106,6 +110,25 @@ class Tutorial(models.Model):
         verbose_name = "Tutorial"
         verbose_name_plural = "Tutorials"
         ordering = ['order', '-created_date']
+        indexes = [
+            # Lectures of a playlist, in lecture order
+            models.Index(
+                fields=['playlist_id', 'lecture_number'],
+                condition=models.Q(is_active=True),
+                name='tutorial_active_playlist_idx',
+            ),
+            # Playlists and standalone videos, newest first
+            models.Index(
+                fields=['-created_date'],
+                condition=models.Q(is_active=True, is_playlist=True),
+                name='tutorial_playlist_date_idx',
+            ),
+            models.Index(
+                fields=['-created_date'],
+                condition=models.Q(is_active=True, is_playlist=False),
+                name='tutorial_video_date_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -157,11 +180,15 @@ class CarouselImage(models.Model):
     order = models.IntegerField(default=0, help_text="Display order (lower numbers first)")
     is_active = models.BooleanField(default=True, help_text="Uncheck to hide from the carousel")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Carousel Image"
         verbose_name_plural = "Carousel Images"
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['order', '-created_at'], condition=models.Q(is_active=True), name='carousel_active_order_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -219,3 +246,89 @@ class PolicyImpact(models.Model):
 
     def __str__(self):
         return f"{self.year} - {self.title}"
+
+
+class ResponsiveImage(models.Model):
+    """Resized WebP/AVIF variants generated for an uploaded image (see core/images.py)"""
+    source = models.CharField(max_length=500, unique=True, help_text="Storage name of the original upload")
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    variants = models.JSONField(default=list, help_text="[{'format', 'width', 'name'}, ...]")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Responsive Image"
+        verbose_name_plural = "Responsive Images"
+
+    def __str__(self):
+        return self.source
+
+
+class DerivativeJob(models.Model):
+    """Variants of an uploaded image queued for ``run_upload_jobs`` to build or remove (see core/images.py)"""
+    ACTION_BUILD = 'build'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_BUILD, 'Build variants'),
+        (ACTION_DELETE, 'Delete variants'),
+    ]
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    source = models.CharField(max_length=500, unique=True, help_text="Storage name of the original upload")
+    model = models.CharField(max_length=100, blank=True, help_text="Label of the model whose pages show the image")
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default=ACTION_BUILD)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    queued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Derivative Job"
+        verbose_name_plural = "Derivative Jobs"
+        ordering = ['queued_at']
+        indexes = [
+            models.Index(fields=['status', 'queued_at'], name='derivativejob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()}: {self.source} ({self.get_status_display()})"
+
+
+class PendingUpload(models.Model):
+    """A media file spooled to local disk until ``run_upload_jobs`` sends it to storage (see core/uploads.py)"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Queued'),
+        (STATUS_RUNNING, 'Uploading'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=500, unique=True, help_text="Storage name the file is saved under")
+    file_path = models.CharField(max_length=500, help_text="Spooled copy on local disk")
+    size = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Pending Upload"
+        verbose_name_plural = "Pending Uploads"
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='pendingupload_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
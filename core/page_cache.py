@@ -0,0 +1,274 @@
+"""
+Rendered-page cache for the public site.
+
+Each cached page is declared in PAGE_DEPENDENCIES together with the models
+its view reads. Saving or deleting any of those models bumps the page's
+generation token, which makes every cached copy of that page unreachable.
+Keys are built from the page name, its generation, the request path and the
+normalized ``search``/``sort`` query params. ``cache_public_page`` wraps sync
+and async views alike.
+"""
+import hashlib
+import re
+import time
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone
+
+# Page name -> model labels the page reads from.
+PAGE_DEPENDENCIES = {
+    'home': (
+        'core.HomePageStats',
+        'core.RTNotice',
+        'core.CarouselImage',
+        'workshops.Workshop',
+        'publications.Publication',
+        'projects.ResearchProject',
+        'team.TeamMember',
+    ),
+    'research_projects': ('projects.ResearchProject',),
+    'consultancy_projects': ('projects.ResearchProject',),
+    'project_detail': ('projects.ResearchProject',),
+    'team': ('team.TeamMember',),
+    'impact': (
+        'core.ImpactStory',
+        'core.ResearchHighlight',
+        'core.PolicyImpact',
+        'publications.Publication',
+    ),
+    'workshops': ('workshops.Workshop',),
+    'tutorials': ('core.Tutorial',),
+    'research_technology': ('core.RTNotice',),
+    'publications': ('publications.Publication',),
+}
+
+SORT_OPTIONS = ('latest', 'oldest', 'az', 'za', 'relevance')
+
+KEY_PREFIX = 'pagecache'
+
+# The footer contact form embeds a per-visitor CSRF token, so it is swapped
+# for a placeholder before storing and re-issued on every hit.
+CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+CSRF_PLACEHOLDER = b'__PAGE_CACHE_CSRF_TOKEN__'
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(page):
+    return f'{KEY_PREFIX}:gen:{page}'
+
+
+def _changed_key(page):
+    return f'{KEY_PREFIX}:changed:{page}'
+
+
+def _counter_key(page, kind):
+    return f'{KEY_PREFIX}:stats:{page}:{kind}'
+
+
+def get_generation(page):
+    """Return the current generation token for a page, creating one if missing."""
+    cache = get_cache()
+    generation = cache.get(_generation_key(page))
+    if generation is None:
+        generation = uuid.uuid4().hex
+        if cache.add(_generation_key(page), generation, timeout=None):
+            cache.set(_changed_key(page), time.time(), timeout=None)
+        else:
+            generation = cache.get(_generation_key(page), generation)
+    return generation
+
+
+def get_changed_at(page):
+    """Return the time (epoch seconds) the page's current generation was issued."""
+    cache = get_cache()
+    changed_at = cache.get(_changed_key(page))
+    if changed_at is None:
+        # Lost from the cache: nothing newer is known, so assume now.
+        changed_at = time.time()
+        if not cache.add(_changed_key(page), changed_at, timeout=None):
+            changed_at = cache.get(_changed_key(page), changed_at)
+    return changed_at
+
+
+def invalidate_page(page):
+    """Evict every cached copy of a page by rotating its generation token."""
+    get_cache().set_many(
+        {_generation_key(page): uuid.uuid4().hex, _changed_key(page): time.time()},
+        timeout=None,
+    )
+
+
+def pages_for_model(model):
+    """Return the names of pages that read from the given model (or proxy)."""
+    label = model._meta.concrete_model._meta.label
+    return [page for page, labels in PAGE_DEPENDENCIES.items() if label in labels]
+
+
+def invalidate_pages_for_model(model):
+    """Evict all pages depending on a model.
+
+    Signals cover regular saves and deletes; call this directly after
+    ``QuerySet.update()``, ``bulk_create()`` or ``bulk_update()``.
+    """
+    pages = pages_for_model(model)
+    for page in pages:
+        invalidate_page(page)
+    return pages
+
+
+def invalidate_all():
+    for page in PAGE_DEPENDENCIES:
+        invalidate_page(page)
+
+
+def _increment(page, kind):
+    # Counters are best effort: the file cache does not increment atomically.
+    cache = get_cache()
+    key = _counter_key(page, kind)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    """Return ``{page: {'hits': n, 'misses': n}}`` for every cached page."""
+    cache = get_cache()
+    keys = [_counter_key(page, kind) for page in PAGE_DEPENDENCIES for kind in ('hits', 'misses')]
+    values = cache.get_many(keys)
+    return {
+        page: {
+            'hits': values.get(_counter_key(page, 'hits'), 0),
+            'misses': values.get(_counter_key(page, 'misses'), 0),
+        }
+        for page in PAGE_DEPENDENCIES
+    }
+
+
+def reset_stats():
+    get_cache().delete_many(
+        [_counter_key(page, kind) for page in PAGE_DEPENDENCIES for kind in ('hits', 'misses')]
+    )
+
+
+def build_key(request, page, extra_params=()):
+    """Return the cache key for a request, or None if it should bypass the cache."""
+    sort_by = request.GET.get('sort', 'latest')
+    if sort_by not in SORT_OPTIONS:
+        return None
+
+    parts = [
+        request.path,
+        timezone.localdate().isoformat(),
+        'search=' + request.GET.get('search', '').strip(),
+        'sort=' + sort_by,
+    ]
+    parts.extend(f'{param}={request.GET.get(param, "")}' for param in extra_params)
+    digest = hashlib.md5('\n'.join(parts).encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:page:{page}:{get_generation(page)}:{digest}'
+
+
+def _cacheable(request):
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True) and request.method in ('GET', 'HEAD')
+
+
+def _lookup(request, page, extra_params):
+    """``(key, cached response or None)``; the key is None when the request bypasses the cache."""
+    key = build_key(request, page, extra_params)
+    if key is None:
+        return None, None
+    cached = get_cache().get(key)
+    if cached is None:
+        _increment(page, 'misses')
+        return key, None
+    _increment(page, 'hits')
+    content_type, content = cached
+    token = get_token(request).encode('ascii')
+    response = HttpResponse(content.replace(CSRF_PLACEHOLDER, token), content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return key, response
+
+
+def _store(key, response):
+    if response.status_code == 200 and not response.streaming:
+        content = CSRF_INPUT_RE.sub(rb'\g<1>' + CSRF_PLACEHOLDER + rb'\g<2>', response.content)
+        get_cache().set(
+            key,
+            (response['Content-Type'], content),
+            getattr(settings, 'PAGE_CACHE_TIMEOUT', 3600),
+        )
+        response['X-Page-Cache'] = 'MISS'
+    return response
+
+
+def cache_public_page(page, extra_params=()):
+    """
+    Cache the rendered response of a public view under ``page``.
+
+    Only anonymous GET/HEAD requests with a known sort option are served from
+    the cache. ``extra_params`` lists further query params the view reads.
+    """
+    if page not in PAGE_DEPENDENCIES:
+        raise ValueError(f"Unknown cached page '{page}'. Add it to PAGE_DEPENDENCIES.")
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            async def _wrapped_view(request, *args, **kwargs):
+                if not _cacheable(request) or (await request.auser()).is_authenticated:
+                    return await view_func(request, *args, **kwargs)
+
+                key, response = await sync_to_async(_lookup)(request, page, extra_params)
+                if key is None:
+                    return await view_func(request, *args, **kwargs)
+                if response is None:
+                    response = await sync_to_async(_store)(key, await view_func(request, *args, **kwargs))
+                return response
+
+        else:
+            def _wrapped_view(request, *args, **kwargs):
+                if not _cacheable(request) or request.user.is_authenticated:
+                    return view_func(request, *args, **kwargs)
+
+                key, response = _lookup(request, page, extra_params)
+                if key is None:
+                    return view_func(request, *args, **kwargs)
+                if response is None:
+                    response = _store(key, view_func(request, *args, **kwargs))
+                return response
+
+        return wraps(view_func)(_wrapped_view)
+
+    return decorator
+
+
+def _model_changed(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+    invalidate_pages_for_model(sender)
+
+
+def connect_signals():
+    """Connect post_save/post_delete for every model a cached page depends on."""
+    from django.db.models.signals import post_delete, post_save
+
+    labels = {label for labels in PAGE_DEPENDENCIES.values() for label in labels}
+    for label in labels:
+        model = apps.get_model(label)
+        post_save.connect(_model_changed, sender=model, dispatch_uid=f'page_cache_save_{label}')
+        post_delete.connect(_model_changed, sender=model, dispatch_uid=f'page_cache_delete_{label}')
+        # Proxy models (e.g. the per-category Publication admins) send their own signals.
+        for proxy in apps.get_models():
+            if proxy._meta.proxy and proxy._meta.concrete_model is model:
+                post_save.connect(_model_changed, sender=proxy, dispatch_uid=f'page_cache_save_{proxy._meta.label}')
+                post_delete.connect(_model_changed, sender=proxy, dispatch_uid=f'page_cache_delete_{proxy._meta.label}')
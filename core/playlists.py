@@ -0,0 +1,101 @@
+"""
+Batched loading of tutorial playlists.
+
+A playlist is a ``Tutorial`` with ``is_playlist=True`` (the cover) plus every
+non-playlist tutorial sharing its ``playlist_id`` (the lectures).
+``PlaylistRepository`` loads any number of playlists with their lectures in
+a constant number of queries and groups them in Python.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+
+from core.models import Tutorial
+
+# sort option -> ordering, as used by the public tutorials page
+SORT_ORDERING = {
+    'latest': '-created_date',
+    'oldest': 'created_date',
+    'az': 'title',
+    'za': '-title',
+}
+
+
+@dataclass
+class PlaylistGroup:
+    playlist: Tutorial
+    lectures: list = field(default_factory=list)
+
+    @property
+    def lecture_count(self):
+        return len(self.lectures)
+
+
+class PlaylistRepository:
+    """
+    Loads playlists and their lectures.
+
+    By default only active tutorials are returned, as on the public site;
+    pass ``include_inactive=True`` for the dashboard.
+    """
+
+    def __init__(self, include_inactive=False):
+        self.include_inactive = include_inactive
+
+    def _tutorials(self):
+        if self.include_inactive:
+            return Tutorial.objects.all()
+        return Tutorial.objects.filter(is_active=True)
+
+    def lectures_by_playlist(self, playlist_ids):
+        """Return ``{playlist_id: [lectures in lecture order]}`` in a single query."""
+        playlist_ids = {playlist_id for playlist_id in playlist_ids if playlist_id}
+        grouped = defaultdict(list)
+        if not playlist_ids:
+            return grouped
+        lectures = self._tutorials().filter(
+            is_playlist=False,
+            playlist_id__in=playlist_ids,
+        ).order_by('playlist_id', 'lecture_number', 'id')
+        for lecture in lectures:
+            grouped[lecture.playlist_id].append(lecture)
+        return grouped
+
+    def playlists(self, search_query='', sort_by='latest'):
+        """Return a ``PlaylistGroup`` per playlist cover (two queries in total)."""
+        covers = self._tutorials().filter(is_playlist=True)
+        if search_query:
+            covers = covers.filter(title__icontains=search_query)
+        covers = list(covers.order_by(SORT_ORDERING.get(sort_by, SORT_ORDERING['latest'])))
+
+        lectures = self.lectures_by_playlist(cover.playlist_id for cover in covers)
+        return [PlaylistGroup(cover, lectures.get(cover.playlist_id, [])) for cover in covers]
+
+    def standalone(self, search_query='', sort_by='latest'):
+        """Return tutorials that are neither a playlist cover nor part of one."""
+        tutorials = self._tutorials().filter(is_playlist=False).filter(
+            Q(playlist_id__isnull=True) | Q(playlist_id='')
+        )
+        if search_query:
+            tutorials = tutorials.filter(title__icontains=search_query)
+        return tutorials.order_by(SORT_ORDERING.get(sort_by, SORT_ORDERING['latest']))
+
+    def groups_for(self, tutorials):
+        """
+        Return ``{playlist_id: PlaylistGroup}`` for every playlist referenced by
+        ``tutorials`` (covers and lectures alike), in a single query. Groups
+        whose cover is missing have ``playlist`` set to None.
+        """
+        playlist_ids = {tutorial.playlist_id for tutorial in tutorials if tutorial.playlist_id}
+        groups = {}
+        if not playlist_ids:
+            return groups
+        members = self._tutorials().filter(playlist_id__in=playlist_ids).order_by('lecture_number', 'id')
+        for member in members:
+            group = groups.setdefault(member.playlist_id, PlaylistGroup(None))
+            if member.is_playlist:
+                group.playlist = group.playlist or member
+            else:
+                group.lectures.append(member)
+        return groups
@@ -0,0 +1,87 @@
+"""
+Registry of the hot public querysets and a checker for their query plans.
+
+Each entry builds the same queryset a public view runs, so
+``manage.py check_query_plans`` can ``EXPLAIN`` it and flag any full table
+scan over a table larger than the allowed threshold. When a view's query
+changes shape, update its entry here together with the model's
+``Meta.indexes``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from core.models import CarouselImage, RTNotice, Tutorial
+from projects.models import ResearchProject
+from publications.models import Publication
+from publications.pagination import PAGE_SIZE, order_queryset
+from team.models import TeamMember
+from workshops.models import Workshop
+
+
+def _publications(**filters):
+    return lambda: order_queryset(Publication.objects.filter(is_active=True, **filters), 'latest')[:PAGE_SIZE + 1]
+
+
+HOT_QUERIES = {
+    'publications:all': _publications(),
+    'publications:category': _publications(category='journal'),
+    'publications:conference_scope': _publications(category='conference', scope='national'),
+    'projects:research': lambda: ResearchProject.objects.filter(is_active=True, project_type='research').order_by('-start_date'),
+    'projects:consultancy': lambda: ResearchProject.objects.filter(is_active=True, project_type='consultancy').order_by('-start_date'),
+    'workshops:latest': lambda: Workshop.objects.filter(is_active=True).order_by('-event_date'),
+    'home:workshops': lambda: Workshop.objects.filter(is_active=True).order_by('-event_date')[:6],
+    'rt_notices:latest': lambda: RTNotice.objects.filter(is_active=True).order_by('-event_date'),
+    'tutorials:playlists': lambda: Tutorial.objects.filter(is_active=True, is_playlist=True).order_by('-created_date'),
+    'tutorials:lectures': lambda: Tutorial.objects.filter(
+        is_active=True, is_playlist=False, playlist_id__in=['urban-ecosystem', 'climate-basics'],
+    ).order_by('playlist_id', 'lecture_number', 'id'),
+    'tutorials:standalone': lambda: Tutorial.objects.filter(is_active=True, is_playlist=False).filter(
+        Q(playlist_id__isnull=True) | Q(playlist_id='')
+    ).order_by('-created_date'),
+    'team:members': lambda: TeamMember.objects.filter(
+        is_active=True, category__in=['faculty', 'postgraduate', 'phd', 'alumni'],
+    ).order_by('category', 'order', 'name'),
+    'home:carousel': lambda: CarouselImage.objects.filter(is_active=True),
+}
+
+# "Seq Scan on <table>" (PostgreSQL) / "SCAN <table>" without an index (SQLite)
+_SEQ_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING (?:COVERING )?INDEX)(?:\s|$)'),
+}
+
+
+def supported():
+    return connection.vendor in _SEQ_SCAN_PATTERNS
+
+
+def sequential_scans(plan):
+    """Return the names of tables read with a full scan in ``plan``."""
+    pattern = _SEQ_SCAN_PATTERNS.get(connection.vendor)
+    if pattern is None:
+        return []
+    return sorted({match.group(1) for match in pattern.finditer(plan)})
+
+
+def table_rows(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+        return cursor.fetchone()[0]
+
+
+def check(name, threshold):
+    """
+    EXPLAIN the registered query ``name``.
+
+    Returns ``(plan, offending)`` where ``offending`` lists ``(table, rows)``
+    for every full scan of a table holding more than ``threshold`` rows.
+    """
+    plan = HOT_QUERIES[name]().explain()
+    offending = []
+    for table in sequential_scans(plan):
+        rows = table_rows(table)
+        if rows > threshold:
+            offending.append((table, rows))
+    return plan, offending
@@ -0,0 +1,480 @@
+"""
+Site-wide search over publications, projects, workshops, R&T notices,
+tutorials and team members.
+
+Every process keeps an in-memory inverted index (token -> document ids)
+with a sorted vocabulary, so a prefix lookup is a bisect plus a few set
+operations. The index is built on first use (or ahead of time with
+``manage.py build_search_index``) and published to the shared cache together
+with a version stamp; other server processes load that snapshot when the
+stamp changes instead of querying the database.
+
+Model signals do not republish the snapshot. Each save or delete appends one
+document delta to a change log in the shared cache, numbered by ``incr`` of
+``SEQUENCE_KEY``. That is atomic on Redis and Memcached; the file cache's
+``incr`` is a get-then-set, so there it runs under a file lock in the cache
+directory. On any other backend a change drops the published version
+instead, and each process rebuilds on its next lookup. Every process replays
+the deltas it has not seen, in order, on top of its copy, so concurrent saves
+in different workers never overwrite each other. A process too far behind, or
+missing a delta (evicted or never written), rebuilds from the database
+instead. Saves only log their delta; the editor's process picks it up on its
+next search like every other.
+"""
+import bisect
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import quote
+
+from django.apps import apps
+from django.core.cache import cache, caches
+from django.core.files import locks
+from django.db import transaction
+from django.urls import reverse
+
+VERSION_KEY = 'search_index:version'
+SNAPSHOT_KEY = 'search_index:snapshot'
+SEQUENCE_KEY = 'search_index:sequence'
+CHANGE_KEY = 'search_index:change:{}'
+
+# How often a process checks the shared cache for a newer index (seconds).
+VERSION_CHECK_INTERVAL = 1.0
+
+# Deltas live this long; rebuilds publish a snapshot that makes older ones moot.
+CHANGE_TIMEOUT = 24 * 60 * 60
+
+# Further behind than this, a rebuild is cheaper than replaying the log.
+MAX_REPLAY = 500
+
+# A delta whose number was taken but which is not in the cache yet is waited
+# for this long (seconds) before the process gives up and rebuilds.
+GAP_TIMEOUT = 5.0
+
+# Backends whose incr() is a single atomic operation.
+ATOMIC_INCR_BACKENDS = ('RedisCache', 'PyMemcacheCache', 'PyLibMCCache', 'LocMemCache')
+
+SEQUENCE_LOCK_FILE = 'search_index.lock'
+
+MIN_PREFIX_LENGTH = 2
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    key: tuple
+    kind: str
+    title: str
+    subtitle: str
+    url: str
+    title_tokens: frozenset
+    tokens: frozenset
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'title': self.title,
+            'subtitle': self.subtitle,
+            'url': self.url,
+        }
+
+
+def tokenize(text):
+    """Lowercase, strip accents and split ``text`` into word tokens."""
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', str(text).lower())
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return [token for token in re.findall(r'\w+', text) if len(token) > 1 or token.isdigit()]
+
+
+def _truncate(text, length=120):
+    text = ' '.join(str(text or '').split())
+    return text if len(text) <= length else text[:length - 1].rstrip() + '…'
+
+
+# =========================
+# DOCUMENT BUILDERS
+# =========================
+
+def _publication_document(pub):
+    if pub.external_link:
+        url = pub.external_link
+    elif pub.pdf_file:
+        url = pub.pdf_file.url
+    else:
+        url = f"{reverse('publications:index')}?search={quote(pub.title)}"
+    subtitle = ' · '.join(part for part in [pub.get_category_display(), pub.journal, str(pub.publication_date.year) if pub.publication_date else ''] if part)
+    return (
+        'Publication', pub.title, subtitle, url,
+        [pub.authors, pub.journal, pub.citation, pub.abstract],
+    )
+
+
+def _project_document(project):
+    return (
+        'Project', project.title, project.get_project_type_display(),
+        reverse('core:project_detail', args=[project.pk]),
+        [project.description, project.funding_agency, project.collaborators, project.partner_institutions],
+    )
+
+
+def _workshop_document(workshop):
+    url = workshop.link or f"{reverse('core:workshops')}?search={quote(workshop.title)}"
+    return ('Workshop', workshop.title, workshop.formatted_date(), url, [workshop.description])
+
+
+def _rt_notice_document(notice):
+    url = notice.link or f"{reverse('core:research_technology')}?search={quote(notice.title)}"
+    return ('Research & Technology', notice.title, notice.get_notice_type_display(), url, [notice.description])
+
+
+def _tutorial_document(tutorial):
+    return ('Tutorial', tutorial.title, 'Playlist' if tutorial.is_playlist else 'Video', tutorial.external_link, [tutorial.playlist_id])
+
+
+def _team_member_document(member):
+    return ('Team', member.name, member.role, reverse('core:team'), [member.bio])
+
+
+# Model label -> document builder. Only active rows are indexed.
+INDEXED_MODELS = {
+    'publications.Publication': _publication_document,
+    'projects.ResearchProject': _project_document,
+    'workshops.Workshop': _workshop_document,
+    'core.RTNotice': _rt_notice_document,
+    'core.Tutorial': _tutorial_document,
+    'team.TeamMember': _team_member_document,
+}
+
+
+def make_document(instance):
+    label = instance._meta.concrete_model._meta.label
+    kind, title, subtitle, url, body = INDEXED_MODELS[label](instance)
+    title_tokens = frozenset(tokenize(title))
+    body_tokens = {token for text in body for token in tokenize(text)}
+    return SearchDocument(
+        key=(label, instance.pk),
+        kind=kind,
+        title=title,
+        subtitle=_truncate(subtitle),
+        url=url,
+        title_tokens=title_tokens,
+        tokens=frozenset(body_tokens) | title_tokens,
+    )
+
+
+# =========================
+# INVERTED INDEX
+# =========================
+
+class InvertedIndex:
+    """
+    Token -> document postings with a sorted vocabulary for prefix lookups.
+
+    Postings hold small integer ids rather than ``(label, pk)`` keys so the
+    set operations in ``search`` stay cheap.
+    """
+
+    def __init__(self):
+        self.documents = {}
+        self.ids = {}
+        self.next_id = 0
+        self.sort_keys = {}
+        # (lowercased title, id) pairs in title order, for dense result tiers
+        self.ordered = []
+        self.postings = defaultdict(set)
+        self.title_postings = defaultdict(set)
+        self.kinds = defaultdict(set)
+        self.vocabulary = []
+
+    def add(self, document):
+        self.remove(document.key)
+        doc_id = self.next_id
+        self.next_id += 1
+        self.ids[document.key] = doc_id
+        self.documents[doc_id] = document
+        self.sort_keys[doc_id] = document.title.lower()
+        bisect.insort(self.ordered, (self.sort_keys[doc_id], doc_id))
+        self.kinds[document.kind].add(doc_id)
+        for token in document.tokens:
+            if token not in self.postings:
+                bisect.insort(self.vocabulary, token)
+            self.postings[token].add(doc_id)
+        for token in document.title_tokens:
+            self.title_postings[token].add(doc_id)
+
+    def remove(self, key):
+        doc_id = self.ids.pop(key, None)
+        if doc_id is None:
+            return
+        document = self.documents.pop(doc_id)
+        entry = (self.sort_keys.pop(doc_id), doc_id)
+        position = bisect.bisect_left(self.ordered, entry)
+        if position < len(self.ordered) and self.ordered[position] == entry:
+            del self.ordered[position]
+        self.kinds[document.kind].discard(doc_id)
+        for token in document.tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[token]
+                position = bisect.bisect_left(self.vocabulary, token)
+                if position < len(self.vocabulary) and self.vocabulary[position] == token:
+                    del self.vocabulary[position]
+        for token in document.title_tokens:
+            ids = self.title_postings.get(token)
+            if ids is not None:
+                ids.discard(doc_id)
+                if not ids:
+                    del self.title_postings[token]
+
+    def _expand(self, prefix):
+        """Return every vocabulary token starting with ``prefix``."""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + '\U0010ffff', start)
+        return self.vocabulary[start:end]
+
+    @staticmethod
+    def _union(postings, terms):
+        sets = [postings[term] for term in terms if term in postings]
+        if len(sets) == 1:
+            return sets[0]
+        return set().union(*sets)
+
+    def search(self, query, limit=20, kind=None):
+        """
+        Return documents containing every query token, the last one matched
+        as a prefix. Documents whose title holds every token rank first,
+        then those with some title match, then body-only matches; ties are
+        ordered by title.
+        """
+        tokens = tokenize(query)
+        if not tokens or len(tokens[-1]) < MIN_PREFIX_LENGTH and not tokens[-1].isdigit():
+            return []
+
+        candidates = None
+        title_hits = []
+        for position, token in enumerate(tokens):
+            terms = self._expand(token) if position == len(tokens) - 1 else [token]
+            matched = self._union(self.postings, terms)
+            # Never mutate ``candidates`` in place: it may be a postings set.
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+            title_hits.append(self._union(self.title_postings, terms))
+
+        if kind:
+            candidates = candidates & self.kinds.get(kind, set())
+
+        all_title = candidates.intersection(*title_hits)
+        some_title = candidates.intersection(set().union(*title_hits)) - all_title if len(title_hits) > 1 else set()
+        body_only = candidates - all_title - some_title
+
+        results = []
+        for tier in (all_title, some_title, body_only):
+            needed = limit - len(results)
+            if needed <= 0:
+                break
+            results.extend(self.documents[doc_id] for doc_id in self._first_by_title(tier, needed))
+        return results
+
+    def _first_by_title(self, ids, count):
+        if not ids:
+            return []
+        if len(ids) * 8 > len(self.ordered):
+            # Dense: walking the title-ordered list stops after a few entries.
+            found = []
+            for _, doc_id in self.ordered:
+                if doc_id in ids:
+                    found.append(doc_id)
+                    if len(found) == count:
+                        break
+            return found
+        return heapq.nsmallest(count, ids, key=self.sort_keys.__getitem__)
+
+    def __len__(self):
+        return len(self.documents)
+
+
+# =========================
+# PROCESS-LOCAL STATE
+# =========================
+
+_lock = threading.RLock()
+_state = {'index': None, 'version': None, 'sequence': 0, 'checked_at': 0.0, 'gap_since': None}
+
+
+def build_index():
+    """Build a fresh index from the database (one query per indexed model)."""
+    index = InvertedIndex()
+    for label in INDEXED_MODELS:
+        model = apps.get_model(label)
+        for instance in model.objects.filter(is_active=True).iterator():
+            index.add(make_document(instance))
+    return index
+
+
+def publish(index, sequence):
+    """Store ``index``, which includes every change up to ``sequence``, as the shared snapshot."""
+    version = uuid.uuid4().hex
+    cache.set(SNAPSHOT_KEY, (version, sequence, index), timeout=None)
+    cache.set(VERSION_KEY, version, timeout=None)
+    _state.update(index=index, version=version, sequence=sequence, checked_at=time.monotonic(), gap_since=None)
+    return version
+
+
+def rebuild():
+    with _lock:
+        # Read before the database: changes committed meanwhile are replayed on top.
+        sequence = cache.get(SEQUENCE_KEY) or 0
+        index = build_index()
+        publish(index, sequence)
+        return index
+
+
+def _replay(index, start, end):
+    """Apply the logged changes ``start + 1 .. end`` in order; return the last one applied."""
+    keys = [CHANGE_KEY.format(number) for number in range(start + 1, end + 1)]
+    changes = cache.get_many(keys)
+    applied = start
+    for key in keys:
+        if key not in changes:
+            break
+        document_key, document = changes[key]
+        if document is None:
+            index.remove(document_key)
+        else:
+            index.add(document)
+        applied += 1
+    return applied
+
+
+def get_index():
+    """
+    Return this process's index, reloading it if another process published a
+    newer snapshot and replaying the changes logged since.
+    """
+    now = time.monotonic()
+    with _lock:
+        if _state['index'] is not None and now - _state['checked_at'] < VERSION_CHECK_INTERVAL:
+            return _state['index']
+
+        values = cache.get_many([VERSION_KEY, SEQUENCE_KEY])
+        version, sequence = values.get(VERSION_KEY), values.get(SEQUENCE_KEY) or 0
+        _state['checked_at'] = now
+        if _state['index'] is None or version != _state['version']:
+            snapshot = cache.get(SNAPSHOT_KEY)
+            if snapshot is None or snapshot[0] != version:
+                return rebuild()
+            _state.update(version=version, sequence=snapshot[1], index=snapshot[2], gap_since=None)
+
+        behind = sequence - _state['sequence']
+        # A counter lower than ours was evicted and restarted.
+        if behind < 0 or behind > MAX_REPLAY:
+            return rebuild()
+        if behind:
+            _state['sequence'] = _replay(_state['index'], _state['sequence'], sequence)
+            if _state['sequence'] < sequence:
+                if _state['gap_since'] is None:
+                    _state['gap_since'] = now
+                elif now - _state['gap_since'] > GAP_TIMEOUT:
+                    return rebuild()
+            else:
+                _state['gap_since'] = None
+        return _state['index']
+
+
+def search(query, limit=20, kind=None):
+    index = get_index()
+    with _lock:
+        return index.search(query, limit=limit, kind=kind)
+
+
+# =========================
+# SIGNALS
+# =========================
+
+@contextmanager
+def _sequence_lock():
+    """Yield whether sequence numbers taken inside are unique across processes."""
+    backend = caches['default']
+    if type(backend).__name__ in ATOMIC_INCR_BACKENDS:
+        yield True
+        return
+    directory = getattr(backend, '_dir', None)
+    if directory is None:
+        yield False
+        return
+    os.makedirs(directory, exist_ok=True)
+    # Not a .djcache file, so culling and clear() leave it alone.
+    with open(os.path.join(directory, SEQUENCE_LOCK_FILE), 'ab') as handle:
+        locks.lock(handle, locks.LOCK_EX)
+        try:
+            yield True
+        finally:
+            locks.unlock(handle)
+
+
+def _record_change(key, document):
+    """
+    Append one document delta (None removes ``key``) to the shared change
+    log. Returns its number, or None if the backend cannot number it safely
+    and the published version was dropped instead.
+    """
+    with _sequence_lock() as unique:
+        if not unique:
+            cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            return None
+        cache.add(SEQUENCE_KEY, 0, timeout=None)
+        sequence = cache.incr(SEQUENCE_KEY)
+        cache.set(CHANGE_KEY.format(sequence), (key, document), timeout=CHANGE_TIMEOUT)
+    return sequence
+
+
+def _update_document(key, instance=None):
+    if instance is None or not getattr(instance, 'is_active', True):
+        document = None
+    else:
+        document = make_document(instance)
+    _record_change(key, document)
+    with _lock:
+        # Look for it on this process's next search instead of waiting out the interval.
+        _state['checked_at'] = 0.0
+
+
+def _document_key(instance):
+    return (instance._meta.concrete_model._meta.label, instance.pk)
+
+
+def _instance_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    key = _document_key(instance)
+    transaction.on_commit(lambda: _update_document(key, instance))
+
+
+def _instance_deleted(sender, instance, **kwargs):
+    # The pk is cleared once the delete finishes, so capture the key now.
+    key = _document_key(instance)
+    transaction.on_commit(lambda: _update_document(key))
+
+
+def connect_signals():
+    """Keep the index in step with saves and deletes of every indexed model (and its proxies)."""
+    from django.db.models.signals import post_delete, post_save
+
+    for label in INDEXED_MODELS:
+        model = apps.get_model(label)
+        senders = [model] + [m for m in apps.get_models() if m._meta.proxy and m._meta.concrete_model is model]
+        for sender in senders:
+            post_save.connect(_instance_saved, sender=sender, dispatch_uid=f'search_index_save_{sender._meta.label}')
+            post_delete.connect(_instance_deleted, sender=sender, dispatch_uid=f'search_index_delete_{sender._meta.label}')
@@ -0,0 +1,147 @@
+"""
+Cache-backed session engine with write suppression.
+
+Sessions live in the ``SESSION_CACHE_ALIAS`` cache. Only sessions of
+logged-in users (the dashboard) are also written through to
+``django_session``, so they survive cache eviction and restarts; anonymous
+sessions never touch the database.
+
+With ``SESSION_SAVE_EVERY_REQUEST`` Django saves the session after every
+request to slide its expiry forward. This store skips that write unless the
+session data changed or the stored expiry is more than
+``SESSION_REFRESH_THRESHOLD`` seconds old, so idle timeouts stay accurate to
+within the threshold at the cost of at most one write per threshold.
+
+Expired database rows are removed by ``python manage.py purge_sessions``.
+"""
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.backends.base import CreateError, UpdateError
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+logger = logging.getLogger('django.contrib.sessions')
+
+KEY_PREFIX = 'core.sessions'
+
+
+def refresh_threshold():
+    return getattr(settings, 'SESSION_REFRESH_THRESHOLD', 300)
+
+
+def persist_authenticated():
+    return getattr(settings, 'SESSION_PERSIST_AUTHENTICATED', True)
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = KEY_PREFIX
+
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        # What was last read or written, to tell whether a save is needed.
+        self._fingerprint = None
+        self._refreshed_at = None
+        self._in_db = False
+
+    def _fingerprint_of(self, data):
+        return self.serializer().dumps(data)
+
+    def _remember(self, data, refreshed_at, in_db):
+        self._fingerprint = self._fingerprint_of(data)
+        self._refreshed_at = refreshed_at
+        self._in_db = in_db
+
+    def _should_persist(self, data):
+        return persist_authenticated() and SESSION_KEY in data
+
+    def load(self):
+        try:
+            entry = self._cache.get(self.cache_key)
+        except Exception:
+            # Some backends raise on invalid cache keys; treat as a new session.
+            entry = None
+
+        if entry is not None:
+            self._remember(entry['data'], entry['refreshed_at'], entry['in_db'])
+            return entry['data']
+
+        # Only logged-in sessions can be recovered from the database.
+        s = self._get_session_from_db()
+        if s:
+            data = self.decode(s.session_data)
+            self._cache_entry(data, time.time(), True, self.get_expiry_age(expiry=s.expire_date))
+            return data
+        return {}
+
+    def _cache_entry(self, data, refreshed_at, in_db, timeout, must_create=False):
+        entry = {'data': data, 'refreshed_at': refreshed_at, 'in_db': in_db}
+        func = self._cache.add if must_create else self._cache.set
+        result = func(self.cache_key, entry, timeout)
+        if must_create and not result:
+            raise CreateError
+        self._remember(data, refreshed_at, in_db)
+
+    def _unchanged(self, data):
+        if self._fingerprint is None or self._fingerprint != self._fingerprint_of(data):
+            return False
+        return time.time() - self._refreshed_at < refresh_threshold()
+
+    def exists(self, session_key):
+        # Keys are 32 random characters and new rows are force-inserted, so
+        # checking the cache is enough to avoid collisions.
+        return bool(session_key) and (self.cache_key_prefix + session_key) in self._cache
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        data = self._get_session(no_load=must_create)
+        if not must_create and self._unchanged(data):
+            return
+
+        # A new key (create(), cycle_key()) has no row yet.
+        in_db = self._in_db and not must_create
+        if self._should_persist(data):
+            DBStore.save(self, must_create=must_create or not in_db)
+            in_db = True
+        elif not must_create and self._cache.get(self.cache_key) is None and not in_db:
+            # The session expired or was evicted while the request ran.
+            raise UpdateError
+
+        try:
+            self._cache_entry(data, time.time(), in_db, self.get_expiry_age(), must_create=must_create)
+        except CreateError:
+            raise
+        except Exception:
+            if not in_db:
+                raise
+            # The database copy is authoritative; the next load refills the cache.
+            logger.exception("Error saving to cache (%s)", self._cache)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._cache.delete(self.cache_key_prefix + session_key)
+        # Anonymous sessions never reach the database.
+        if session_key != self.session_key or self._in_db:
+            DBStore.delete(self, session_key)
+        if session_key == self.session_key:
+            self._fingerprint = None
+            self._in_db = False
+
+    async def aload(self):
+        return await sync_to_async(self.load)()
+
+    async def aexists(self, session_key):
+        return await sync_to_async(self.exists)(session_key)
+
+    async def asave(self, must_create=False):
+        return await sync_to_async(self.save)(must_create)
+
+    async def adelete(self, session_key=None):
+        return await sync_to_async(self.delete)(session_key)
@@ -0,0 +1,87 @@
+"""
+Content counters shared by the dashboard home, the public home page and the
+impact page.
+
+Each model is counted with a single conditional-aggregation query (total,
+active and, for publications, one count per category). The result is cached
+under a key built from the page-cache generations of every page reading a
+counted model, so any save, delete or ``invalidate_pages_for_model()`` call
+on those models also retires the cached counters. ``acontent_counts`` is the
+async variant; its queries still run one after another (see core/views.py).
+"""
+import asyncio
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.db.models import Count, Q
+
+from core import page_cache
+
+COUNTED_MODELS = (
+    'publications.Publication',
+    'projects.ResearchProject',
+    'team.TeamMember',
+    'workshops.Workshop',
+    'core.RTNotice',
+    'core.CarouselImage',
+    'core.ImpactStory',
+)
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def _aggregates(model):
+    aggregates = {
+        'total': Count('pk'),
+        'active': Count('pk', filter=Q(is_active=True)),
+    }
+    if model._meta.label == 'publications.Publication':
+        for category, _ in model.CATEGORY_CHOICES:
+            aggregates[category] = Count('pk', filter=Q(category=category))
+    return aggregates
+
+
+def _count_model(model):
+    return model.objects.aggregate(**_aggregates(model))
+
+
+def _cache_key():
+    pages = sorted({
+        page
+        for label in COUNTED_MODELS
+        for page in page_cache.pages_for_model(apps.get_model(label))
+    })
+    generations = ':'.join(page_cache.get_generation(page) for page in pages)
+    return f"content_counts:{hashlib.md5(generations.encode('ascii')).hexdigest()}"
+
+
+def content_counts():
+    """
+    Return ``{model_name: {'total': n, 'active': n, ...}}`` for every counted
+    model, keyed by the lowercase model name (e.g. ``'publication'``).
+    Publications also carry one entry per category.
+    """
+    cache = page_cache.get_cache()
+    key = _cache_key()
+    counts = cache.get(key)
+    if counts is None:
+        counts = {}
+        for label in COUNTED_MODELS:
+            model = apps.get_model(label)
+            counts[model._meta.model_name] = _count_model(model)
+        cache.set(key, counts, timeout=CACHE_TIMEOUT)
+    return counts
+
+
+async def acontent_counts():
+    """``content_counts`` for async views."""
+    cache = page_cache.get_cache()
+    key = await sync_to_async(_cache_key)()
+    counts = await cache.aget(key)
+    if counts is None:
+        models = [apps.get_model(label) for label in COUNTED_MODELS]
+        results = await asyncio.gather(*(model.objects.aaggregate(**_aggregates(model)) for model in models))
+        counts = {model._meta.model_name: result for model, result in zip(models, results)}
+        await cache.aset(key, counts, timeout=CACHE_TIMEOUT)
+    return counts
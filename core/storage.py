@@ -2,9 +2,175 @@
 Custom Supabase S3 storage backend.
 Uses django-storages[s3] and boto3.
 """
+import logging
+import shutil
+import threading
+from functools import lru_cache
+
+from botocore.exceptions import ClientError
+from django.core.files import File
+from django.urls import reverse
 from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+from core import media_cache, uploads
+
+logger = logging.getLogger(__name__)
+
+# Distinct media names kept in each storage's URL cache.
+URL_CACHE_SIZE = 4096
+
 
 class SupabaseMediaStorage(S3Boto3Storage):
     location = ''
     file_overwrite = True
 
+    def __init__(self, **settings):
+        super().__init__(**settings)
+        # Files are overwritten in place, so a name's public URL never changes.
+        self._public_url = lru_cache(maxsize=URL_CACHE_SIZE)(super().url)
+        self._shared_client = None
+        self._resource_class = None
+        self._client_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        for attr in ('_public_url', '_shared_client', '_resource_class', '_client_lock'):
+            state.pop(attr, None)
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._public_url = lru_cache(maxsize=URL_CACHE_SIZE)(super().url)
+        self._shared_client = None
+        self._resource_class = None
+        self._client_lock = threading.Lock()
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        cleaned = clean_name(name)
+        if uploads.matches(cleaned) and cleaned in uploads.pending_names():
+            # Not in the bucket yet: link to the spooled copy (core/media.py).
+            return reverse('pending_media', args=[cleaned])
+        # Public bucket behind a custom domain: the URL is plain string
+        # formatting, so repeat lookups in template loops come from the cache.
+        if self.custom_domain and not self.querystring_auth and not parameters and http_method is None:
+            return self._public_url(name)
+        return super().url(name, parameters, expire, http_method)
+
+    @property
+    def connection(self):
+        # boto3 resources are not thread-safe, so each thread keeps its own
+        # as in django-storages, but they all wrap one client: clients are
+        # thread-safe, and sharing it lets every thread reuse the same pooled
+        # TLS connections instead of opening a session and pool per thread.
+        connection = getattr(self._connections, 'connection', None)
+        if connection is None:
+            with self._client_lock:
+                if self._shared_client is None:
+                    # The first thread builds the resource and client the usual way.
+                    connection = S3Boto3Storage.connection.fget(self)
+                    self._shared_client = connection.meta.client
+                    self._resource_class = type(connection)
+            if connection is None:
+                connection = self._connections.connection = self._resource_class(client=self._shared_client)
+        return connection
+
+    @property
+    def bucket(self):
+        # Bucket objects belong to the resource that made them, so they are per thread too.
+        bucket = getattr(self._connections, 'bucket', None)
+        if bucket is None:
+            bucket = self._connections.bucket = self.connection.Bucket(self.bucket_name)
+        return bucket
+
+    def _save(self, name, content):
+        # Large files (publication PDFs) are queued instead of holding the request (core/uploads.py).
+        cleaned = clean_name(name)
+        if uploads.should_defer(cleaned, content):
+            return uploads.defer(cleaned, content)
+        return self.upload(name, content)
+
+    def upload(self, name, content):
+        """Send ``content`` to the bucket now, in parallel parts above the AWS_S3_TRANSFER_CONFIG threshold."""
+        return super()._save(name, content)
+
+    def _open(self, name, mode='rb'):
+        if 'r' in mode:
+            path = uploads.spooled_path(clean_name(name))
+            if path:
+                try:
+                    return File(open(path, mode), name=name)
+                except FileNotFoundError:
+                    pass  # Uploaded in the meantime.
+        return super()._open(name, mode)
+
+    def delete(self, name):
+        if uploads.matches(clean_name(name)):
+            uploads.cancel(clean_name(name))
+        super().delete(name)
+
+
+class TieredMediaStorage(SupabaseMediaStorage):
+    """
+    SupabaseMediaStorage with a read-through local disk cache (see
+    core/media_cache.py). Reads are served from a local file when its ETag
+    is current; saves and deletes go to Supabase and then update the cache.
+    """
+
+    def _key(self, name):
+        return self._normalize_name(clean_name(name))
+
+    def _open(self, name, mode='rb'):
+        if any(flag in mode for flag in 'wa+'):
+            return super()._open(name, mode)
+        key = self._key(name)
+        try:
+            path = self._cached_path(key)
+        except ClientError as err:
+            # 404 may be a deferred upload that is still spooled locally;
+            # 412 means the object changed between HEAD and GET.
+            if err.response['ResponseMetadata']['HTTPStatusCode'] != 404:
+                logger.warning("Media cache bypassed for %s: %s", key, err)
+            return super()._open(name, mode)
+        except OSError as exc:
+            logger.warning("Media cache bypassed for %s: %s", key, exc)
+            return super()._open(name, mode)
+        # A real file, so file responses can hand it to the server's file wrapper.
+        return File(open(path, mode), name=name)
+
+    def _cached_path(self, key):
+        etag = media_cache.known_etag(key)
+        path = media_cache.lookup(key, etag) if etag else None
+        if path is None:
+            obj = self.bucket.Object(key)
+            if etag is None:
+                obj.load()
+                etag = obj.e_tag
+                path = media_cache.lookup(key, etag)
+                if path is not None:
+                    media_cache.remember_etag(key, etag)
+            if path is None:
+                media_cache.record('misses')
+                return media_cache.store(
+                    key, etag, lambda tmp: obj.download_fileobj(tmp, ExtraArgs={'IfMatch': etag}),
+                )
+        media_cache.record('hits')
+        return path
+
+    def upload(self, name, content):
+        name = super().upload(name, content)
+        key = self._key(name)
+        try:
+            obj = self.bucket.Object(key)
+            obj.load()
+            content.seek(0)
+            media_cache.store(key, obj.e_tag, lambda tmp: shutil.copyfileobj(content, tmp))
+        except Exception as exc:
+            # The upload succeeded; the next read fetches it instead.
+            logger.warning("Could not cache %s after upload: %s", key, exc)
+            media_cache.discard(key)
+        return name
+
+    def delete(self, name):
+        super().delete(name)
+        media_cache.discard(self._key(name))
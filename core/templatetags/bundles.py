@@ -0,0 +1,71 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core import bundles, critical
+
+register = template.Library()
+
+
+class BundleNode(template.Node):
+    def __init__(self, kind, name, nodelist):
+        self.kind = kind
+        self.name = name
+        self.nodelist = nodelist
+        self.source_hash = bundles.source_hash(nodelist)
+
+    def render(self, context):
+        if self.kind == 'css':
+            page_path = bundles.page_path(context.template_name, self.name, self.source_hash)
+            if page_path is not None and getattr(context, 'page_css_bundle', None) == page_path:
+                # Already in the page's merged stylesheet.
+                return ''
+            rendered = page_path is not None and self._link(context, page_path)
+            if rendered:
+                context.page_css_bundle = page_path
+                return rendered
+        path = bundles.built_path(self.kind, self.name, self.source_hash)
+        rendered = path is not None and self._link(context, path)
+        return rendered or self.nodelist.render(context)
+
+    def _link(self, context, path):
+        markup = bundles.KINDS[self.kind][1]
+        if self.kind == 'css' and critical.for_template(context.template_name) is not None:
+            markup = bundles.ASYNC_STYLESHEET
+        try:
+            return format_html(markup, static(path))
+        except ValueError:
+            # Built but not collected yet (missing from the staticfiles manifest).
+            return None
+
+
+@register.tag
+def bundle(parser, token):
+    """
+    Serve the enclosed stylesheets/scripts as one minified static file once
+    ``build_static_bundles`` has run (see core/bundles.py).
+
+    Usage: {% bundle "css" "site" %}<link ...><style>...</style>{% endbundle %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a kind and a name")
+    kind, name = (bit.strip('"\'') for bit in bits[1:])
+    if kind not in bundles.KINDS:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' kind must be one of {', '.join(bundles.KINDS)}")
+    nodelist = parser.parse(('endbundle',))
+    parser.delete_first_token()
+    return BundleNode(kind, name, nodelist)
+
+
+@register.simple_tag(takes_context=True)
+def critical_css(context):
+    """
+    Inline the page's above-the-fold CSS from ``build_critical_css`` (see
+    core/critical.py); its CSS bundles then load without blocking render.
+    """
+    css = critical.for_template(context.template_name)
+    if css is None:
+        return ''
+    return mark_safe('<style>' + css.replace('</', '<\\/') + '</style>')
@@ -0,0 +1,62 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core import image_optimizer, images
+
+register = template.Library()
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', ((name.replace('_', '-'), value) for name, value in attrs.items()))
+
+
+@register.simple_tag
+def responsive_image(image, sizes='100vw', **attrs):
+    """
+    Render an uploaded image as a <picture> with AVIF/WebP srcsets, falling
+    back to a plain <img> of the original until its variants exist.
+
+    Usage: {% responsive_image member.photo sizes="220px" alt=member.name class="member-photo" %}
+    """
+    if not image:
+        return ''
+    img = format_html('<img src="{}"{}>', image.url, _attributes(attrs))
+    variants = images.variants_for(image.name)
+    if not variants:
+        return img
+
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (
+                images.FORMAT_OPTIONS[fmt]['mime'],
+                ', '.join(f'{default_storage.url(name)} {width}w' for width, name in entries),
+                sizes,
+            )
+            for fmt, entries in variants.items()
+        ),
+    )
+    return format_html('<picture class="responsive-image">{}{}</picture>', sources, img)
+
+
+@register.simple_tag
+def static_picture(name, **attrs):
+    """
+    Render a static image, using the scaled-down copy and WebP sibling
+    written by ``optimize_images`` (through a <picture>) when there are ones.
+
+    Usage: {% static_picture 'images/dap_logo.png' alt="DAP" height="50" style="height: 50px;" %}
+    """
+    resized, webp = image_optimizer.siblings_for(name)
+    try:
+        src = static(resized or name)
+        source = static(webp) if webp else None
+    except ValueError:
+        # Optimized but not collected yet (missing from the staticfiles manifest).
+        src, source = static(name), None
+    img = format_html('<img src="{}"{}>', src, _attributes(attrs))
+    if not source:
+        return img
+    return format_html('<picture class="responsive-image"><source type="image/webp" srcset="{}">{}</picture>', source, img)
@@ -0,0 +1,51 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core import bundles, vendor
+
+register = template.Library()
+
+# Asset kind -> tag pointing at a vendored file.
+MARKUP = (
+    ('preload', '<link rel="preload" href="{}" as="font" type="font/woff2" crossorigin>'),
+    ('css', '<link rel="stylesheet" href="{}">'),
+    # @font-face rules only: text renders in the fallback font until they load (font-display: swap).
+    ('font_css', bundles.ASYNC_STYLESHEET),
+    ('js', '<script src="{}"></script>'),
+)
+
+
+class VendoredNode(template.Node):
+    def __init__(self, name, nodelist):
+        self.name = name
+        self.nodelist = nodelist
+
+    def render(self, context):
+        entry = vendor.asset(self.name)
+        if entry is not None:
+            try:
+                return format_html_join('\n', '{}', (
+                    (format_html(markup, static(path)),)
+                    for kind, markup in MARKUP for path in entry.get(kind, [])
+                ))
+            except ValueError:
+                # Vendored but not collected yet (missing from the staticfiles manifest).
+                pass
+        return self.nodelist.render(context)
+
+
+@register.tag
+def vendored(parser, token):
+    """
+    Serve a third-party asset from static/vendor/ once ``vendor_assets`` has
+    written it (see core/vendor.py); until then render the enclosed CDN tags.
+
+    Usage: {% vendored "bootstrap" %}<link href="https://cdn..." rel="stylesheet">{% endvendored %}
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes an asset name")
+    nodelist = parser.parse(('endvendored',))
+    parser.delete_first_token()
+    return VendoredNode(bits[1].strip('"\''), nodelist)
@@ -1,3 +1,249 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import uploads
+from core.conditional import conditional_page
+from core.media import resolve_media_path, serve_media, serve_pending_upload
+from core.models import PendingUpload, RTNotice
+from core.sessions import SessionStore
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'sessions': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-sessions'},
+}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    SESSION_CACHE_ALIAS='sessions',
+    SESSION_REFRESH_THRESHOLD=300,
+    SESSION_PERSIST_AUTHENTICATED=True,
+)
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+
+    def _saved_session(self, **data):
+        store = SessionStore()
+        store.update(data)
+        store.save()
+        return SessionStore(store.session_key)
+
+    def _cache_writes(self, store):
+        return mock.patch.object(store._cache, 'set', wraps=store._cache.set)
+
+    def test_anonymous_session_stays_out_of_the_database(self):
+        store = self._saved_session(cart='x')
+        self.assertEqual(store['cart'], 'x')
+        self.assertFalse(Session.objects.exists())
+
+    def test_unchanged_session_is_not_rewritten_within_threshold(self):
+        store = self._saved_session(cart='x')
+        store.load()
+        with self._cache_writes(store) as cache_set:
+            store.save()
+        cache_set.assert_not_called()
+
+    def test_changed_session_is_written(self):
+        store = self._saved_session(cart='x')
+        store['cart'] = 'y'
+        with self._cache_writes(store) as cache_set:
+            store.save()
+        cache_set.assert_called_once()
+        self.assertEqual(SessionStore(store.session_key)['cart'], 'y')
+
+    def test_unchanged_session_is_refreshed_after_threshold(self):
+        store = self._saved_session(cart='x')
+        store.load()
+        with mock.patch('core.sessions.time.time', return_value=store._refreshed_at + 301):
+            with self._cache_writes(store) as cache_set:
+                store.save()
+        cache_set.assert_called_once()
+
+    def test_authenticated_session_survives_cache_loss(self):
+        store = self._saved_session(**{SESSION_KEY: '1'})
+        self.assertTrue(Session.objects.filter(session_key=store.session_key).exists())
+        caches['sessions'].clear()
+        self.assertEqual(SessionStore(store.session_key)[SESSION_KEY], '1')
+
+    @override_settings(SESSION_PERSIST_AUTHENTICATED=False)
+    def test_authenticated_sessions_can_stay_cache_only(self):
+        self._saved_session(**{SESSION_KEY: '1'})
+        self.assertFalse(Session.objects.exists())
+
+    def test_delete_removes_cache_entry_and_row(self):
+        store = self._saved_session(**{SESSION_KEY: '1'})
+        store.load()
+        store.delete()
+        self.assertFalse(Session.objects.exists())
+        self.assertNotIn(SESSION_KEY, SessionStore(store.session_key).load())
+
+    def test_cycle_key_keeps_data_under_new_key(self):
+        store = self._saved_session(**{SESSION_KEY: '1'})
+        store.load()
+        old_key = store.session_key
+        store.cycle_key()
+        self.assertNotEqual(store.session_key, old_key)
+        self.assertEqual(SessionStore(store.session_key)[SESSION_KEY], '1')
+        self.assertFalse(Session.objects.filter(session_key=old_key).exists())
+
+
+class MediaRangeTests(SimpleTestCase):
+    CONTENT = bytes(range(256)) * 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        Path(cls.media_root, 'docs').mkdir()
+        Path(cls.media_root, 'docs', 'paper.pdf').write_bytes(cls.CONTENT)
+        Path(cls.media_root, '.secret').write_bytes(b'x')
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, MEDIA_ACCEL_REDIRECT='')
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root)
+        super().tearDownClass()
+
+    def _get(self, **headers):
+        request = RequestFactory().get('/media/docs/paper.pdf', headers=headers)
+        return serve_media(request, 'docs/paper.pdf')
+
+    def _body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file_without_range(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self._body(response), self.CONTENT)
+
+    def test_ranges(self):
+        size = len(self.CONTENT)
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=10-': (10, size - 1),
+            'bytes=-16': (size - 16, size - 1),
+            'bytes=-5000': (0, size - 1),
+            'bytes=1000-5000': (1000, size - 1),
+            f'bytes={size - 1}-{size - 1}': (size - 1, size - 1),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(range=header):
+                response = self._get(range=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/{size}')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+                self.assertEqual(self._body(response), self.CONTENT[start:end + 1])
+
+    def test_unsatisfiable_ranges(self):
+        size = len(self.CONTENT)
+        for header in (f'bytes={size}-', 'bytes=20-10', 'bytes=-0'):
+            with self.subTest(range=header):
+                response = self._get(range=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], f'bytes */{size}')
+
+    def test_malformed_and_multiple_ranges_get_whole_file(self):
+        for header in ('bytes=-', 'bytes=a-b', 'items=0-1', 'bytes=0-1,5-6'):
+            with self.subTest(range=header):
+                response = self._get(range=header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(self._body(response), self.CONTENT)
+
+    def test_if_range(self):
+        full = self._get()
+        matching = self._get(range='bytes=0-9', if_range=full['ETag'])
+        self.assertEqual(matching.status_code, 206)
+        stale = self._get(range='bytes=0-9', if_range='"stale"')
+        self.assertEqual(stale.status_code, 200)
+        dated = self._get(range='bytes=0-9', if_range=full['Last-Modified'])
+        self.assertEqual(dated.status_code, 206)
+
+    def test_conditional_get(self):
+        etag = self._get()['ETag']
+        self.assertEqual(self._get(if_none_match=etag).status_code, 304)
+
+    def test_paths_outside_media_root_are_refused(self):
+        for path in ('../etc/passwd', 'docs/../../x', '.secret', 'docs/', ''):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    resolve_media_path(path)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT='/protected-media/')
+    def test_accel_redirect(self):
+        response = self._get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/docs/paper.pdf')
+        self.assertEqual(response.content, b'')
+
+
+@override_settings(CACHES=LOCMEM_CACHES, MEDIA_DEFERRED_UPLOAD_PATTERNS=['publications/*.pdf'])
+class PendingUploadMediaTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool)
+        self.spooled = Path(spool, 'spooled.pdf')
+        self.spooled.write_bytes(b'%PDF-1.4')
+        PendingUpload.objects.create(name='publications/paper.pdf', file_path=str(self.spooled))
+
+    def _get(self, path):
+        return serve_pending_upload(RequestFactory().get('/pending-media/' + path), path)
+
+    def test_pending_upload_is_served_from_spool(self):
+        self.assertIn('publications/paper.pdf', uploads.pending_names())
+        response = self._get('publications/paper.pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF-1.4')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_sent_upload_redirects_to_storage(self):
+        self.spooled.unlink()
+        with mock.patch('core.media.default_storage') as storage:
+            storage.url.return_value = 'https://bucket.example/publications/paper.pdf'
+            response = self._get('publications/paper.pdf')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://bucket.example/publications/paper.pdf')
+
+    def test_other_paths_are_refused(self):
+        with self.assertRaises(Http404):
+            self._get('team/photo.jpg')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConditionalPageTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.view = conditional_page('research_technology')(lambda request: HttpResponse('notices'))
+
+    def _get(self, **headers):
+        request = RequestFactory().get('/research-technology/', headers=headers)
+        request.user = AnonymousUser()
+        return self.view(request)
+
+    def test_matching_etag_gets_304_without_queries(self):
+        etag = self._get()['ETag']
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+    def test_edit_changes_etag(self):
+        etag = self._get()['ETag']
+        RTNotice.objects.create(title='Notice', description='Text', event_date='2026-01-01')
+        response = self._get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
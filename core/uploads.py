@@ -0,0 +1,207 @@
+"""
+Deferred media uploads.
+
+Files saved to the Supabase storage under one of the
+``MEDIA_DEFERRED_UPLOAD_PATTERNS`` (publication PDFs) and at least
+``MEDIA_DEFERRED_UPLOAD_MIN_BYTES`` in size are not sent to the bucket
+inside the request: ``defer`` copies them to ``UPLOAD_SPOOL_DIR`` and
+records a ``PendingUpload``, so the form save returns as soon as the file is
+on local disk. ``python manage.py run_upload_jobs`` then sends each one with
+the storage's multipart ``AWS_S3_TRANSFER_CONFIG`` and removes the spooled
+copy.
+
+Until the upload has finished, server-side reads of the file are served from
+the spool, and the storage's ``url()`` points at ``serve_pending_upload``
+(core/media.py) instead of the bucket: it streams the spooled copy, then
+redirects to the public URL once the worker has sent the file.
+"""
+import fnmatch
+import logging
+import uuid
+from datetime import timedelta
+from pathlib import Path, PurePosixPath
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+# Wait this long before retrying a failed upload.
+RETRY_DELAY = timedelta(minutes=1)
+
+# A running upload this old belongs to a dead worker.
+STALE_AFTER = timedelta(minutes=30)
+
+PENDING_KEY = 'uploads:pending'
+PENDING_TIMEOUT = 300
+
+
+def spool_dir():
+    return Path(getattr(settings, 'UPLOAD_SPOOL_DIR', settings.BASE_DIR / '.upload_spool'))
+
+
+def min_bytes():
+    return getattr(settings, 'MEDIA_DEFERRED_UPLOAD_MIN_BYTES', 5 * 1024 * 1024)
+
+
+def matches(name):
+    """Whether uploads under ``name`` may be deferred."""
+    return any(fnmatch.fnmatch(name, pattern) for pattern in getattr(settings, 'MEDIA_DEFERRED_UPLOAD_PATTERNS', []))
+
+
+def should_defer(name, content):
+    if not matches(name):
+        return False
+    try:
+        return content.size >= min_bytes()
+    except (AttributeError, OSError):
+        return False
+
+
+def _remove(path):
+    Path(path).unlink(missing_ok=True)
+
+
+def spool(name, content):
+    """Copy ``content`` into the spool directory. Returns ``(path, size)``."""
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4().hex}{PurePosixPath(name).suffix}'
+    size = 0
+    with open(path, 'wb') as spooled:
+        for chunk in content.chunks():
+            spooled.write(chunk)
+            size += len(chunk)
+    return path, size
+
+
+def defer(name, content):
+    """Spool ``content`` and queue it for upload under ``name``. Returns ``name``."""
+    from core.models import PendingUpload
+
+    path, size = spool(name, content)
+    with transaction.atomic():
+        previous = PendingUpload.objects.select_for_update().filter(name=name).first()
+        # A running worker removes its own copy when it is done.
+        if previous is not None and previous.status != PendingUpload.STATUS_RUNNING:
+            _remove(previous.file_path)
+        PendingUpload.objects.update_or_create(name=name, defaults={
+            'file_path': str(path),
+            'size': size,
+            'status': PendingUpload.STATUS_PENDING,
+            'attempts': 0,
+            'last_error': '',
+            'started_at': None,
+        })
+    transaction.on_commit(_pending_changed)
+    return name
+
+
+def spooled_path(name):
+    """The local copy of ``name`` while its upload is pending, or None."""
+    from core.models import PendingUpload
+
+    if not matches(name):
+        return None
+    return PendingUpload.objects.filter(name=name).values_list('file_path', flat=True).first()
+
+
+def is_pending(name):
+    return spooled_path(name) is not None
+
+
+def pending_names():
+    """Names of all queued uploads, from the cache (``url()`` checks every PDF link against it)."""
+    names = cache.get(PENDING_KEY)
+    if names is None:
+        from core.models import PendingUpload
+
+        names = frozenset(PendingUpload.objects.values_list('name', flat=True))
+        cache.set(PENDING_KEY, names, PENDING_TIMEOUT)
+    return names
+
+
+def _pending_changed():
+    cache.delete(PENDING_KEY)
+
+
+def cancel(name):
+    """Drop the queued upload of ``name`` (the file was deleted before it was sent)."""
+    from core.models import PendingUpload
+
+    for upload in PendingUpload.objects.filter(name=name):
+        if upload.status != PendingUpload.STATUS_RUNNING:
+            _remove(upload.file_path)
+        upload.delete()
+    transaction.on_commit(_pending_changed)
+
+
+# =========================
+# WORKER
+# =========================
+
+def release_stale_uploads():
+    """Re-queue uploads whose worker died mid-transfer (uploads overwrite, so re-sending is safe)."""
+    from core.models import PendingUpload
+
+    return PendingUpload.objects.filter(
+        status=PendingUpload.STATUS_RUNNING,
+        started_at__lt=timezone.now() - STALE_AFTER,
+    ).update(status=PendingUpload.STATUS_PENDING)
+
+
+def claim_next_upload():
+    """Mark the oldest queued upload as running and return it (or None)."""
+    from core.models import PendingUpload
+
+    now = timezone.now()
+    with transaction.atomic():
+        queued = PendingUpload.objects.filter(
+            Q(started_at__isnull=True) | Q(started_at__lt=now - RETRY_DELAY),
+            status=PendingUpload.STATUS_PENDING,
+        ).order_by('created_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        upload = queued.first()
+        if upload is None:
+            return None
+        upload.status = PendingUpload.STATUS_RUNNING
+        upload.started_at = now
+        upload.attempts += 1
+        upload.save(update_fields=['status', 'started_at', 'attempts'])
+    return upload
+
+
+def run_upload(upload, storage=None):
+    """Send one spooled file to storage. Returns True once it is uploaded."""
+    from core.models import PendingUpload
+
+    storage = storage or default_storage
+    current = PendingUpload.objects.filter(pk=upload.pk, file_path=upload.file_path)
+    try:
+        with open(upload.file_path, 'rb') as spooled:
+            storage.upload(upload.name, File(spooled, name=upload.name))
+    except Exception as exc:
+        logger.exception("Upload of %s failed (attempt %s)", upload.name, upload.attempts)
+        missing = isinstance(exc, FileNotFoundError)
+        failed = missing or upload.attempts >= MAX_ATTEMPTS
+        current.update(
+            status=PendingUpload.STATUS_FAILED if failed else PendingUpload.STATUS_PENDING,
+            last_error=str(exc)[:1000],
+        )
+        return False
+
+    _remove(upload.file_path)
+    deleted, _ = current.delete()
+    _pending_changed()
+    if not deleted and not PendingUpload.objects.filter(name=upload.name).exists():
+        # The file was deleted while it was being sent.
+        storage.delete(upload.name)
+    return True
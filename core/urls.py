@@ -16,4 +16,6 @@ urlpatterns = [
     path('research-technology/', views.research_technology_view, name='research_technology'),
     path('workshops/', views.workshops_view, name='workshops'),
     path('tutorials/', views.tutorials_view, name='tutorials'),
+    path('search/', views.search_view, name='search'),
+    path('search/suggest/', views.search_suggest, name='search_suggest'),
 ]
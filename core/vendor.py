@@ -0,0 +1,341 @@
+"""
+Self-hosted copies of the third-party fonts, CSS and JS the templates load.
+
+``python manage.py vendor_assets`` downloads them into ``static/vendor/`` and
+slims them down:
+
+* Bootstrap and Bootstrap Icons keep only the rules whose classes and ids
+  occur in the dashboard templates and code, the crispy-forms templates or
+  Bootstrap's own JS. The icon font is cut down to the icons left.
+* Inter is cut to the weights the stylesheets and templates ask for, and to
+  Latin text plus every character found in the templates. It is written as
+  WOFF2 with ``font-display: swap``.
+
+``vendor.json`` next to the files records what was written. The command
+needs network access, so it is not part of build.sh/deploy.ps1: run it on a
+development machine and commit ``static/vendor/``, after which pages never
+reach the CDNs.
+
+Templates wrap each CDN reference in ``{% vendored "<name>" %}``
+(core/templatetags/vendor.py). Once the asset is vendored, the block is
+replaced by the local copies, with preload hints for the most used font
+weights and the ``@font-face`` stylesheet loaded without blocking render.
+Until then the CDN markup inside it renders unchanged.
+"""
+import importlib
+import io
+import json
+import os
+import re
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+from core.critical import GROUPING_RULES, css_blocks, split_selectors
+
+JSDELIVR = 'https://cdn.jsdelivr.net/npm/'
+BOOTSTRAP = 'bootstrap@5.3.0'
+BOOTSTRAP_ICONS = 'bootstrap-icons@1.11.0'
+
+# Without a browser User-Agent the API answers with TrueType sources, which fontTools reads.
+INTER_CSS = 'https://fonts.googleapis.com/css2?family=Inter:wght@{weight}'
+INTER_LICENSE = 'https://raw.githubusercontent.com/rsms/inter/v4.0/LICENSE.txt'
+
+# Text that may come from the database: Basic Latin, Latin-1, Latin Extended-A,
+# general punctuation, and the euro, rupee and trademark signs.
+TEXT_RANGES = ((0x20, 0x7E), (0xA0, 0x17F), (0x2010, 0x2027), (0x2030, 0x203A), (0x20AC, 0x20AC), (0x20B9, 0x20B9), (0x2122, 0x2122))
+
+BODY_WEIGHT = 400
+
+# Regular body text and <strong>/<b> are always needed.
+BASE_WEIGHTS = (BODY_WEIGHT, 700)
+
+# Font weights given a <link rel="preload">: body text and the most used other one.
+PRELOAD_WEIGHTS = 2
+
+WEIGHT_NAMES = {'normal': 400, 'bold': 700, 'light': 300, 'medium': 500, 'semibold': 600}
+FONT_WEIGHT_RE = re.compile(r'font-weight\s*:\s*(\d{3}|normal|bold)\b', re.I)
+WEIGHT_CLASS_RE = re.compile(r'\bfw-(\d{3}|normal|bold|light|medium|semibold)\b')
+
+CHARSET_RE = re.compile(r'^@charset\s+"[^"]*";')
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+SOURCE_MAP_RE = re.compile(r'^\s*//# sourceMappingURL=.*$', re.M)
+TOKEN_RE = re.compile(r'[A-Za-z_][\w-]*')
+# "alert-{{ message.tags }}": every class starting with "alert-" may be used.
+PREFIX_RE = re.compile(r'([A-Za-z][\w-]*-)\{[{%]')
+
+_manifest = None
+
+
+def vendor_dir():
+    return Path(getattr(settings, 'STATIC_VENDOR_DIR', settings.BASE_DIR / 'static' / 'vendor'))
+
+
+def manifest_path():
+    return vendor_dir() / 'vendor.json'
+
+
+def load_manifest():
+    """What ``vendor_assets`` has written (read once per process), or {}."""
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(manifest_path(), encoding='utf-8') as handle:
+                _manifest = json.load(handle)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest
+
+
+def asset(name):
+    """``{'preload': [...], 'css': [...], 'js': [...]}`` static paths of a vendored asset, or None."""
+    return load_manifest().get('assets', {}).get(name)
+
+
+def save_manifest(assets):
+    global _manifest
+    manifest = load_manifest()
+    merged = {**manifest.get('assets', {}), **assets}
+    temporary = manifest_path().with_suffix('.tmp')
+    temporary.write_text(json.dumps({'assets': merged}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(temporary, manifest_path())
+    _manifest = None
+
+
+def download(url):
+    import requests
+
+    response = requests.get(url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def write(relative, data):
+    """Write ``data`` under static/vendor/. Returns its static path."""
+    path = vendor_dir() / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data if isinstance(data, bytes) else data.encode('utf-8'))
+    return f'{vendor_dir().name}/{relative}'
+
+
+# =========================
+# SOURCES
+# =========================
+
+def _template_dirs(apps=None):
+    from django.apps import apps as registry
+
+    dirs = [Path(path) for path in settings.TEMPLATES[0]['DIRS']]
+    dirs += [Path(config.path) / 'templates' for config in registry.get_app_configs() if apps is None or config.label in apps]
+    return [path for path in dirs if path.is_dir()]
+
+
+def _read_all(paths, pattern):
+    texts = []
+    for root in paths:
+        for path in sorted(root.rglob(pattern)):
+            texts.append(path.read_text(encoding='utf-8', errors='replace'))
+    return texts
+
+
+def dashboard_sources():
+    """Text of everything that can put Bootstrap classes in a dashboard page."""
+    texts = _read_all(_template_dirs(apps={'dashboard', 'crispy_forms', 'crispy_bootstrap5'}), '*.html')
+    dashboard = Path(importlib.import_module('dashboard').__file__).parent
+    return texts + _read_all([dashboard], '*.py')
+
+
+def site_sources():
+    """Project templates and stylesheets (public site and dashboard)."""
+    static = [Path(path) for path in settings.STATICFILES_DIRS if not isinstance(path, (tuple, list))]
+    base = Path(settings.BASE_DIR)
+    templates = [path for path in _template_dirs() if path.resolve().is_relative_to(base) and 'site-packages' not in path.parts]
+    return _read_all(templates, '*.html') + _read_all([path for path in static if path.is_dir()], '*.css')
+
+
+# =========================
+# CSS
+# =========================
+
+def slim_css(css, usage):
+    """Purge and minify a downloaded stylesheet, keeping its @charset and license comments."""
+    licenses = ''.join(comment for comment in COMMENT_RE.findall(css) if comment.startswith('/*!'))
+    css = COMMENT_RE.sub('', css).strip()
+    charset = CHARSET_RE.match(css)
+    if charset:
+        css = css[charset.end():]
+    return (charset.group() if charset else '') + licenses + minify_css(purge(css, usage))
+
+
+class Usage:
+    """Class names and ids found in a set of source texts."""
+
+    def __init__(self, texts):
+        self.tokens, self.prefixes = set(), set()
+        for text in texts:
+            self.tokens.update(TOKEN_RE.findall(text))
+            self.prefixes.update(PREFIX_RE.findall(text))
+
+    def _known(self, name):
+        return name in self.tokens or name.startswith(tuple(self.prefixes))
+
+    def selector_used(self, selector):
+        # What a :not() excludes need not be present; attribute values are not classes.
+        selector = re.sub(r':not\([^()]*\)', '', re.sub(r'\[[^\]]*\]', '', selector))
+        return (
+            all(self._known(name) for name in re.findall(r'\.(-?[A-Za-z_][\w-]*)', selector))
+            and all(self._known(name) for name in re.findall(r'#(-?[A-Za-z_][\w-]*)', selector))
+        )
+
+
+def purge(css, usage):
+    """Drop the selectors of ``css`` that ``usage`` never produces (comment-free CSS)."""
+    kept = []
+    for prelude, body in css_blocks(css):
+        if body is None:
+            kept.append(f'{prelude};')
+        elif prelude.startswith('@'):
+            if prelude.split(None, 1)[0].lower().startswith(GROUPING_RULES):
+                inner = purge(body, usage)
+                if inner:
+                    kept.append(f'{prelude}{{{inner}}}')
+            else:
+                kept.append(f'{prelude}{{{body}}}')
+        else:
+            selectors = [selector for selector in split_selectors(prelude) if usage.selector_used(selector)]
+            if selectors:
+                kept.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(kept)
+
+
+def minify_css(css):
+    import rcssmin
+
+    return rcssmin.cssmin(css, keep_bang_comments=True)
+
+
+# =========================
+# FONTS
+# =========================
+
+def used_weights(texts):
+    """Font weights named in ``texts``, most used first."""
+    counts = Counter()
+    for text in texts:
+        for value in FONT_WEIGHT_RE.findall(text) + WEIGHT_CLASS_RE.findall(text):
+            weight = WEIGHT_NAMES.get(value.lower()) or int(value)
+            if 100 <= weight <= 900:
+                counts[weight] += 1
+    for weight in BASE_WEIGHTS:
+        counts[weight] += 1
+    return [weight for weight, _ in counts.most_common()]
+
+
+def text_codepoints(texts):
+    codepoints = {code for start, end in TEXT_RANGES for code in range(start, end + 1)}
+    for text in texts:
+        codepoints.update(ord(char) for char in text if ord(char) > 0x7E and char.isprintable())
+    return codepoints
+
+
+def subset_font(data, codepoints, features=('kern', 'liga', 'calt', 'ccmp', 'locl', 'mark', 'mkmk', 'tnum')):
+    """``data`` (TrueType/WOFF2) cut down to ``codepoints``, as WOFF2 bytes and the codepoints kept."""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = list(features)
+    options.hinting = False
+    options.desubroutinize = True
+    font = TTFont(io.BytesIO(data))
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    kept = set(font.getBestCmap())
+    output = io.BytesIO()
+    font.save(output)
+    return output.getvalue(), kept
+
+
+def unicode_range(codepoints):
+    ranges, start, previous = [], None, None
+    for code in sorted(codepoints):
+        if start is None:
+            start = previous = code
+        elif code == previous + 1:
+            previous = code
+        else:
+            ranges.append((start, previous))
+            start = previous = code
+    if start is not None:
+        ranges.append((start, previous))
+    return ','.join(f'U+{a:X}' if a == b else f'U+{a:X}-{b:X}' for a, b in ranges)
+
+
+# =========================
+# ASSETS
+# =========================
+
+def vendor_bootstrap():
+    """Vendor Bootstrap CSS/JS and Bootstrap Icons. Returns ``(assets, [(static path, downloaded bytes)])``."""
+    report = []
+    js = SOURCE_MAP_RE.sub('', download(f'{JSDELIVR}{BOOTSTRAP}/dist/js/bootstrap.bundle.min.js').decode('utf-8'))
+    # Classes Bootstrap's JS toggles (show, collapsing, modal-open, ...) count as used.
+    usage = Usage(dashboard_sources() + [js])
+
+    source = download(f'{JSDELIVR}{BOOTSTRAP}/dist/css/bootstrap.min.css').decode('utf-8')
+    css_path = write('bootstrap/bootstrap.min.css', slim_css(source, usage))
+    js_path = write('bootstrap/bootstrap.bundle.min.js', js)
+    report += [(css_path, len(source)), (js_path, len(js))]
+
+    source = download(f'{JSDELIVR}{BOOTSTRAP_ICONS}/font/bootstrap-icons.css').decode('utf-8')
+    # Icons keep font-display: block so no fallback glyph flashes in their place.
+    css = re.sub(r'src:[^;}]*', 'src:url("fonts/bootstrap-icons.woff2") format("woff2")', slim_css(source, usage))
+    icons = {int(code, 16) for code in re.findall(r'content:\s*"\\([0-9a-fA-F]+)"', css)}
+    font = download(f'{JSDELIVR}{BOOTSTRAP_ICONS}/font/fonts/bootstrap-icons.woff2')
+    subset, _ = subset_font(font, icons, features=())
+    icons_path = write('bootstrap-icons/bootstrap-icons.css', css)
+    font_path = write('bootstrap-icons/fonts/bootstrap-icons.woff2', subset)
+    report += [(icons_path, len(source)), (font_path, len(font))]
+
+    assets = {
+        'bootstrap': {'css': [css_path]},
+        'bootstrap-js': {'js': [js_path]},
+        'bootstrap-icons': {'css': [icons_path]},
+    }
+    return assets, report
+
+
+def vendor_inter():
+    """Vendor the Inter weights in use as subset WOFF2. Returns ``(assets, report)`` like vendor_bootstrap."""
+    texts = site_sources()
+    bootstrap = vendor_dir() / 'bootstrap' / 'bootstrap.min.css'
+    if bootstrap.exists():
+        texts.append(bootstrap.read_text(encoding='utf-8'))
+    weights = used_weights(texts)
+    preload = [BODY_WEIGHT] + [weight for weight in weights if weight != BODY_WEIGHT][:PRELOAD_WEIGHTS - 1]
+    codepoints = text_codepoints(texts)
+
+    faces, fonts, report = [], {}, []
+    for weight in sorted(weights):
+        css = download(INTER_CSS.format(weight=weight)).decode('utf-8')
+        match = re.search(r'src:\s*url\(([^)]+)\)', css)
+        if match is None:
+            raise ValueError(f"no font source for Inter {weight}")
+        source = download(match.group(1).strip('\'"'))
+        data, kept = subset_font(source, codepoints)
+        fonts[weight] = write(f'fonts/inter-{weight}.woff2', data)
+        report.append((fonts[weight], len(source)))
+        faces.append(
+            "@font-face{font-family:'Inter';font-style:normal;font-weight:%d;font-display:swap;"
+            "src:url(inter-%d.woff2) format('woff2');unicode-range:%s}" % (weight, weight, unicode_range(kept))
+        )
+    write('fonts/LICENSE.txt', download(INTER_LICENSE))
+    css_path = write('fonts/inter.css', '\n'.join(faces) + '\n')
+    assets = {'inter': {
+        'preload': [fonts[weight] for weight in preload],
+        'font_css': [css_path],
+    }}
+    return assets, report
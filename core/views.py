@@ -1,8 +1,11 @@
+import asyncio
 from itertools import chain
 from operator import attrgetter
 
+from asgiref.sync import sync_to_async
 from django.db.models import Q
-from django.shortcuts import get_object_or_404, redirect, render
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, redirect, render
 
 from core.models import (
     CarouselImage,
@@ -14,45 +17,60 @@ from core.models import (
     RTNotice,
     Tutorial,
 )
+from core import search_index
+from core.conditional import conditional_page
+from core.page_cache import cache_public_page
+from core.playlists import PlaylistRepository
+from core.stats import acontent_counts
 from projects.models import ResearchProject
 from publications.models import Publication
 from team.models import TeamMember
 from workshops.models import Workshop
 
+# The async public views load their data with the async ORM and render in the
+# request's sync thread, where templates may still touch the database. The
+# async ORM runs every query through sync_to_async(thread_sensitive=True), on
+# that one thread, so asyncio.gather() below only groups the loads: the
+# queries still run one after another. Under WSGI (Waitress, gunicorn) each
+# async view also costs an async_to_sync round trip.
+_render = sync_to_async(render)
 
-def home(request):
+
+async def _list(queryset):
+    return [obj async for obj in queryset]
+
+
+@conditional_page('home')
+@cache_public_page('home')
+async def home(request):
     """Homepage view"""
-    # Get or create stats
-    stats, created = HomePageStats.objects.get_or_create(
-        pk=1,
-        defaults={
-            'publications_count': 100,
-            'projects_count': 120,
-            'outreach_programs_count': 50
-        }
+    # Stats (created on first visit), recent workshops and R&T notices,
+    # carousel and the dynamic counts (shared with the dashboard)
+    (stats, created), workshops, rt_notices, carousel_images, counts = await asyncio.gather(
+        HomePageStats.objects.aget_or_create(
+            pk=1,
+            defaults={
+                'publications_count': 100,
+                'projects_count': 120,
+                'outreach_programs_count': 50
+            }
+        ),
+        _list(Workshop.objects.filter(is_active=True).order_by('-event_date')[:6]),
+        _list(RTNotice.objects.filter(is_active=True).order_by('-event_date')[:3]),
+        _list(CarouselImage.objects.filter(is_active=True)),
+        acontent_counts(),
     )
     
-    # Get recent workshops
-    workshops = Workshop.objects.filter(is_active=True).order_by('-event_date')[:6]
-    
-    # Get recent Research & Technology notices
-    rt_notices = RTNotice.objects.filter(is_active=True).order_by('-event_date')[:3]
-    
-    # Calculate Dynamic Counts
-    pub_count = Publication.objects.filter(is_active=True).count()
-    proj_count = ResearchProject.objects.filter(is_active=True).count()
-    team_count = TeamMember.objects.filter(is_active=True).count()
-    
     context = {
         'stats': stats,
         'workshops': workshops,
         'rt_notices': rt_notices,
-        'pub_count': pub_count,
-        'proj_count': proj_count,
-        'team_count': team_count,
-        'carousel_images': CarouselImage.objects.filter(is_active=True),
+        'pub_count': counts['publication']['active'],
+        'proj_count': counts['researchproject']['active'],
+        'team_count': counts['teammember']['active'],
+        'carousel_images': carousel_images,
     }
-    return render(request, 'home.html', context)
+    return await _render(request, 'home.html', context)
 
 
 def projects_view(request):
@@ -60,7 +78,9 @@ def projects_view(request):
     return redirect('core:research_projects')
 
 
-def research_projects_view(request):
+@conditional_page('research_projects')
+@cache_public_page('research_projects')
+async def research_projects_view(request):
     """Research projects listing view with search and sort"""
     # Base queryset
     projects = ResearchProject.objects.filter(is_active=True, project_type='research')
@@ -89,7 +109,7 @@ def research_projects_view(request):
         projects = projects.order_by('-start_date')  # Default
     
     context = {
-        'projects': projects,
+        'projects': await _list(projects),
         'project_type': 'research',
         'page_title': 'Research Projects',
         'search_query': search_query,
@@ -99,10 +119,12 @@ def research_projects_view(request):
         'is_sort_az': sort_by == 'az',
         'is_sort_za': sort_by == 'za',
     }
-    return render(request, 'projects.html', context)
+    return await _render(request, 'projects.html', context)
 
 
-def consultancy_projects_view(request):
+@conditional_page('consultancy_projects')
+@cache_public_page('consultancy_projects')
+async def consultancy_projects_view(request):
     """Consultancy projects listing view with search and sort"""
     # Base queryset
     projects = ResearchProject.objects.filter(is_active=True, project_type='consultancy')
@@ -131,7 +153,7 @@ def consultancy_projects_view(request):
         projects = projects.order_by('-start_date')  # Default
     
     context = {
-        'projects': projects,
+        'projects': await _list(projects),
         'project_type': 'consultancy',
         'page_title': 'Consultancy Projects',
         'search_query': search_query,
@@ -141,48 +163,41 @@ def consultancy_projects_view(request):
         'is_sort_az': sort_by == 'az',
         'is_sort_za': sort_by == 'za',
     }
-    return render(request, 'projects.html', context)
+    return await _render(request, 'projects.html', context)
 
 
-def project_detail(request, pk):
+@conditional_page('project_detail')
+@cache_public_page('project_detail')
+async def project_detail(request, pk):
     """Project detail view showing all database fields"""
-    project = get_object_or_404(ResearchProject, pk=pk, is_active=True)
+    project = await aget_object_or_404(ResearchProject, pk=pk, is_active=True)
     
     context = {
         'project': project,
         'page_title': project.title,
     }
-    return render(request, 'project_detail.html', context)
+    return await _render(request, 'project_detail.html', context)
 
 
-def team_view(request):
+@conditional_page('team')
+@cache_public_page('team')
+async def team_view(request):
     """Team listing view with categories"""
-    all_members = TeamMember.objects.filter(is_active=True)
-    
-    # Filter into categories based on role keywords
-    faculty_members = []
-    postgraduate_members = []
-    phd_members = []
-    alumni_members = []
-    
-    for member in all_members:
-        role_lower = member.role.lower()
-        if 'faculty' in role_lower or 'professor' in role_lower:
-            faculty_members.append(member)
-        elif 'post graduate' in role_lower or 'm.arch' in role_lower or 'master' in role_lower:
-            postgraduate_members.append(member)
-        elif 'phd' in role_lower or 'research scholar' in role_lower or 'doctoral' in role_lower:
-            phd_members.append(member)
-        elif 'alumni' in role_lower or 'alumnus' in role_lower:
-            alumni_members.append(member)
+    # One query; sections come from the stored category (see team.models)
+    sections = {'faculty': [], 'postgraduate': [], 'phd': [], 'alumni': []}
+    members = TeamMember.objects.filter(
+        is_active=True, category__in=sections
+    ).order_by('category', 'order', 'name')
+    async for member in members:
+        sections[member.category].append(member)
     
     context = {
-        'faculty_members': faculty_members,
-        'postgraduate_members': postgraduate_members,
-        'phd_members': phd_members,
-        'alumni_members': alumni_members,
+        'faculty_members': sections['faculty'],
+        'postgraduate_members': sections['postgraduate'],
+        'phd_members': sections['phd'],
+        'alumni_members': sections['alumni'],
     }
-    return render(request, 'team.html', context)
+    return await _render(request, 'team.html', context)
 
 
 def learn_view(request):
@@ -193,15 +208,20 @@ def learn_view(request):
     return render(request, 'learn.html', context)
 
 
-def impact_view(request):
+@conditional_page('impact')
+@cache_public_page('impact')
+async def impact_view(request):
     """Impact page view with dynamic content"""
-    success_stories = ImpactStory.objects.filter(is_active=True)
-    research_highlights = ResearchHighlight.objects.filter(is_active=True)
-    policy_impacts = PolicyImpact.objects.filter(is_active=True)
+    success_stories, research_highlights, policy_impacts, counts = await asyncio.gather(
+        _list(ImpactStory.objects.filter(is_active=True)),
+        _list(ResearchHighlight.objects.filter(is_active=True)),
+        _list(PolicyImpact.objects.filter(is_active=True)),
+        acontent_counts(),
+    )
     
     context = {
         'impact_stats': {
-            'publications_count': Publication.objects.count(),
+            'publications_count': counts['publication']['total'],
             'citations_count': '450+', # Manual for now
             'collaborations_count': 12, # Manual for now
             'outreach_count': 25 # Manual for now
@@ -210,7 +230,7 @@ def impact_view(request):
         'research_highlights': research_highlights,
         'policy_impacts': policy_impacts
     }
-    return render(request, 'impact.html', context)
+    return await _render(request, 'impact.html', context)
 
 
 def contact_view(request):
@@ -218,7 +238,9 @@ def contact_view(request):
     return render(request, 'contact.html')
 
 
-def workshops_view(request):
+@conditional_page('workshops')
+@cache_public_page('workshops')
+async def workshops_view(request):
     """Workshops listing view with search and sort"""
     # Base queryset
     workshops = Workshop.objects.filter(is_active=True)
@@ -245,7 +267,7 @@ def workshops_view(request):
         workshops = workshops.order_by('-event_date')  # Default
     
     context = {
-        'workshops': workshops,
+        'workshops': await _list(workshops),
         'page_title': 'Workshops',
         'search_query': search_query,
         'sort_by': sort_by,
@@ -254,10 +276,12 @@ def workshops_view(request):
         'is_sort_az': sort_by == 'az',
         'is_sort_za': sort_by == 'za',
     }
-    return render(request, 'workshops.html', context)
+    return await _render(request, 'workshops.html', context)
 
 
-def tutorials_view(request):
+@conditional_page('tutorials')
+@cache_public_page('tutorials')
+async def tutorials_view(request):
     """Tutorials listing view with playlist support and search/sort"""
     # Search functionality
     search_query = request.GET.get('search', '').strip()
@@ -265,63 +289,13 @@ def tutorials_view(request):
     # Sort functionality
     sort_by = request.GET.get('sort', 'latest')
     
-    # Get all active playlists (main/parent videos)
-    playlists = Tutorial.objects.filter(
-        is_active=True, 
-        is_playlist=True
-    )
-    
-    # Apply search to playlists
-    if search_query:
-        playlists = playlists.filter(title__icontains=search_query)
-    
-    # Apply sort to playlists
-    if sort_by == 'oldest':
-        playlists = playlists.order_by('created_date')
-    elif sort_by == 'az':
-        playlists = playlists.order_by('title')
-    elif sort_by == 'za':
-        playlists = playlists.order_by('-title')
-    else:  # latest (default)
-        playlists = playlists.order_by('-created_date')
-    
-    # For each playlist, get its lectures
-    playlist_data = []
-    for playlist in playlists:
-        lectures = Tutorial.objects.filter(
-            is_active=True,
-            is_playlist=False,
-            playlist_id=playlist.playlist_id
-        ).order_by('lecture_number', 'id')
-        
-        playlist_data.append({
-            'playlist': playlist,
-            'lectures': list(lectures),
-            'lecture_count': lectures.count()
-        })
-    
-    # Get standalone tutorials (ONLY videos NOT part of any playlist)
-    standalone_tutorials = Tutorial.objects.filter(
-        is_active=True,
-        is_playlist=False
-    ).filter(
-        Q(playlist_id__isnull=True) | Q(playlist_id='')
+    # Playlists with their lectures, and standalone videos, in three queries
+    repository = PlaylistRepository()
+    playlist_data, standalone_tutorials = await asyncio.gather(
+        sync_to_async(repository.playlists)(search_query, sort_by),
+        _list(repository.standalone(search_query, sort_by)),
     )
     
-    # Apply search to standalone tutorials
-    if search_query:
-        standalone_tutorials = standalone_tutorials.filter(title__icontains=search_query)
-    
-    # Apply sort to standalone tutorials
-    if sort_by == 'oldest':
-        standalone_tutorials = standalone_tutorials.order_by('created_date')
-    elif sort_by == 'az':
-        standalone_tutorials = standalone_tutorials.order_by('title')
-    elif sort_by == 'za':
-        standalone_tutorials = standalone_tutorials.order_by('-title')
-    else:  # latest (default)
-        standalone_tutorials = standalone_tutorials.order_by('-created_date')
-    
     context = {
         'playlist_data': playlist_data,
         'standalone_tutorials': standalone_tutorials,
@@ -333,10 +307,12 @@ def tutorials_view(request):
         'is_sort_az': sort_by == 'az',
         'is_sort_za': sort_by == 'za',
     }
-    return render(request, 'tutorials.html', context)
+    return await _render(request, 'tutorials.html', context)
 
 
-def research_technology_view(request):
+@conditional_page('research_technology')
+@cache_public_page('research_technology')
+async def research_technology_view(request):
     """Research and Technology notices view with search and sort"""
     # Search functionality
     search_query = request.GET.get('search', '').strip()
@@ -360,7 +336,7 @@ def research_technology_view(request):
         notices = notices.order_by('-event_date')
     
     context = {
-        'notices': notices,
+        'notices': await _list(notices),
         'search_query': search_query,
         'sort_by': sort_by,
         'is_sort_latest': sort_by == 'latest' or not sort_by,
@@ -370,4 +346,38 @@ def research_technology_view(request):
         'page_title': 'Research & Technology',
         'search_placeholder': 'Search research & technology...',
     }
-    return render(request, 'research_technology.html', context)
+    return await _render(request, 'research_technology.html', context)
+
+
+def search_view(request):
+    """Site-wide search across publications, projects, workshops, notices, tutorials and team"""
+    search_query = request.GET.get('q', '').strip()
+    results = search_index.search(search_query, limit=100) if search_query else []
+
+    # Group results by kind, keeping the order of the best hit in each group
+    grouped = {}
+    for result in results:
+        grouped.setdefault(result.kind, []).append(result)
+
+    context = {
+        'page_title': 'Search',
+        'search_query': search_query,
+        'result_groups': list(grouped.items()),
+        'result_count': len(results),
+    }
+    return render(request, 'search.html', context)
+
+
+def search_suggest(request):
+    """JSON typeahead API backed by the in-process search index"""
+    search_query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+
+    results = search_index.search(search_query, limit=limit) if search_query else []
+    return JsonResponse({
+        'query': search_query,
+        'results': [result.as_dict() for result in results],
+    })
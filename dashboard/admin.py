@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ImportJob
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['original_filename', 'model_name', 'status', 'processed_rows', 'error_count', 'created_at']
+    list_filter = ['status', 'model_name']
+    readonly_fields = [field.name for field in ImportJob._meta.fields]
@@ -0,0 +1,365 @@
+"""
+Background bulk imports for the dashboard.
+
+An upload is spooled to ``IMPORT_SPOOL_DIR`` and recorded as an
+``ImportJob``; the ``run_import_jobs`` worker then reads the file in chunks
+of ``CHUNK_SIZE`` rows. For each chunk the existing rows are fetched with one
+query keyed on the resource's ``import_id_fields``, every row is converted
+through the resource's own fields and widgets, and the result is written
+with ``bulk_create``/``bulk_update``. Only the columns that actually changed
+are written back, and unchanged rows are skipped, as ``skip_unchanged`` does
+for row-by-row imports. Many-to-many columns are applied per row through
+``resource.import_field`` once the chunk is saved; a row whose only change
+is in those columns counts as updated.
+
+Bulk writes bypass ``Model.save()`` and model signals: resources that derive
+fields on save must do so in ``before_save_instance`` (see
+``TeamMemberResource``), and the page cache and search index are refreshed
+once when the job finishes.
+"""
+import csv
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import ManyToManyField
+from django.utils import timezone
+
+from .models import ImportJob
+
+CHUNK_SIZE = 500
+MAX_ERROR_SAMPLES = 20
+
+# A running job without a heartbeat for this long belongs to a dead worker.
+STALE_AFTER = timedelta(minutes=15)
+
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx')
+
+
+def spool_dir():
+    return Path(getattr(settings, 'IMPORT_SPOOL_DIR', settings.BASE_DIR / '.import_spool'))
+
+
+def get_resource_class(model_name):
+    # Imported lazily: the map lives with the dashboard views, which import this module.
+    from dashboard.views.base import MODEL_RESOURCE_MAP
+    return MODEL_RESOURCE_MAP[model_name][1]
+
+
+def create_job(upload, model_name, user=None):
+    """Spool an uploaded file to disk and queue an import job for it."""
+    extension = Path(upload.name).suffix.lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError("Unsupported file format. Please use CSV or XLSX.")
+
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{uuid.uuid4().hex}{extension}'
+    with open(path, 'wb') as spooled:
+        for chunk in upload.chunks():
+            spooled.write(chunk)
+
+    return ImportJob.objects.create(
+        model_name=model_name,
+        original_filename=upload.name[:255],
+        file_path=str(path),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+
+
+# =========================
+# READING SPOOLED FILES
+# =========================
+
+def read_rows(path):
+    """Yield each data row of a CSV/XLSX file as a ``{header: value}`` dict."""
+    if Path(path).suffix.lower() == '.xlsx':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [str(value).strip() if value is not None else '' for value in next(rows, ())]
+            for values in rows:
+                if any(value not in (None, '') for value in values):
+                    yield dict(zip(headers, ('' if value is None else value for value in values)))
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        for row in csv.DictReader(handle):
+            if any(value for value in row.values() if isinstance(value, str)):
+                yield row
+
+
+def count_rows(path):
+    if Path(path).suffix.lower() == '.xlsx':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        if max_row:
+            return max(max_row - 1, 0)
+    return sum(1 for _ in read_rows(path))
+
+
+# =========================
+# CHUNKED UPSERT
+# =========================
+
+class ChunkImporter:
+    """Upserts chunks of rows through a resource's import fields."""
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.model = resource._meta.model
+        self.id_fields = [resource.fields[name] for name in resource.get_import_id_fields()]
+        m2m = {field.name for field in self.model._meta.get_fields() if isinstance(field, ManyToManyField)}
+        pk_name = self.model._meta.pk.name
+        self.import_fields = [
+            field for field in resource.get_import_fields()
+            if field.attribute and field.attribute != pk_name and field.attribute not in m2m
+        ]
+        self.m2m_fields = [field for field in resource.get_import_fields() if field.attribute in m2m]
+        self.concrete_fields = [field for field in self.model._meta.concrete_fields if not field.primary_key]
+        self.auto_now_fields = [field for field in self.concrete_fields if getattr(field, 'auto_now', False)]
+        self.created = self.updated = self.skipped = 0
+        self.errors = []
+        self.error_count = 0
+
+    def _key(self, row):
+        return tuple(field.clean(row) for field in self.id_fields)
+
+    def _existing(self, keys):
+        """Fetch the rows matching ``keys`` in one query, as ``{key: instance}``."""
+        attributes = [field.attribute for field in self.id_fields]
+        first_values = {key[0] for key in keys if key[0] is not None}
+        if not first_values:
+            return {}
+        queryset = self.model.objects.filter(**{f'{attributes[0]}__in': first_values})
+        if self.m2m_fields:
+            queryset = queryset.prefetch_related(*(field.attribute for field in self.m2m_fields))
+        return {tuple(getattr(obj, attr) for attr in attributes): obj for obj in queryset}
+
+    def _values(self, instance):
+        return [field.value_from_object(instance) for field in self.concrete_fields]
+
+    def _m2m_changed(self, instance, row):
+        """Whether the row's many-to-many columns differ from the instance's current relations."""
+        for field in self.m2m_fields:
+            if field.column_name not in row:
+                continue
+            new = {related.pk for related in field.clean(row)}
+            if new != {related.pk for related in getattr(instance, field.attribute).all()}:
+                return True
+        return False
+
+    def _save_m2m(self, saved, rows):
+        """Apply the many-to-many columns of ``rows`` (by line) to the saved instances; return the failed lines."""
+        failed = set()
+        if not self.m2m_fields:
+            return failed
+        for line, instance in saved:
+            try:
+                with transaction.atomic():
+                    for field in self.m2m_fields:
+                        self.resource.import_field(field, instance, rows[line], is_m2m=True)
+            except Exception as exc:
+                self._error(line, exc)
+                failed.add(line)
+        return failed
+
+    def _error(self, line, exc):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append(f'Row {line}: {exc}')
+
+    def import_chunk(self, rows):
+        """Import a list of ``(line_number, row)`` pairs."""
+        keyed = {}
+        for line, row in rows:
+            try:
+                self.resource.before_import_row(row, row_number=line)
+                key = self._key(row)
+            except Exception as exc:
+                self._error(line, exc)
+                continue
+            # A key repeated within the file: the last row wins, as with row-by-row imports.
+            keyed[key] = (line, row)
+
+        existing = self._existing(keyed)
+        rows = dict(keyed.values())
+        creates, updates, m2m_updates = [], [], []
+        changed_fields = set()
+        for key, (line, row) in keyed.items():
+            instance = existing.get(key)
+            is_create = instance is None
+            if is_create:
+                instance = self.resource.init_instance(row)
+            else:
+                before = self._values(instance)
+            try:
+                for field in self.import_fields:
+                    self.resource.import_field(field, instance, row)
+                self.resource.before_save_instance(instance, row)
+                m2m_changed = not is_create and self._m2m_changed(instance, row)
+            except Exception as exc:
+                self._error(line, exc)
+                continue
+            if is_create:
+                creates.append((line, instance))
+                continue
+            changed = {
+                field.name for field, old, new in zip(self.concrete_fields, before, self._values(instance))
+                if old != new
+            }
+            if not changed:
+                if m2m_changed:
+                    m2m_updates.append((line, instance))
+                else:
+                    self.skipped += 1
+                continue
+            # bulk_update writes one CASE per column, so only send the columns that changed.
+            changed_fields |= changed
+            updates.append((line, instance))
+
+        if updates and self.auto_now_fields:
+            # bulk_update skips pre_save, so "last updated" timestamps are set here.
+            now = timezone.now()
+            for _, instance in updates:
+                for field in self.auto_now_fields:
+                    setattr(instance, field.attname, now)
+            changed_fields |= {field.name for field in self.auto_now_fields}
+
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create([instance for _, instance in creates], batch_size=CHUNK_SIZE)
+                if updates:
+                    self.model.objects.bulk_update(
+                        [instance for _, instance in updates], sorted(changed_fields), batch_size=CHUNK_SIZE,
+                    )
+        except IntegrityError:
+            # Some row violates a constraint: save this chunk row by row to isolate it.
+            saved = self._save_individually(creates, updates)
+        else:
+            saved = creates + updates
+            self.created += len(creates)
+            self.updated += len(updates)
+        failed = self._save_m2m(saved + m2m_updates, rows)
+        self.updated += sum(1 for line, _ in m2m_updates if line not in failed)
+
+    def _save_individually(self, creates, updates):
+        """Save rows one at a time; return the ``(line, instance)`` pairs that were saved."""
+        saved = []
+        for rows, is_create in ((creates, True), (updates, False)):
+            for line, instance in rows:
+                if is_create:
+                    instance.pk = None
+                    instance._state.adding = True
+                try:
+                    with transaction.atomic():
+                        instance.save()
+                except Exception as exc:
+                    self._error(line, exc)
+                    continue
+                saved.append((line, instance))
+                if is_create:
+                    self.created += 1
+                else:
+                    self.updated += 1
+        return saved
+
+
+# =========================
+# JOB LIFECYCLE
+# =========================
+
+def release_stale_jobs():
+    """Re-queue running jobs whose worker stopped sending heartbeats (imports are upserts, so re-running is safe)."""
+    return ImportJob.objects.filter(
+        status=ImportJob.STATUS_RUNNING,
+        heartbeat_at__lt=timezone.now() - STALE_AFTER,
+    ).update(
+        status=ImportJob.STATUS_PENDING,
+        processed_rows=0, created_count=0, updated_count=0, skipped_count=0, error_count=0,
+    )
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it (or None)."""
+    now = timezone.now()
+    with transaction.atomic():
+        queued = ImportJob.objects.filter(status=ImportJob.STATUS_PENDING).order_by('created_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            queued = queued.select_for_update(skip_locked=True)
+        job = queued.first()
+        if job is None:
+            return None
+        job.status = ImportJob.STATUS_RUNNING
+        job.started_at = job.heartbeat_at = now
+        job.finished_at = None
+        job.save(update_fields=['status', 'started_at', 'heartbeat_at', 'finished_at'])
+    return job
+
+
+def _record_progress(job, importer, processed):
+    job.processed_rows = processed
+    job.created_count = importer.created
+    job.updated_count = importer.updated
+    job.skipped_count = importer.skipped
+    job.error_count = importer.error_count
+    job.errors = importer.errors
+    job.heartbeat_at = timezone.now()
+    job.save(update_fields=[
+        'processed_rows', 'created_count', 'updated_count', 'skipped_count', 'error_count', 'errors',
+        'heartbeat_at',
+    ])
+
+
+def _refresh_derived_data(model):
+    from core import page_cache, search_index
+
+    page_cache.invalidate_pages_for_model(model)
+    if model._meta.label in search_index.INDEXED_MODELS:
+        search_index.rebuild()
+
+
+def run_job(job):
+    """Import every row of a claimed job, recording progress after each chunk."""
+    path = Path(job.file_path)
+    try:
+        resource = get_resource_class(job.model_name)()
+        importer = ChunkImporter(resource)
+        job.total_rows = count_rows(path)
+        job.save(update_fields=['total_rows'])
+
+        processed = 0
+        chunk = []
+        # Line numbers match the spreadsheet: the header is line 1.
+        for line, row in enumerate(read_rows(path), start=2):
+            chunk.append((line, row))
+            if len(chunk) == CHUNK_SIZE:
+                importer.import_chunk(chunk)
+                processed += len(chunk)
+                chunk = []
+                _record_progress(job, importer, processed)
+        if chunk:
+            importer.import_chunk(chunk)
+            processed += len(chunk)
+        _record_progress(job, importer, processed)
+
+        _refresh_derived_data(importer.model)
+        job.status = ImportJob.STATUS_DONE
+    except Exception as exc:
+        job.status = ImportJob.STATUS_FAILED
+        job.errors = [*job.errors, f'Import failed: {exc}'][-MAX_ERROR_SAMPLES:]
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'errors', 'finished_at'])
+    path.unlink(missing_ok=True)
+    return job
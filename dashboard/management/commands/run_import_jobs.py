@@ -0,0 +1,45 @@
+"""
+Process queued dashboard imports:
+  python manage.py run_import_jobs            # run forever, polling for new jobs
+  python manage.py run_import_jobs --once     # process what is queued now and exit
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from dashboard import imports
+
+
+class Command(BaseCommand):
+    help = 'Runs queued dashboard import jobs in chunks with bulk inserts/updates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                released = imports.release_stale_jobs()
+                if released:
+                    self.stdout.write(self.style.WARNING(f"Re-queued {released} stale import jobs."))
+
+                job = imports.claim_next_job()
+                if job is not None:
+                    self.stdout.write(f"Importing {job.original_filename} ({job.model_name}, job {job.pk})...")
+                    job = imports.run_job(job)
+                    summary = (
+                        f"{job.processed_rows} rows, {job.created_count} created, {job.updated_count} updated, "
+                        f"{job.skipped_count} unchanged, {job.error_count} errors, {job.rows_per_second} rows/s"
+                    )
+                    if job.status == job.STATUS_DONE:
+                        self.stdout.write(self.style.SUCCESS(f"Job {job.pk} finished: {summary}"))
+                    else:
+                        self.stdout.write(self.style.ERROR(f"Job {job.pk} failed: {job.errors[-1] if job.errors else summary}"))
+                    continue
+
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
@@ -1,3 +1,86 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class ImportJob(models.Model):
+    """A spooled dashboard upload, imported in chunks by ``run_import_jobs``"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Finished'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    model_name = models.CharField(max_length=50, help_text="Key in dashboard MODEL_RESOURCE_MAP")
+    original_filename = models.CharField(max_length=255)
+    file_path = models.CharField(max_length=500, help_text="Spooled upload on local disk")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, blank=True, null=True)
+
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0, help_text="Existing rows with no changes")
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True, help_text="First few row errors")
+
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = "Import Job"
+        verbose_name_plural = "Import Jobs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='importjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.original_filename} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def progress(self):
+        """Completion in percent (0-100)."""
+        if self.status == self.STATUS_DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0.0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.processed_rows / elapsed, 1) if elapsed > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            'id': self.pk,
+            'model': self.model_name,
+            'file': self.original_filename,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'total_rows': self.total_rows,
+            'processed_rows': self.processed_rows,
+            'created': self.created_count,
+            'updated': self.updated_count,
+            'skipped': self.skipped_count,
+            'errors': self.error_count,
+            'error_samples': self.errors,
+            'progress': self.progress,
+            'rows_per_second': self.rows_per_second,
+            'finished': self.is_finished,
+        }
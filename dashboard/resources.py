@@ -2,7 +2,7 @@ from import_export import resources, fields
 from import_export.widgets import DateWidget
 from projects.models import ResearchProject
 from publications.models import Publication
-from team.models import TeamMember
+from team.models import TeamMember, categorize_role
 from workshops.models import Workshop
 from core.models import (
     Tutorial, RTNotice, 
@@ -24,6 +24,10 @@ class PublicationResource(resources.ModelResource):
         skip_unchanged = True
 
 class TeamMemberResource(resources.ModelResource):
+    def before_save_instance(self, instance, row, **kwargs):
+        # Also covers bulk imports, which bypass TeamMember.save()
+        instance.category = categorize_role(instance.role)
+
     class Meta:
         model = TeamMember
         import_id_fields = ('name',)
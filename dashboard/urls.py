@@ -83,6 +83,8 @@ urlpatterns = [
          name='password_reset_complete'),
 
     # Import/Export
-    path('export/<str:model_type>/', views.export_data, name='export_data'),
-    path('import/<str:model_type>/', views.import_data, name='import_data'),
+    path('export/<str:model_name>/', views.export_data, name='export_data'),
+    path('import/<str:model_name>/', views.import_data, name='import_data'),
+    path('import/jobs/<int:pk>/', views.import_job, name='import_job'),
+    path('import/jobs/<int:pk>/status/', views.import_job_status, name='import_job_status'),
 ]
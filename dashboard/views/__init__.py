@@ -2,7 +2,7 @@ from django.contrib import messages
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
 
-from .base import dashboard_home, export_data, import_data
+from .base import dashboard_home, export_data, import_data, import_job, import_job_status
 from .content import (
     homepage_stats_update as edit_homepage_stats,
     carousel_list, 
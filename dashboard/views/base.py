@@ -7,10 +7,10 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.db.models import Q
-from django.http import HttpResponse, JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 from django.utils import timezone
-from tablib import Dataset
 
 from core.models import (
     CarouselImage,
@@ -22,11 +22,15 @@ from core.models import (
     RTNotice,
     Tutorial,
 )
+from core.stats import content_counts
 from projects.models import ResearchProject
 from publications.models import Publication
 from team.models import TeamMember
 from workshops.models import Workshop
 
+from dashboard import exports, imports
+from dashboard.models import ImportJob
+
 # Resource classes for import/export
 from publications.resources import PublicationResource
 from team.resources import TeamMemberResource
@@ -40,78 +44,103 @@ MODEL_RESOURCE_MAP = {
     'workshop': (Workshop, WorkshopResource),
 }
 
+MODEL_LIST_URLS = {
+    'publication': 'dashboard:publications_list',
+    'teammember': 'dashboard:team_list',
+    'researchproject': 'dashboard:projects_list',
+    'workshop': 'dashboard:workshops_list',
+}
+
 @login_required
 def dashboard_home(request):
     """Dashboard home view with stats and summary"""
+    counts = content_counts()
+    publications = counts['publication']
     stats = {
-        'project_count': ResearchProject.objects.count(),
-        'pub_count': Publication.objects.count(),
-        'team_count': TeamMember.objects.count(),
-        'workshop_count': Workshop.objects.count(),
-        'rt_count': RTNotice.objects.count(),
-        'carousel_count': CarouselImage.objects.count(),
-        'impact_count': ImpactStory.objects.count(),
+        'project_count': counts['researchproject']['total'],
+        'pub_count': publications['total'],
+        'team_count': counts['teammember']['total'],
+        'workshop_count': counts['workshop']['total'],
+        'rt_count': counts['rtnotice']['total'],
+        'carousel_count': counts['carouselimage']['total'],
+        'impact_count': counts['impactstory']['total'],
         
         # Category-specific counts for the UI boxes
-        'j_c': Publication.objects.filter(category='journal').count(),
-        'c_c': Publication.objects.filter(category='conference').count(),
-        'b_c': Publication.objects.filter(category='book').count(),
-        'bg_c': Publication.objects.filter(category='guideline').count(),
-        'o_c': Publication.objects.filter(category='other').count(),
+        'j_c': publications['journal'],
+        'c_c': publications['conference'],
+        'b_c': publications['book'],
+        'bg_c': publications['guideline'],
+        'o_c': publications['other'],
     }
     return render(request, 'dashboard/home.html', stats)
 
 @login_required
 def export_data(request, model_name):
-    """Export model data to various formats"""
+    """Stream model data as CSV, JSON or XLSX"""
     if model_name not in MODEL_RESOURCE_MAP:
         messages.error(request, f"Export not supported for {model_name}.")
         return redirect('dashboard:home')
     
     model_class, resource_class = MODEL_RESOURCE_MAP[model_name]
     resource = resource_class()
-    dataset = resource.export()
     
     format_type = request.GET.get('format', 'csv')
+    if format_type not in exports.CONTENT_TYPES:
+        format_type = 'csv'
+    filename = f'{model_name}_{datetime.now().strftime("%Y%m%d")}.{format_type}'
     
     if format_type == 'xlsx':
-        response = HttpResponse(dataset.xlsx, content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{model_name}_{datetime.now().strftime("%Y%m%d")}.xlsx"'
-    elif format_type == 'json':
-        response = HttpResponse(dataset.json, content_type='application/json')
-        response['Content-Disposition'] = f'attachment; filename="{model_name}_{datetime.now().strftime("%Y%m%d")}.json"'
-    else: # Default to CSV
-        response = HttpResponse(dataset.csv, content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{model_name}_{datetime.now().strftime("%Y%m%d")}.csv"'
-        
+        try:
+            output = exports.write_xlsx(resource)
+        except ImportError:
+            messages.error(request, "Excel export requires the openpyxl package.")
+            return redirect('dashboard:home')
+        return FileResponse(output, as_attachment=True, filename=filename, content_type=exports.CONTENT_TYPES['xlsx'])
+    
+    rows = exports.stream_json(resource) if format_type == 'json' else exports.stream_csv(resource)
+    response = StreamingHttpResponse(rows, content_type=exports.CONTENT_TYPES[format_type])
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
 
 @login_required
 def import_data(request, model_name):
-    """Import model data from CSV/XLSX"""
+    """Upload a CSV/XLSX file and queue it for a background import"""
     if model_name not in MODEL_RESOURCE_MAP:
         messages.error(request, f"Import not supported for {model_name}.")
         return redirect('dashboard:home')
+    
+    model_class, resource_class = MODEL_RESOURCE_MAP[model_name]
+    back_url = reverse(MODEL_LIST_URLS[model_name])
         
     if request.method == 'POST' and request.FILES.get('import_file'):
-        model_class, resource_class = MODEL_RESOURCE_MAP[model_name]
-        resource = resource_class()
-        dataset = Dataset()
-        import_file = request.FILES['import_file']
-        
         try:
-            if import_file.name.endswith('.csv'):
-                dataset.load(import_file.read().decode('utf-8'), format='csv')
-            elif import_file.name.endswith('.xlsx'):
-                dataset.load(import_file.read(), format='xlsx')
-            else:
-                messages.error(request, "Unsupported file format. Please use CSV or XLSX.")
-                return redirect(f'dashboard:{model_name}_list')
-                
-            result = resource.import_data(dataset, dry_run=False, raise_errors=True)
-            messages.success(request, f"Successfully imported {result.total_rows} records.")
-            
-        except Exception as e:
-            messages.error(request, f"Error importing data: {str(e)}")
-            
-    return redirect(f'dashboard:{model_name}_list')
+            job = imports.create_job(request.FILES['import_file'], model_name, request.user)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect(back_url)
+        messages.success(request, f"Import of {job.original_filename} queued.")
+        return redirect('dashboard:import_job', pk=job.pk)
+    
+    context = {
+        'title': f"Import {model_class._meta.verbose_name_plural}",
+        'back_url': back_url,
+        'recent_jobs': ImportJob.objects.filter(model_name=model_name)[:5],
+    }
+    return render(request, 'dashboard/import_form.html', context)
+
+@login_required
+def import_job(request, pk):
+    """Progress page for a background import"""
+    job = get_object_or_404(ImportJob, pk=pk)
+    context = {
+        'job': job,
+        'title': f"Import: {job.original_filename}",
+        'back_url': reverse(MODEL_LIST_URLS.get(job.model_name, 'dashboard:home')),
+    }
+    return render(request, 'dashboard/import_job.html', context)
+
+@login_required
+def import_job_status(request, pk):
+    """JSON progress of a background import (polled by the progress page)"""
+    job = get_object_or_404(ImportJob, pk=pk)
+    return JsonResponse(job.as_dict())
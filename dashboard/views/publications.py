@@ -4,6 +4,7 @@ from django.core.paginator import Paginator
 from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core import uploads
 from publications.models import Publication
 from dashboard.forms import PublicationForm
 
@@ -47,6 +48,8 @@ def publication_add(request):
         if form.is_valid():
             publication = form.save()
             messages.success(request, f"Publication '{publication.title}' added successfully.")
+            if publication.pdf_file and uploads.is_pending(publication.pdf_file.name):
+                messages.info(request, "The PDF is being uploaded in the background and will be available shortly.")
             return redirect('dashboard:publications_list')
     else:
         form = PublicationForm()
@@ -61,6 +64,8 @@ def publication_edit(request, pk):
         if form.is_valid():
             publication = form.save()
             messages.success(request, f"Publication '{publication.title}' updated successfully.")
+            if publication.pdf_file and uploads.is_pending(publication.pdf_file.name):
+                messages.info(request, "The PDF is being uploaded in the background and will be available shortly.")
             return redirect('dashboard:publications_list')
     else:
         form = PublicationForm(instance=publication)
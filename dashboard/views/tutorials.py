@@ -5,6 +5,7 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 
 from core.models import Tutorial
+from core.playlists import PlaylistRepository
 from dashboard.forms import TutorialForm
 
 @login_required
@@ -24,6 +25,11 @@ def tutorial_list(request):
     page_number = request.GET.get('page')
     tutorials = paginator.get_page(page_number)
     
+    # Attach each row's playlist (cover + lectures) with one extra query
+    groups = PlaylistRepository(include_inactive=True).groups_for(tutorials)
+    for tutorial in tutorials:
+        tutorial.playlist_group = groups.get(tutorial.playlist_id)
+    
     context = {
         'tutorials': tutorials,
         'query': search_query,
@@ -125,6 +125,13 @@ if ($envContent -match 'CHANGE-ME' -or $envContent -match 'YOUR_RDS_PASSWORD') {
     exit 1
 }
 
+# nginx.conf only serves media through its internal /protected-media/
+# location, so Django must answer /media/ with X-Accel-Redirects.
+if ($envContent -notmatch '(?m)^\s*MEDIA_ACCEL_REDIRECT\s*=') {
+    Add-Content -Path $envFile -Value 'MEDIA_ACCEL_REDIRECT=/protected-media/'
+    Write-Host 'MEDIA_ACCEL_REDIRECT=/protected-media/ added to .env (nginx sends media files)' -ForegroundColor Green
+}
+
 Write-Host '.env configured!' -ForegroundColor Green
 
 # -------------------------------------------------------------------
@@ -134,6 +141,7 @@ Write-Host ''
 Write-Host '[6/8] Collecting static files...' -ForegroundColor Yellow
 
 Set-Location $ProjectDir
+python manage.py build_static_bundles
 python manage.py collectstatic --noinput
 Write-Host 'Static files collected!' -ForegroundColor Green
 
@@ -146,6 +154,12 @@ Write-Host '[7/8] Running database migrations against RDS...' -ForegroundColor Y
 python manage.py migrate
 Write-Host 'Migrations complete!' -ForegroundColor Green
 
+# Above-the-fold CSS inlined in the public pages (needs the migrated database)
+python manage.py build_critical_css
+
+# Drop rendered pages cached from the previous templates
+python manage.py page_cache --clear
+
 # -------------------------------------------------------------------
 # STEP 8: Validate deployment
 # -------------------------------------------------------------------
@@ -181,6 +195,7 @@ Write-Host 'To start the server manually:' -ForegroundColor Cyan
 Write-Host ('  cd ' + $ProjectDir) -ForegroundColor White
 Write-Host '  .\venv\Scripts\Activate.ps1' -ForegroundColor White
 Write-Host '  python run_server.py' -ForegroundColor White
+Write-Host '  (or python run_asgi_server.py for the async views under Uvicorn)' -ForegroundColor White
 Write-Host ''
 Write-Host 'To install as a Windows service (auto-start on boot):' -ForegroundColor Cyan
 Write-Host '  .\install_service.ps1' -ForegroundColor White
@@ -54,15 +54,21 @@ if (-Not (Test-Path $nssmExe)) {
 Write-Host ''
 Write-Host '[2/4] Checking for existing service...' -ForegroundColor Yellow
 
-$existingSvc = Get-Service -Name $ServiceName -ErrorAction SilentlyContinue
-if ($existingSvc) {
-    Write-Host 'Stopping and removing existing service...'
-    & $nssmExe stop $ServiceName
-    & $nssmExe remove $ServiceName confirm
-    Start-Sleep -Seconds 2
-    Write-Host 'Old service removed' -ForegroundColor Green
-} else {
-    Write-Host 'No existing service found' -ForegroundColor Green
+$WorkerServiceName = $ServiceName + 'Mail'
+$ImportServiceName = $ServiceName + 'Import'
+$UploadServiceName = $ServiceName + 'Upload'
+
+foreach ($name in @($ServiceName, $WorkerServiceName, $ImportServiceName, $UploadServiceName)) {
+    $existingSvc = Get-Service -Name $name -ErrorAction SilentlyContinue
+    if ($existingSvc) {
+        Write-Host ('Stopping and removing existing service ' + $name + '...')
+        & $nssmExe stop $name
+        & $nssmExe remove $name confirm
+        Start-Sleep -Seconds 2
+        Write-Host 'Old service removed' -ForegroundColor Green
+    } else {
+        Write-Host ('No existing service ' + $name + ' found') -ForegroundColor Green
+    }
 }
 
 # -------------------------------------------------------------------
@@ -103,6 +109,43 @@ $stderrLog = Join-Path $logDir 'service-stderr.log'
 & $nssmExe set $ServiceName AppRotateSeconds 86400
 & $nssmExe set $ServiceName AppRotateBytes 10485760
 
+# Email outbox worker: delivers queued contact-form emails
+$managePath = Join-Path $ProjectDir 'manage.py'
+& $nssmExe install $WorkerServiceName $pythonExe $managePath send_outbox
+& $nssmExe set $WorkerServiceName AppDirectory $ProjectDir
+& $nssmExe set $WorkerServiceName DisplayName 'Climatology Lab Mail Worker'
+& $nssmExe set $WorkerServiceName Description 'Sends queued contact-form emails (manage.py send_outbox)'
+& $nssmExe set $WorkerServiceName Start SERVICE_AUTO_START
+& $nssmExe set $WorkerServiceName ObjectName LocalSystem
+& $nssmExe set $WorkerServiceName AppStdout (Join-Path $logDir 'mail-worker-stdout.log')
+& $nssmExe set $WorkerServiceName AppStderr (Join-Path $logDir 'mail-worker-stderr.log')
+& $nssmExe set $WorkerServiceName AppStdoutCreationDisposition 4
+& $nssmExe set $WorkerServiceName AppStderrCreationDisposition 4
+
+# Import worker: runs dashboard uploads queued as import jobs
+& $nssmExe install $ImportServiceName $pythonExe $managePath run_import_jobs
+& $nssmExe set $ImportServiceName AppDirectory $ProjectDir
+& $nssmExe set $ImportServiceName DisplayName 'Climatology Lab Import Worker'
+& $nssmExe set $ImportServiceName Description 'Imports dashboard uploads in the background (manage.py run_import_jobs)'
+& $nssmExe set $ImportServiceName Start SERVICE_AUTO_START
+& $nssmExe set $ImportServiceName ObjectName LocalSystem
+& $nssmExe set $ImportServiceName AppStdout (Join-Path $logDir 'import-worker-stdout.log')
+& $nssmExe set $ImportServiceName AppStderr (Join-Path $logDir 'import-worker-stderr.log')
+& $nssmExe set $ImportServiceName AppStdoutCreationDisposition 4
+& $nssmExe set $ImportServiceName AppStderrCreationDisposition 4
+
+# Upload worker: sends large publication PDFs to Supabase and builds image variants outside the request
+& $nssmExe install $UploadServiceName $pythonExe $managePath run_upload_jobs
+& $nssmExe set $UploadServiceName AppDirectory $ProjectDir
+& $nssmExe set $UploadServiceName DisplayName 'Climatology Lab Upload Worker'
+& $nssmExe set $UploadServiceName Description 'Uploads deferred media files and builds image variants (manage.py run_upload_jobs)'
+& $nssmExe set $UploadServiceName Start SERVICE_AUTO_START
+& $nssmExe set $UploadServiceName ObjectName LocalSystem
+& $nssmExe set $UploadServiceName AppStdout (Join-Path $logDir 'upload-worker-stdout.log')
+& $nssmExe set $UploadServiceName AppStderr (Join-Path $logDir 'upload-worker-stderr.log')
+& $nssmExe set $UploadServiceName AppStdoutCreationDisposition 4
+& $nssmExe set $UploadServiceName AppStderrCreationDisposition 4
+
 Write-Host 'Service installed!' -ForegroundColor Green
 
 # -------------------------------------------------------------------
@@ -112,6 +155,9 @@ Write-Host ''
 Write-Host '[4/4] Starting the service...' -ForegroundColor Yellow
 
 & $nssmExe start $ServiceName
+& $nssmExe start $WorkerServiceName
+& $nssmExe start $ImportServiceName
+& $nssmExe start $UploadServiceName
 Start-Sleep -Seconds 3
 
 $svc = Get-Service -Name $ServiceName
@@ -125,6 +171,9 @@ if ($svc.Status -eq 'Running') {
     Write-Host 'Status:        Running' -ForegroundColor Cyan
     Write-Host 'Auto-Start:    Yes (starts on reboot)' -ForegroundColor Cyan
     Write-Host ('Logs:          ' + $logDir) -ForegroundColor Cyan
+    Write-Host ('Mail worker:   ' + $WorkerServiceName + ' (' + (Get-Service -Name $WorkerServiceName).Status + ')') -ForegroundColor Cyan
+    Write-Host ('Import worker: ' + $ImportServiceName + ' (' + (Get-Service -Name $ImportServiceName).Status + ')') -ForegroundColor Cyan
+    Write-Host ('Upload worker: ' + $UploadServiceName + ' (' + (Get-Service -Name $UploadServiceName).Status + ')') -ForegroundColor Cyan
     Write-Host ''
     Write-Host 'Visit: http://3.6.210.134' -ForegroundColor Cyan
     Write-Host ''
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0011_alter_researchproject_collaborators_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchproject',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['project_type', '-start_date'], name='project_active_type_start_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_active_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchproject',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Last Updated'),
+        ),
+    ]
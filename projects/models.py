@@ -115,11 +115,22 @@ class ResearchProject(models.Model):
         null=True, 
         verbose_name="End Date"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Last Updated"
+    )
     
     class Meta:
         verbose_name = "Research Project"
         verbose_name_plural = "Research Projects"
         ordering = ['-start_date']
+        indexes = [
+            models.Index(
+                fields=['project_type', '-start_date'],
+                condition=models.Q(is_active=True),
+                name='project_active_type_start_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.title
@@ -0,0 +1,142 @@
+"""
+Parsing and bulk upsert of plain-text citation lists.
+
+A citation block is one numbered reference per line (``1.<TAB>Author, A
+2015, 'Title', ...``). ``parse_citations`` turns the lines into field
+dicts, and ``upsert_citations`` writes them keyed on the title. Each batch
+costs one SELECT for the existing titles, then a ``bulk_create`` for new
+titles and a ``bulk_update`` of the changed columns, instead of two queries
+per citation.
+
+Bulk writes bypass model signals. Callers refresh the page cache and the
+search index once, after the upsert.
+"""
+import re
+from datetime import date
+
+from django.db import transaction
+
+from .models import Publication
+
+BATCH_SIZE = 1000
+UPDATE_BATCH_SIZE = 100
+
+# Columns set from a parsed citation; every other column keeps its value.
+UPSERT_FIELDS = ['category', 'scope', 'citation', 'authors', 'publication_date', 'is_active']
+
+
+def parse_citation(line):
+    """Parse one numbered citation line into publication fields, or None for non-item lines."""
+    line = line.strip()
+    # Skip empty or non-item lines
+    if not line or not line[0].isdigit():
+        return None
+
+    # Remove leading number (e.g., "1. ")
+    content = re.sub(r'^\d+\.\s*', '', line)
+
+    # Extract Year (4 digits 19xx or 20xx)
+    year_match = re.search(r'(\d{4})', content)
+    year = year_match.group(1) if year_match else None
+
+    # Extract Title: content between single quotes ‘...’
+    title_match = re.search(r'‘(.*?)’', content)
+    if title_match:
+        title = title_match.group(1).strip()
+    # Alternative: content between quotes "..."
+    elif re.search(r'"(.*?)"', content):
+        title = re.search(r'"(.*?)"', content).group(1).strip()
+    # Else try to split by year and take the part after
+    elif year:
+        parts = content.split(year)
+        if len(parts) > 1:
+            # Heuristic: title is often after the year
+            potential_title = parts[1].split(',')[0].strip()
+            title = potential_title if len(potential_title) > 10 else content[:100]
+        else:
+            title = content[:100] + "..."
+    else:
+        title = content[:100] + "..."
+
+    # Extract Authors: everything before the year
+    if year:
+        authors = content.split(year)[0].strip().rstrip(',')
+    else:
+        authors = "Unknown"
+
+    return {
+        'title': title,
+        'citation': content,
+        'authors': authors,
+        'publication_date': date(int(year), 1, 1) if year else None,
+    }
+
+
+def parse_citations(lines):
+    """Yield the parsed fields of every citation in an iterable of lines."""
+    for line in lines:
+        entry = parse_citation(line)
+        if entry is not None:
+            yield entry
+
+
+def _batches(entries, size):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _upsert_batch(entries, category, scope):
+    # A title repeated in the input: the last line wins, as with update_or_create.
+    by_title = {entry['title']: entry for entry in entries}
+
+    existing = {}
+    for pub in Publication.objects.filter(title__in=by_title):
+        existing.setdefault(pub.title, []).append(pub)
+
+    creates, updates = [], []
+    changed_fields = set()
+    unchanged = 0
+    for title, entry in by_title.items():
+        values = {**entry, 'category': category, 'scope': scope, 'is_active': True}
+        pubs = existing.get(title)
+        if not pubs:
+            creates.append(Publication(**values))
+            continue
+        # Every row carrying the title gets the new values.
+        for pub in pubs:
+            changed = [field for field in UPSERT_FIELDS if getattr(pub, field) != values[field]]
+            if not changed:
+                unchanged += 1
+                continue
+            for field in changed:
+                setattr(pub, field, values[field])
+            changed_fields.update(changed)
+            updates.append(pub)
+
+    Publication.objects.bulk_create(creates, batch_size=BATCH_SIZE)
+    if updates:
+        # bulk_update sends one CASE per column over the whole batch, so
+        # only the changed columns are written, in smaller batches.
+        Publication.objects.bulk_update(updates, sorted(changed_fields), batch_size=UPDATE_BATCH_SIZE)
+    return len(creates), len(updates), unchanged
+
+
+def upsert_citations(entries, scope, category='conference', batch_size=BATCH_SIZE):
+    """
+    Create or update a publication per parsed citation, matched on title,
+    in one transaction. Returns ``(created, updated, unchanged)``.
+    """
+    created = updated = unchanged = 0
+    with transaction.atomic():
+        for batch in _batches(entries, batch_size):
+            batch_created, batch_updated, batch_unchanged = _upsert_batch(batch, category, scope)
+            created += batch_created
+            updated += batch_updated
+            unchanged += batch_unchanged
+    return created, updated, unchanged
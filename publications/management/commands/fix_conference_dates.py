@@ -1,37 +1,105 @@
+"""
+Backfill missing publication dates from the year in the citation, title or authors:
+  python manage.py fix_conference_dates              # set the dates
+  python manage.py fix_conference_dates --dry-run    # only report what would change
+"""
 import re
+from collections import Counter
 from datetime import date
+
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core import page_cache, search_index
 from publications.models import Publication
 
+# First 4-digit year (1900-2099); the fields are tried in this order.
+YEAR_RE = re.compile(r'\b(19\d{2}|20\d{2})\b')
+YEAR_SOURCES = ['citation', 'title', 'authors']
+
+# PostgreSQL spells the word boundary \y (\b is a backspace there).
+PG_YEAR_PATTERN = r'\y(19\d{2}|20\d{2})\y'
+
+# Rows per UPDATE in the fallback, below SQLite's bound-parameter limit.
+UPDATE_CHUNK_SIZE = 900
+
+
+def find_year(*texts):
+    for text in texts:
+        match = YEAR_RE.search(text or '')
+        if match:
+            return int(match.group(1))
+    return None
+
 
 class Command(BaseCommand):
     help = 'Backfills missing publication_date for conference (and other) entries by scanning the citation field'
 
-    def handle(self, *args, **kwargs):
-        # Target publications missing a date
-        qs = Publication.objects.filter(publication_date__isnull=True)
-        self.stdout.write(f"Found {qs.count()} publications without a date. Attempting to fix...")
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report the years found without saving')
 
-        fixed = 0
-        skipped = 0
+    def handle(self, *args, **options):
+        if connection.vendor == 'postgresql':
+            years, skipped = self.scan_postgres(options['dry_run'])
+        else:
+            years, skipped = self.scan_python(options['dry_run'])
 
-        for pub in qs:
-            # Try to find a 4-digit year (1900-2099) in citation, then title
-            year = None
-            for text in [pub.citation or '', pub.title or '', pub.authors or '']:
-                match = re.search(r'\b(19\d{2}|20\d{2})\b', text)
-                if match:
-                    year = int(match.group(1))
-                    break
+        fixed = sum(years.values())
+        for year, count in sorted(years.items()):
+            self.stdout.write(f"  {year}: {count}")
 
-            if year:
-                pub.publication_date = date(year, 1, 1)
-                pub.save(update_fields=['publication_date'])
-                fixed += 1
-                self.stdout.write(f"  Fixed: [{pub.category}] {pub.title[:60]}... → {year}")
-            else:
-                skipped += 1
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f"\nDry run. Would fix: {fixed}, Could not determine year for: {skipped}"
+            ))
+            return
 
+        if fixed:
+            # Set-based updates skip the model signals, so refresh derived data once.
+            page_cache.invalidate_pages_for_model(Publication)
+            search_index.rebuild()
         self.stdout.write(self.style.SUCCESS(
             f"\nDone. Fixed: {fixed}, Could not determine year for: {skipped}"
         ))
+
+    def scan_postgres(self, dry_run):
+        """Extract the years in SQL: one SELECT for the statistics and one UPDATE."""
+        table = connection.ops.quote_name(Publication._meta.db_table)
+        found = (
+            f"SELECT id, COALESCE({', '.join(f'substring({column} from %s)' for column in YEAR_SOURCES)}) AS year "
+            f"FROM {table} WHERE publication_date IS NULL"
+        )
+        params = [PG_YEAR_PATTERN] * len(YEAR_SOURCES)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT year, COUNT(*) FROM ({found}) AS found GROUP BY year", params)
+            counts = dict(cursor.fetchall())
+            skipped = counts.pop(None, 0)
+            years = Counter({int(year): count for year, count in counts.items()})
+            if not dry_run and years:
+                cursor.execute(
+                    f"UPDATE {table} SET publication_date = make_date(found.year::int, 1, 1) "
+                    f"FROM ({found}) AS found WHERE {table}.id = found.id AND found.year IS NOT NULL",
+                    params,
+                )
+        return years, skipped
+
+    def scan_python(self, dry_run):
+        """Match the years in Python, then issue one UPDATE per year (chunked by id)."""
+        ids_by_year = {}
+        skipped = 0
+        rows = Publication.objects.filter(publication_date__isnull=True).values_list('id', *YEAR_SOURCES)
+        for pk, *texts in rows.iterator(chunk_size=2000):
+            year = find_year(*texts)
+            if year:
+                ids_by_year.setdefault(year, []).append(pk)
+            else:
+                skipped += 1
+
+        if not dry_run:
+            with transaction.atomic():
+                for year, ids in ids_by_year.items():
+                    for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+                        Publication.objects.filter(pk__in=ids[start:start + UPDATE_CHUNK_SIZE]).update(
+                            publication_date=date(year, 1, 1),
+                        )
+        return Counter({year: len(ids) for year, ids in ids_by_year.items()}), skipped
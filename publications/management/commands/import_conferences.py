@@ -1,12 +1,45 @@
-import re
-from django.core.management.base import BaseCommand
+"""
+Import conference papers from numbered citation lists:
+  python manage.py import_conferences                                  # the built-in lists below
+  python manage.py import_conferences --file papers.txt --scope international
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core import page_cache, search_index
+from publications import citations
 from publications.models import Publication
-from datetime import date
+
 
 class Command(BaseCommand):
     help = 'Imports National and International conference papers from provided text data'
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help='Read citations from this UTF-8 text file, one per line')
+        parser.add_argument('--scope', choices=['national', 'international'], help='Scope of the papers in --file')
+        parser.add_argument('--category', default='conference',
+                            choices=[choice for choice, _ in Publication.CATEGORY_CHOICES])
+        parser.add_argument('--batch-size', type=int, default=citations.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.category = options['category']
+
+        if options['file']:
+            if not options['scope']:
+                raise CommandError("--scope is required with --file.")
+            try:
+                with open(options['file'], encoding='utf-8-sig') as handle:
+                    self.process_lines(handle, options['scope'])
+            except OSError as e:
+                raise CommandError(f"Could not read {options['file']}: {e}")
+        else:
+            self.import_builtin()
+
+        # Bulk writes skip the model signals, so refresh derived data once.
+        page_cache.invalidate_pages_for_model(Publication)
+        search_index.rebuild()
+
+    def import_builtin(self):
         self.stdout.write("Starting Conference Data Import...")
 
         # Raw data provided by user
@@ -84,65 +117,16 @@ class Command(BaseCommand):
 57.	Mukherjee, M 1996, A survey work in housing Elements: proceedings of Housing Development and Management,1996, Centre for Built Environment, Calcutta, pp. 165-171.
 """
         
-        self.process_data(national_data, 'national')
-        self.process_data(international_data, 'international')
-        
-    def process_data(self, raw_text, scope):
-        lines = [line.strip() for line in raw_text.strip().split('\n') if line.strip()]
-        
-        count = 0
-        for line in lines:
-            # Skip empty or non-item lines
-            if not line[0].isdigit():
-                continue
-                
-            # Remove leading number (e.g., "1. ")
-            content = re.sub(r'^\d+\.\s*', '', line)
-            
-            # Extract Year (4 digits 19xx or 20xx)
-            year_match = re.search(r'(\d{4})', content)
-            year = year_match.group(1) if year_match else None
-            
-            # Extract Title: content between single quotes ‘...’
-            title_match = re.search(r'‘(.*?)’', content)
-            if title_match:
-                title = title_match.group(1).strip()
-            # Alternative: content between quotes "..."
-            elif re.search(r'"(.*?)"', content):
-                title = re.search(r'"(.*?)"', content).group(1).strip()
-            # Else try to split by year and take the part after
-            elif year:
-                parts = content.split(year)
-                if len(parts) > 1:
-                    # Heuristic: title is often after the year
-                    potential_title = parts[1].split(',')[0].strip()
-                    title = potential_title if len(potential_title) > 10 else content[:100]
-                else:
-                    title = content[:100] + "..."
-            else:
-                title = content[:100] + "..."
-
-            # Extract Authors: everything before the year
-            if year:
-                authors = content.split(year)[0].strip().rstrip(',')
-            else:
-                authors = "Unknown"
+        self.process_lines(national_data.splitlines(), 'national')
+        self.process_lines(international_data.splitlines(), 'international')
 
-            # Check if exists
-            pub, created = Publication.objects.update_or_create(
-                title=title,
-                defaults={
-                    'category': 'conference',
-                    'scope': scope,
-                    'citation': content,
-                    'authors': authors,
-                    'publication_date': date(int(year), 1, 1) if year else None,
-                    'is_active': True
-                }
-            )
-            
-            action = "Created" if created else "Updated"
-            # self.stdout.write(f"{action}: {title[:50]}...")
-            count += 1
-            
-        self.stdout.write(self.style.SUCCESS(f"Successfully processed {count} {scope} publications."))
+    def process_lines(self, lines, scope):
+        entries = citations.parse_citations(lines)
+        created, updated, unchanged = citations.upsert_citations(
+            entries, scope, category=self.category, batch_size=self.batch_size,
+        )
+        count = created + updated + unchanged
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully processed {count} {scope} publications "
+            f"({created} created, {updated} updated, {unchanged} unchanged)."
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from publications.search import index_available, install_index
+
+
+class Command(BaseCommand):
+    help = 'Re-creates the publication full-text index and re-indexes every row'
+
+    def handle(self, *args, **options):
+        # SQLite drops the FTS triggers whenever a migration rebuilds the
+        # publications table; installing again restores them and re-indexes.
+        with connection.schema_editor() as schema_editor:
+            install_index(schema_editor)
+
+        backend = index_available()
+        if backend:
+            self.stdout.write(self.style.SUCCESS(f"Full-text index ready ({backend})."))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"No full-text index for '{connection.vendor}'; search falls back to icontains."
+            ))
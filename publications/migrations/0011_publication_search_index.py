@@ -0,0 +1,100 @@
+# Full-text index maintained by the database: a weighted tsvector generated
+# column on PostgreSQL, an FTS5 table kept in sync by triggers on SQLite.
+#
+# The DDL is frozen here rather than imported from publications.search, so
+# later changes to the app code cannot change what this migration does.
+
+from django.db import migrations
+
+TABLE = 'publications_publication'
+FTS_TABLE = 'publications_publication_fts'
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(authors, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(journal, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(citation, '')), 'D')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_search_gin ON {TABLE} USING gin (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    f"DROP INDEX IF EXISTS {TABLE}_search_gin",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+_FTS_COLUMNS = 'title, authors, journal, abstract, citation'
+_FTS_NEW = "new.title, coalesce(new.authors, ''), new.journal, new.abstract, new.citation"
+_FTS_OLD = "old.title, coalesce(old.authors, ''), old.journal, old.abstract, old.citation"
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_FTS_COLUMNS}, content='{TABLE}', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_INSTALL
+    elif vendor == 'sqlite' and _sqlite_has_fts5(schema_editor.connection):
+        statements = SQLITE_INSTALL
+    else:
+        statements = []
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for sql in {'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}.get(vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0010_alter_guideline_options_alter_publication_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
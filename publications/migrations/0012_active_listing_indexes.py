@@ -0,0 +1,22 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0012_active_listing_indexes'),
+        ('publications', '0011_publication_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-publication_date', '-id'], name='pub_active_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publication',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-publication_date', '-id'], name='pub_active_category_date_idx'),
+        ),
+    ]
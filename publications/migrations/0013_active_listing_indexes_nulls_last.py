@@ -0,0 +1,70 @@
+# The listing indexes now match ``ORDER BY publication_date DESC NULLS LAST,
+# id DESC`` (publications.pagination). PostgreSQL needs the explicit NULLS
+# LAST to use them for the default sort; SQLite rejects it in an index but
+# already sorts NULLs last in a DESC key, so it gets the plain DESC index.
+
+from django.db import migrations, models
+
+TABLE = 'publications_publication'
+
+DATE_INDEX = models.Index(
+    models.OrderBy(models.F('publication_date'), descending=True, nulls_last=True),
+    models.OrderBy(models.F('id'), descending=True),
+    condition=models.Q(('is_active', True)),
+    name='pub_active_date_idx',
+)
+CATEGORY_INDEX = models.Index(
+    models.F('category'),
+    models.OrderBy(models.F('publication_date'), descending=True, nulls_last=True),
+    models.OrderBy(models.F('id'), descending=True),
+    condition=models.Q(('is_active', True)),
+    name='pub_active_category_date_idx',
+)
+
+SQLITE_INDEXES = [
+    f'CREATE INDEX "pub_active_date_idx" ON "{TABLE}" ("publication_date" DESC, "id" DESC) WHERE "is_active"',
+    f'CREATE INDEX "pub_active_category_date_idx" ON "{TABLE}" ("category", "publication_date" DESC, "id" DESC) WHERE "is_active"',
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in SQLITE_INDEXES:
+            schema_editor.execute(sql)
+        return
+    model = apps.get_model('publications', 'Publication')
+    schema_editor.add_index(model, DATE_INDEX)
+    schema_editor.add_index(model, CATEGORY_INDEX)
+
+
+def drop_indexes(apps, schema_editor):
+    model = apps.get_model('publications', 'Publication')
+    schema_editor.remove_index(model, DATE_INDEX)
+    schema_editor.remove_index(model, CATEGORY_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publications', '0012_active_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='publication',
+            name='pub_active_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='publication',
+            name='pub_active_category_date_idx',
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='publication', index=DATE_INDEX),
+                migrations.AddIndex(model_name='publication', index=CATEGORY_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 
 
 class Publication(models.Model):
@@ -143,6 +144,22 @@ class Publication(models.Model):
         verbose_name = "Publication"
         verbose_name_plural = "All Publications"
         ordering = ['-publication_date']
+        # Public listings only ever read active rows, newest first with
+        # undated rows last (see publications.pagination), so the key order
+        # matches that ORDER BY exactly; the scope filter is applied within
+        # the category range.
+        indexes = [
+            models.Index(
+                F('publication_date').desc(nulls_last=True), F('id').desc(),
+                condition=models.Q(is_active=True),
+                name='pub_active_date_idx',
+            ),
+            models.Index(
+                F('category'), F('publication_date').desc(nulls_last=True), F('id').desc(),
+                condition=models.Q(is_active=True),
+                name='pub_active_category_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
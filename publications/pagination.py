@@ -0,0 +1,108 @@
+"""
+Keyset (cursor) pagination for the public publication listing.
+
+Pages are fetched with ``WHERE (sort_key, id) > cursor`` instead of OFFSET,
+so every page costs the same regardless of how deep the visitor scrolls.
+Undated publications always sort last.
+"""
+import base64
+import json
+from datetime import date
+
+from django.db.models import F, Q
+
+PAGE_SIZE = 20
+
+# sort option -> (sort field, descending)
+SORT_KEYS = {
+    'latest': ('publication_date', True),
+    'oldest': ('publication_date', False),
+    'az': ('title', False),
+    'za': ('title', True),
+    # Only valid on querysets annotated by publications.search.search()
+    'relevance': ('search_rank', True),
+}
+
+
+def order_queryset(queryset, sort_by):
+    """Apply the deterministic ordering the cursors are built against."""
+    field, descending = SORT_KEYS.get(sort_by, SORT_KEYS['latest'])
+    if descending:
+        return queryset.order_by(F(field).desc(nulls_last=True), '-id')
+    return queryset.order_by(F(field).asc(nulls_last=True), 'id')
+
+
+def encode_cursor(publication, sort_by):
+    field, _ = SORT_KEYS.get(sort_by, SORT_KEYS['latest'])
+    value = getattr(publication, field)
+    if isinstance(value, date):
+        value = value.isoformat()
+    payload = json.dumps([value, publication.pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_by):
+    """Return ``(value, pk)`` from a cursor string, or None if it is malformed."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        pk = int(pk)
+        field, _ = SORT_KEYS.get(sort_by, SORT_KEYS['latest'])
+        if field == 'publication_date' and value is not None:
+            value = date.fromisoformat(value)
+        elif field == 'title' and not isinstance(value, str):
+            return None
+        elif field == 'search_rank':
+            value = float(value)
+    except (ValueError, TypeError):
+        return None
+    return value, pk
+
+
+def _after(sort_by, value, pk):
+    """Build the filter selecting rows that come after ``(value, pk)``."""
+    field, descending = SORT_KEYS.get(sort_by, SORT_KEYS['latest'])
+    beyond = f'{field}__lt' if descending else f'{field}__gt'
+    pk_beyond = 'id__lt' if descending else 'id__gt'
+
+    if value is None:
+        # Already inside the trailing block of NULLs; only the id tie-breaker is left.
+        return Q(**{f'{field}__isnull': True, pk_beyond: pk})
+
+    condition = Q(**{beyond: value}) | Q(**{field: value, pk_beyond: pk})
+    if field == 'publication_date':
+        condition |= Q(publication_date__isnull=True)
+    return condition
+
+
+def _page_queryset(queryset, sort_by, cursor, page_size):
+    queryset = order_queryset(queryset, sort_by)
+    position = decode_cursor(cursor, sort_by)
+    if position is not None:
+        queryset = queryset.filter(_after(sort_by, *position))
+    return queryset[:page_size + 1]
+
+
+def _page(rows, sort_by, page_size):
+    publications = rows[:page_size]
+    next_cursor = encode_cursor(publications[-1], sort_by) if len(rows) > page_size else None
+    return publications, next_cursor
+
+
+def paginate(queryset, sort_by, cursor=None, page_size=PAGE_SIZE):
+    """
+    Return ``(publications, next_cursor)`` for one page of ``queryset``.
+
+    ``next_cursor`` is None on the last page. An invalid cursor restarts
+    from the first page.
+    """
+    rows = list(_page_queryset(queryset, sort_by, cursor, page_size))
+    return _page(rows, sort_by, page_size)
+
+
+async def apaginate(queryset, sort_by, cursor=None, page_size=PAGE_SIZE):
+    """Async ``paginate`` for the async publication views."""
+    rows = [publication async for publication in _page_queryset(queryset, sort_by, cursor, page_size)]
+    return _page(rows, sort_by, page_size)
@@ -0,0 +1,220 @@
+"""
+Full-text search over publications.
+
+PostgreSQL keeps a weighted ``tsvector`` in a stored generated column with a
+GIN index; SQLite keeps an FTS5 table in sync through triggers. Both are
+maintained by the database on every write, including bulk operations.
+Any other backend (or a SQLite build without FTS5) falls back to the
+original ``icontains`` filters.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, TextField
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+TABLE = 'publications_publication'
+FTS_TABLE = 'publications_publication_fts'
+
+# Private-use characters wrap matches in snippets so the surrounding text can
+# be HTML-escaped before they are turned into <mark> tags.
+HIGHLIGHT_START = '\ue000'
+HIGHLIGHT_STOP = '\ue001'
+
+POSTGRES_INSTALL = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(authors, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(journal, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(abstract, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(citation, '')), 'D')
+    ) STORED
+    """,
+    f"CREATE INDEX IF NOT EXISTS {TABLE}_search_gin ON {TABLE} USING gin (search_vector)",
+]
+
+POSTGRES_UNINSTALL = [
+    f"DROP INDEX IF EXISTS {TABLE}_search_gin",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+_FTS_COLUMNS = 'title, authors, journal, abstract, citation'
+_FTS_NEW = "new.title, coalesce(new.authors, ''), new.journal, new.abstract, new.citation"
+_FTS_OLD = "old.title, coalesce(old.authors, ''), old.journal, old.abstract, old.citation"
+
+SQLITE_INSTALL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_FTS_COLUMNS}, content='{TABLE}', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD});
+        INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW});
+    END
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+_index_available = {}
+
+
+def install_index(schema_editor):
+    """Create the full-text index for the current backend (idempotent)."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_INSTALL
+    elif vendor == 'sqlite':
+        if not _sqlite_has_fts5(schema_editor.connection):
+            return
+        statements = SQLITE_INSTALL
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+    _index_available.clear()
+
+
+def uninstall_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'postgresql': POSTGRES_UNINSTALL, 'sqlite': SQLITE_UNINSTALL}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+    _index_available.clear()
+
+
+def _sqlite_has_fts5(conn):
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def index_available():
+    """Return the active full-text backend ('postgresql'/'sqlite') or None."""
+    vendor = connection.vendor
+    if vendor not in _index_available:
+        if vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                columns = connection.introspection.get_table_description(cursor, TABLE)
+            _index_available[vendor] = any(col.name == 'search_vector' for col in columns)
+        elif vendor == 'sqlite':
+            _index_available[vendor] = FTS_TABLE in connection.introspection.table_names()
+        else:
+            _index_available[vendor] = False
+    return vendor if _index_available[vendor] else None
+
+
+def tokenize(query):
+    """Split a search string into lowercase word tokens, dropping operators."""
+    return re.findall(r'\w+', query.lower())
+
+
+def _postgres_query(tokens):
+    # Every term must match; the last one as a prefix so results follow typing.
+    terms = [f"'{token}'" for token in tokens[:-1]] + [f"'{tokens[-1]}':*"]
+    return ' & '.join(terms)
+
+
+def _sqlite_query(tokens):
+    terms = [f'"{token}"' for token in tokens[:-1]] + [f'"{tokens[-1]}"*']
+    return ' '.join(terms)
+
+
+def icontains_filter(query):
+    return (
+        Q(title__icontains=query) |
+        Q(abstract__icontains=query) |
+        Q(authors__icontains=query) |
+        Q(journal__icontains=query) |
+        Q(citation__icontains=query)
+    )
+
+
+def search(queryset, query):
+    """
+    Filter ``queryset`` to publications matching ``query``.
+
+    With a full-text index the rows are annotated with ``search_rank``
+    (higher is better) and ``search_snippet`` (see ``highlight``). Returns
+    ``(queryset, ranked)`` where ``ranked`` tells whether ``search_rank``
+    is available for ordering.
+    """
+    tokens = tokenize(query)
+    backend = index_available() if tokens else None
+
+    if backend == 'postgresql':
+        tsquery = _postgres_query(tokens)
+        options = f'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxWords=30, MinWords=12'
+        queryset = queryset.filter(
+            RawSQL(
+                f"{TABLE}.search_vector @@ to_tsquery('english', %s)",
+                (tsquery,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd({TABLE}.search_vector, to_tsquery('english', %s))::float8",
+                (tsquery,),
+                output_field=FloatField(),
+            ),
+            search_snippet=RawSQL(
+                f"ts_headline('english', coalesce(nullif({TABLE}.abstract, ''), {TABLE}.citation), "
+                f"to_tsquery('english', %s), %s)",
+                (tsquery, options),
+                output_field=TextField(),
+            ),
+        )
+        return queryset, True
+
+    if backend == 'sqlite':
+        fts_query = _sqlite_query(tokens)
+        match = f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        correlated = f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {TABLE}.id"
+        queryset = queryset.filter(
+            id__in=RawSQL(match, (fts_query,))
+        ).annotate(
+            # bm25() is lower-is-better; negate it so both backends sort descending.
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 5.0, 3.0, 2.0, 1.0) {correlated})",
+                (fts_query,),
+                output_field=FloatField(),
+            ),
+            search_snippet=RawSQL(
+                f"(SELECT snippet({FTS_TABLE}, -1, %s, %s, '…', 24) {correlated})",
+                (HIGHLIGHT_START, HIGHLIGHT_STOP, fts_query),
+                output_field=TextField(),
+            ),
+        )
+        return queryset, True
+
+    return queryset.filter(icontains_filter(query)), False
+
+
+def highlight(snippet):
+    """Escape a snippet and turn its match markers into <mark> tags."""
+    if not snippet:
+        return ''
+    html = escape(snippet).replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>')
+    return mark_safe(html)
@@ -0,0 +1,12 @@
+from django import template
+
+from publications.search import highlight
+
+register = template.Library()
+
+@register.filter(name='highlight_snippet')
+def highlight_snippet(value):
+    """
+    Renders a full-text search snippet with its matches wrapped in <mark>.
+    """
+    return highlight(value)
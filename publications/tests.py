@@ -1,3 +1,75 @@
+from datetime import date
+
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Publication
+from .pagination import decode_cursor, encode_cursor, order_queryset, paginate
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Ties on date and on title, plus undated rows, so the id tie-breaker
+        # and the NULL block are both crossed by page boundaries.
+        for title, published in [
+            ('Alpha', date(2024, 1, 1)),
+            ('Beta', date(2024, 1, 1)),
+            ('Gamma', date(2024, 1, 1)),
+            ('Delta', date(2023, 6, 1)),
+            ('Alpha', date(2022, 3, 1)),
+            ('Epsilon', None),
+            ('Zeta', None),
+            ('Eta', None),
+        ]:
+            Publication.objects.create(title=title, category='journal', publication_date=published)
+        Publication.objects.create(title='Hidden', category='journal', is_active=False)
+
+    def _walk(self, sort_by, page_size):
+        queryset = Publication.objects.filter(is_active=True)
+        seen, cursor = [], None
+        for _ in range(20):
+            page, cursor = paginate(queryset, sort_by, cursor, page_size=page_size)
+            seen.extend(publication.pk for publication in page)
+            if cursor is None:
+                return seen
+        self.fail('pagination did not terminate')
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = {
+            sort_by: list(order_queryset(Publication.objects.filter(is_active=True), sort_by).values_list('pk', flat=True))
+            for sort_by in ('latest', 'oldest', 'az', 'za')
+        }
+        for sort_by, pks in expected.items():
+            for page_size in (1, 2, 3, 8, 20):
+                with self.subTest(sort=sort_by, page_size=page_size):
+                    self.assertEqual(self._walk(sort_by, page_size), pks)
+
+    def test_undated_rows_sort_last_both_ways(self):
+        for sort_by in ('latest', 'oldest'):
+            with self.subTest(sort=sort_by):
+                pks = self._walk(sort_by, 2)
+                dates = [Publication.objects.get(pk=pk).publication_date for pk in pks]
+                self.assertEqual(dates[-3:], [None, None, None])
+                self.assertNotIn(None, dates[:-3])
+
+    def test_last_page_has_no_cursor(self):
+        page, cursor = paginate(Publication.objects.filter(is_active=True), 'latest', page_size=8)
+        self.assertEqual(len(page), 8)
+        self.assertIsNone(cursor)
+
+    def test_cursor_round_trips(self):
+        publication = Publication.objects.filter(publication_date__isnull=False).first()
+        cursor = encode_cursor(publication, 'latest')
+        self.assertEqual(decode_cursor(cursor, 'latest'), (publication.publication_date, publication.pk))
+        undated = Publication.objects.filter(publication_date__isnull=True).first()
+        self.assertEqual(decode_cursor(encode_cursor(undated, 'oldest'), 'oldest'), (None, undated.pk))
+
+    def test_invalid_cursor_restarts_from_first_page(self):
+        queryset = Publication.objects.filter(is_active=True)
+        first_page, _ = paginate(queryset, 'az', page_size=3)
+        # A date cursor whose value is NULL cannot position a title sort.
+        undated = Publication.objects.filter(publication_date__isnull=True).first()
+        for cursor in ('not-base64!', 'W10', encode_cursor(undated, 'latest')):
+            with self.subTest(cursor=cursor):
+                page, _ = paginate(queryset, 'az', cursor, page_size=3)
+                self.assertEqual(page, first_page)
@@ -12,4 +12,7 @@ urlpatterns = [
     path('books/', views.publication_list, {'category': 'book'}, name='books'),
     path('guidelines/', views.publication_list, {'category': 'guideline'}, name='guidelines'),
     path('other/', views.publication_list, {'category': 'other'}, name='others'),
+
+    # "Load more" fragment shared by all listing variants above
+    path('cards/', views.publication_cards, name='cards'),
 ]
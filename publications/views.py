@@ -1,12 +1,19 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
 from .models import Publication
-from django.db.models import Q
 
-def publication_list(request, category=None, scope=None):
+from core.conditional import conditional_page
+from core.page_cache import cache_public_page
+from .pagination import apaginate
+from .search import search
+
+_render = sync_to_async(render)
+
+
+def _filtered_publications(request, category=None, scope=None):
     """
-    Unified view for listing publications with search and sort.
-    Optional 'category' argument filters the query.
-    Optional 'scope' argument for conferences (national/international).
+    Return the active publications matching the category/scope filters and
+    the request's search query, plus the normalized search and sort values.
     """
     # Base queryset
     queryset = Publication.objects.filter(is_active=True)
@@ -18,29 +25,30 @@ def publication_list(request, category=None, scope=None):
     if scope:
         queryset = queryset.filter(scope=scope)
     
-    # Search functionality
+    # Search functionality (full-text index where available)
     search_query = request.GET.get('search', '').strip()
+    ranked = False
     if search_query:
-        queryset = queryset.filter(
-            Q(title__icontains=search_query) |
-            Q(abstract__icontains=search_query) |
-            Q(authors__icontains=search_query) |
-            Q(journal__icontains=search_query) |
-            Q(citation__icontains=search_query)
-        )
+        queryset, ranked = search(queryset, search_query)
     
-    # Sort functionality
     sort_by = request.GET.get('sort', 'latest')
-    if sort_by == 'latest':
-        queryset = queryset.order_by('-publication_date')
-    elif sort_by == 'oldest':
-        queryset = queryset.order_by('publication_date')
-    elif sort_by == 'az':
-        queryset = queryset.order_by('title')
-    elif sort_by == 'za':
-        queryset = queryset.order_by('-title')
-    else:
-        queryset = queryset.order_by('-publication_date')  # Default
+    if sort_by == 'relevance' and not ranked:
+        sort_by = 'latest'
+    return queryset, search_query, sort_by
+
+
+@conditional_page('publications')
+@cache_public_page('publications', extra_params=('cursor',))
+async def publication_list(request, category=None, scope=None):
+    """
+    Unified view for listing publications with search and sort.
+    Optional 'category' argument filters the query.
+    Optional 'scope' argument for conferences (national/international).
+    Results are keyset-paginated; '?cursor=' resumes after a previous page.
+    """
+    # search() checks the database for its full-text index on first use
+    queryset, search_query, sort_by = await sync_to_async(_filtered_publications)(request, category, scope)
+    publications, next_cursor = await apaginate(queryset, sort_by, request.GET.get('cursor'))
         
     # Map category codes to display titles
     titles = {
@@ -63,7 +71,8 @@ def publication_list(request, category=None, scope=None):
             page_title = 'International Conference Papers'
     
     context = {
-        'publications': queryset,
+        'publications': publications,
+        'next_cursor': next_cursor,
         'page_title': page_title,
         'current_category': category,
         'current_scope': scope,
@@ -73,6 +82,28 @@ def publication_list(request, category=None, scope=None):
         'is_sort_oldest': sort_by == 'oldest',
         'is_sort_az': sort_by == 'az',
         'is_sort_za': sort_by == 'za',
+        'is_sort_relevance': sort_by == 'relevance',
+        'show_relevance_sort': True,
     }
-    return render(request, 'publication_list.html', context)
+    return await _render(request, 'publication_list.html', context)
+
 
+@conditional_page('publications')
+@cache_public_page('publications', extra_params=('cursor', 'category', 'scope'))
+async def publication_cards(request):
+    """Next page of publication cards for the "Load more" button (HTML fragment)."""
+    category = request.GET.get('category') or None
+    if category not in dict(Publication.CATEGORY_CHOICES):
+        category = None
+    scope = request.GET.get('scope') or None
+    if scope not in dict(Publication.SCOPE_CHOICES):
+        scope = None
+
+    queryset, search_query, sort_by = await sync_to_async(_filtered_publications)(request, category, scope)
+    publications, next_cursor = await apaginate(queryset, sort_by, request.GET.get('cursor'))
+
+    context = {
+        'publications': publications,
+        'next_cursor': next_cursor,
+    }
+    return await _render(request, 'includes/publication_cards.html', context)
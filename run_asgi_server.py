@@ -0,0 +1,25 @@
+"""
+Production ASGI server using Uvicorn, for the async public views.
+Usage:  python run_asgi_server.py
+(or:    daphne -b 0.0.0.0 -p 8080 config.asgi:application)
+"""
+import os
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    import uvicorn
+
+    host = os.getenv("HOST", "0.0.0.0")
+    port = int(os.getenv("PORT", "8080"))
+    workers = int(os.getenv("UVICORN_WORKERS", "1"))
+
+    print(f"Starting Uvicorn server on {host}:{port} with {workers} worker(s)...")
+    print(f"DEBUG = {os.getenv('DEBUG', 'True')}")
+    print("Press Ctrl+C to stop.")
+
+    # Django does not implement the ASGI lifespan protocol.
+    uvicorn.run("config.asgi:application", host=host, port=port, workers=workers, lifespan="off")
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,8 @@ from core.admin_base import BaseAdmin
 
 @admin.register(TeamMember)
 class TeamMemberAdmin(BaseAdmin):
-    list_display = ['name', 'role', 'email', 'order', 'is_active']
-    list_filter = ['role', 'is_active']
+    list_display = ['name', 'role', 'category', 'email', 'order', 'is_active']
+    list_filter = ['category', 'role', 'is_active']
     search_fields = ['name', 'email']
     ordering = ['order', 'name']
     
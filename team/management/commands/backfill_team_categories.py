@@ -0,0 +1,39 @@
+"""
+Recompute TeamMember.category from the role of every member:
+  python manage.py backfill_team_categories
+  python manage.py backfill_team_categories --dry-run
+"""
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from core import page_cache
+from team.models import TeamMember, role_category_expression
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the stored team page section of every member from their role'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        members = TeamMember.objects.annotate(computed_category=role_category_expression())
+        stale = members.exclude(category=F('computed_category'))
+
+        changes = Counter(stale.values_list('category', 'computed_category'))
+        for (old, new), count in sorted(changes.items()):
+            self.stdout.write(f"{old} -> {new}: {count}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"Dry run: {sum(changes.values())} members would be updated."))
+            return
+
+        # A single UPDATE; it bypasses save() and its signals, so drop cached pages explicitly.
+        updated = TeamMember.objects.exclude(category=role_category_expression()).update(
+            category=role_category_expression()
+        )
+        if updated:
+            page_cache.invalidate_pages_for_model(TeamMember)
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} team members."))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0008_teammember_bio'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='team_active_order_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+# Frozen copy of team.models.ROLE_CATEGORY_RULES as of this migration, so
+# later edits to the rules do not change what it backfilled.
+ROLE_CATEGORY_RULES = [
+    ('faculty', ['faculty', 'professor']),
+    ('postgraduate', ['post graduate', 'm.arch', 'master']),
+    ('phd', ['phd', 'research scholar', 'doctoral']),
+    ('alumni', ['alumni', 'alumnus']),
+]
+
+
+def backfill_categories(apps, schema_editor):
+    TeamMember = apps.get_model('team', 'TeamMember')
+    TeamMember.objects.update(category=models.Case(
+        *[
+            models.When(
+                models.Q.create([('role__icontains', keyword) for keyword in keywords], connector=models.Q.OR),
+                then=models.Value(category),
+            )
+            for category, keywords in ROLE_CATEGORY_RULES
+        ],
+        default=models.Value('other'),
+        output_field=models.CharField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0009_active_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='teammember',
+            name='team_active_order_idx',
+        ),
+        migrations.AddField(
+            model_name='teammember',
+            name='category',
+            field=models.CharField(choices=[('faculty', 'Faculty'), ('phd', 'PhD Scholars'), ('postgraduate', 'Post Graduate Members'), ('alumni', 'Alumni'), ('other', 'Other')], default='other', editable=False, help_text='Team page section, derived from the role on save', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='teammember',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order', 'name'], name='team_active_category_idx'),
+        ),
+        migrations.RunPython(backfill_categories, migrations.RunPython.noop),
+    ]
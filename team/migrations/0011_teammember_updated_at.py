@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-18 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('team', '0010_teammember_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='teammember',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
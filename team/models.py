@@ -1,8 +1,50 @@
 from django.db import models
 
+# Team page sections, matched against the lowercased role in this order.
+# Members matching none of them are not listed on the team page.
+ROLE_CATEGORY_RULES = [
+    ('faculty', ['faculty', 'professor']),
+    ('postgraduate', ['post graduate', 'm.arch', 'master']),
+    ('phd', ['phd', 'research scholar', 'doctoral']),
+    ('alumni', ['alumni', 'alumnus']),
+]
+
+
+def categorize_role(role):
+    """Return the team page section for a role string."""
+    role_lower = (role or '').lower()
+    for category, keywords in ROLE_CATEGORY_RULES:
+        if any(keyword in role_lower for keyword in keywords):
+            return category
+    return 'other'
+
+
+def role_category_expression():
+    """The rules above as a SQL CASE over ``role``, for set-based updates."""
+    return models.Case(
+        *[
+            models.When(
+                models.Q.create([('role__icontains', keyword) for keyword in keywords], connector=models.Q.OR),
+                then=models.Value(category),
+            )
+            for category, keywords in ROLE_CATEGORY_RULES
+        ],
+        default=models.Value('other'),
+        output_field=models.CharField(),
+    )
+
+
 class TeamMember(models.Model):
     """Team member information"""
     
+    CATEGORY_CHOICES = [
+        ('faculty', 'Faculty'),
+        ('phd', 'PhD Scholars'),
+        ('postgraduate', 'Post Graduate Members'),
+        ('alumni', 'Alumni'),
+        ('other', 'Other'),
+    ]
+    
     name = models.CharField(max_length=200)
     role = models.CharField(max_length=100, help_text="e.g., Professor, PhD Student, Research Associate")
     photo = models.ImageField(upload_to='team/', blank=True, null=True)
@@ -12,11 +54,29 @@ class TeamMember(models.Model):
     bio = models.TextField(blank=True, help_text="Short introduction/bio (especially for faculty)")
     order = models.IntegerField(default=0, help_text="Display order (lower numbers first)")
     is_active = models.BooleanField(default=True)
+    category = models.CharField(
+        max_length=20,
+        choices=CATEGORY_CHOICES,
+        default='other',
+        editable=False,
+        help_text="Team page section, derived from the role on save"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Team Member"
         verbose_name_plural = "Team Members"
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['category', 'order', 'name'], condition=models.Q(is_active=True), name='team_active_category_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.role}"
+    
+    def save(self, *args, **kwargs):
+        self.category = categorize_role(self.role)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'role' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'category'}
+        super().save(*args, **kwargs)
@@ -1,7 +1,10 @@
 from import_export import resources
-from .models import TeamMember
+from .models import TeamMember, categorize_role
 
 class TeamMemberResource(resources.ModelResource):
+    def before_save_instance(self, instance, row, **kwargs):
+        instance.category = categorize_role(instance.role)
+
     class Meta:
         model = TeamMember
         fields = ('id', 'name', 'role', 'email', 'bio', 'linkedin_url', 'google_scholar_url', 'order', 'is_active')
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.10 on 2026-10-18 19:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshops', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workshop',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-event_date'], name='workshop_active_event_idx'),
+        ),
+    ]
@@ -14,6 +14,9 @@ class Workshop(models.Model):
         verbose_name = "Workshop/Notice"
         verbose_name_plural = "Workshops/Notices"
         ordering = ['-event_date']
+        indexes = [
+            models.Index(fields=['-event_date'], condition=models.Q(is_active=True), name='workshop_active_event_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.event_date}"